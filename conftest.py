@@ -1,3 +1,4 @@
+import json
 import os
 import pytest
 from dotenv import load_dotenv
@@ -24,8 +25,52 @@ load_dotenv()
 #         help="Run headed mode",
 #     )
 
+def _matrix_envs(config) -> list[str]:
+    raw = config.getoption("--envs")
+    return [e.strip().lower() for e in raw.split(",") if e.strip()] if raw else []
+
+
+def _emulation_names(config) -> list[str]:
+    raw = config.getoption("--emulation")
+    return [e.strip().lower() for e in raw.split(",") if e.strip()] or ["none"]
+
+
+def pytest_generate_tests(metafunc):
+    # One collection pass: every browser test is parametrized over --envs, and
+    # xdist spreads the (env, test) pairs across workers like any other items.
+    envs = _matrix_envs(metafunc.config)
+    if envs and "test_env" in metafunc.fixturenames:
+        metafunc.parametrize("test_env", envs, indirect=True, scope="session")
+    # Same for several --emulation profiles; an emulation marker pins the test to one.
+    profiles = _emulation_names(metafunc.config)
+    if len(profiles) > 1 and "emulation" in metafunc.fixturenames and not metafunc.definition.get_closest_marker("emulation"):
+        metafunc.parametrize("emulation", profiles, indirect=True)
+
+
+@pytest.fixture(scope="session")
+def test_env(request):
+    """Environment for this test: its --envs matrix value, else TEST_ENV (may be None)."""
+    return getattr(request, "param", None) or (os.getenv("TEST_ENV") or "").lower() or None
+
+
+@pytest.fixture(autouse=True)
+def _active_env(request):
+    if "test_env" not in request.fixturenames:
+        yield
+        return
+    from utils.config import use_env
+
+    use_env(request.getfixturevalue("test_env"))
+    yield
+    use_env(None)
+
+
 @pytest.fixture(scope="session")
-def base_url(pytestconfig):
+def base_url(pytestconfig, test_env):
+    if _matrix_envs(pytestconfig):
+        from utils.config import get_settings
+
+        return get_settings(test_env).base_url
     return pytestconfig.getoption("--base-url")
 
 @pytest.fixture(scope="session")
@@ -51,3 +96,1018 @@ def goto_base(page, base_url):
         url = base_url.rstrip("/") + path
         return page.goto(url, wait_until="domcontentloaded")
     return _go
+
+
+# ---------- options ----------
+def pytest_addoption(parser):
+    parser.addoption(
+        "--envs",
+        action="store",
+        default=os.getenv("ENVS", ""),
+        help="Comma-separated environments to run every browser test against, e.g. dev,staging,prod",
+    )
+    parser.addoption(
+        "--auth-cache-dir",
+        action="store",
+        default=os.getenv("AUTH_CACHE_DIR", ".auth"),
+        help="Directory for cached authenticated storage states",
+    )
+    parser.addoption(
+        "--auth-ttl",
+        action="store",
+        type=int,
+        default=int(os.getenv("AUTH_TTL", "1800")),
+        help="Seconds a cached storage state is reused before logging in again",
+    )
+    parser.addoption(
+        "--overlay-guard",
+        action="store",
+        choices=["on", "off"],
+        default=os.getenv("OVERLAY_GUARD", "on"),
+        help="Auto-dismiss Insider/marketing overlays in every context via an init script (app modals are left alone)",
+    )
+    parser.addoption(
+        "--network-profile",
+        action="store",
+        choices=["full", "no-media", "no-analytics", "no-media-analytics", "first-party-only", "custom"],
+        default=os.getenv("NETWORK_PROFILE", "full"),
+        help="Request blocking profile applied to every context: no-media (images/media/fonts), "
+             "no-analytics (marketing/analytics hosts), no-media-analytics (both), "
+             "first-party-only (media and every third-party host), custom (<ENV>_NETWORK_ALLOW/DENY only)",
+    )
+    parser.addoption(
+        "--learn-network-sizes",
+        action="store_true",
+        default=False,
+        help="Record served response sizes to .network/sizes.json under --network-profile=full. "
+             "Blocked requests never get a response, so their bytes are priced only from sizes learned "
+             "in a run that let them through (like this one); the rest are per-type estimates",
+    )
+    parser.addoption(
+        "--network-mode",
+        action="store",
+        choices=["live", "record", "replay"],
+        default=os.getenv("NETWORK_MODE", "live"),
+        help="live: real network; record: write one HAR per test; replay: serve only from HARs",
+    )
+    parser.addoption(
+        "--har-dir",
+        action="store",
+        default=os.getenv("HAR_DIR", ".har"),
+        help="Root directory for HAR archives (one sub-directory per TEST_ENV)",
+    )
+    parser.addoption(
+        "--har-strict",
+        action="store_true",
+        default=False,
+        help="In replay mode, fail a test that made requests missing from its HAR",
+    )
+    parser.addoption(
+        "--context-pool",
+        action="store",
+        type=int,
+        default=int(os.getenv("CONTEXT_POOL", "0")),
+        help="Keep N warm contexts per worker and reset them between tests (0 = off)",
+    )
+    parser.addoption(
+        "--context-max-uses",
+        action="store",
+        type=int,
+        default=50,
+        help="Retire a pooled context after this many tests",
+    )
+    parser.addoption(
+        "--context-max-heap-mb",
+        action="store",
+        type=float,
+        default=None,
+        help="Retire a pooled context once its JS heap exceeds this size (Chromium only)",
+    )
+    parser.addoption(
+        "--timings",
+        action="store_true",
+        default=os.getenv("TIMINGS", "false").lower() == "true",
+        help="Record nested timing spans for HomePage/Loginpage methods",
+    )
+    parser.addoption(
+        "--timings-dir",
+        action="store",
+        default=".timings",
+        help="Root directory for per-run span JSONL files",
+    )
+    parser.addoption(
+        "--bench",
+        action="store_true",
+        default=False,
+        help="Run the tests/bench suite against the local stand-in storefront",
+    )
+    parser.addoption("--bench-runs", action="store", type=int, default=20, help="Measured iterations per benchmark")
+    parser.addoption(
+        "--bench-baseline",
+        action="store",
+        default=".bench/baseline.json",
+        help="Stored p50/p95/p99 baseline file",
+    )
+    parser.addoption(
+        "--bench-threshold",
+        action="store",
+        type=float,
+        default=0.25,
+        help="Fail a benchmark whose p95 exceeds its baseline by more than this fraction",
+    )
+    parser.addoption(
+        "--update-bench-baseline",
+        action="store_true",
+        default=False,
+        help="Write this run's results as the new baseline instead of comparing",
+    )
+    parser.addoption(
+        "--sched",
+        action="store",
+        choices=["default", "history"],
+        default=os.getenv("SCHED", "default"),
+        help="xdist scheduling: history = longest-first from past durations, with login/env affinity",
+    )
+    parser.addoption(
+        "--duration-history",
+        action="store",
+        default=".sched/durations.json",
+        help="Per-test duration history file, updated every run",
+    )
+    parser.addoption(
+        "--strategy-cache",
+        action="store",
+        default=os.getenv("STRATEGY_CACHE", ".strategies/registry.json"),
+        help="Learned fallback-strategy order per (chain, env, site build); empty = in-memory only",
+    )
+    parser.addoption(
+        "--vitals",
+        action="store_true",
+        default=os.getenv("VITALS", "false").lower() == "true",
+        help="Capture Core Web Vitals / navigation timing after every HomePage/Loginpage goto",
+    )
+    parser.addoption("--vitals-dir", action="store", default=".vitals", help="Root of the per-env/page JSONL store")
+    parser.addoption(
+        "--vitals-budgets",
+        action="store",
+        default="perf_budgets.json",
+        help="Per-page budgets: a 'default' section overridden by per-env sections",
+    )
+    parser.addoption(
+        "--vitals-budget-mode",
+        action="store",
+        choices=["warn", "fail"],
+        default=os.getenv("VITALS_BUDGET_MODE", "warn"),
+        help="What a budget violation does: emit a warning or fail the test",
+    )
+    parser.addoption(
+        "--adaptive-timeouts",
+        action="store",
+        choices=["on", "record", "off"],
+        default=os.getenv("ADAPTIVE_TIMEOUTS", "on"),
+        help="Page-object timeouts from observed latency (on), learn only (record), or fixed literals (off)",
+    )
+    parser.addoption(
+        "--timeout-history",
+        action="store",
+        default=".timeouts/latency.json",
+        help="Per-env success latencies of named page-object actions",
+    )
+    parser.addoption(
+        "--impact-record",
+        action="store_true",
+        default=False,
+        help="Record which pages/utils functions and selectors each test exercises",
+    )
+    parser.addoption("--impact-index", action="store", default=".impact/index.json", help="Test-impact index file")
+    parser.addoption(
+        "--affected-since",
+        action="store",
+        default=None,
+        metavar="GIT_REF",
+        help="Only run tests affected by pages/ and utils/ changes since GIT_REF (full suite if unsure)",
+    )
+    parser.addoption(
+        "--emulation",
+        action="store",
+        default=os.getenv("EMULATION", "none"),
+        help="Device/network/CPU profile(s), comma-separated to run each browser test under each: "
+        "none|4g-id|slow-3g|low-end-android",
+    )
+    parser.addoption(
+        "--js-profile",
+        action="store_true",
+        default=os.getenv("JS_PROFILE", "false").lower() == "true",
+        help="Chromium: record a CDP CPU profile and JS/CSS coverage of each test's page",
+    )
+    parser.addoption("--js-profile-dir", action="store", default=".jsprofile", help="Root for per-run .cpuprofile/report files")
+    parser.addoption(
+        "--account-leases",
+        action="store",
+        choices=["on", "off"],
+        default=os.getenv("ACCOUNT_LEASES", "on"),
+        help="Lease each login test an exclusive account from the env's pool (<ENV>_ACCOUNTS_FILE)",
+    )
+    parser.addoption("--lease-dir", action="store", default=".leases", help="Cross-process account lease tables")
+    parser.addoption("--lease-ttl", action="store", type=float, default=600, help="Seconds before an unreleased lease expires")
+    parser.addoption(
+        "--lease-wait",
+        action="store",
+        type=float,
+        default=300,
+        help="Seconds a test waits for a free account before failing",
+    )
+    parser.addoption(
+        "--browser-servers",
+        action="store",
+        default=os.getenv("BROWSER_SERVERS", "0"),
+        help="With -n: browser servers the controller shares between workers (N, 'auto' = 1 per 8 workers, 0 = own browser per worker)",
+    )
+
+
+# ---------- timing spans ----------
+def pytest_configure(config):
+    from utils import strategies
+
+    strategies.configure(config.getoption("--strategy-cache") or None)
+    from utils import timeouts
+
+    timeouts.configure(config.getoption("--timeout-history") or None, mode=config.getoption("--adaptive-timeouts"))
+    if config.getoption("--vitals"):
+        _enable_vitals(config)
+    if config.getoption("--impact-record"):
+        from utils.impact import Recorder
+
+        config._impact_recorder = Recorder(config.rootpath)
+        config._impact_recorder.start()
+    _start_browser_servers(config)
+    if config.getoption("--js-profile"):
+        from utils import timing
+
+        # Resolved on the controller first so the workers inherit the same run id.
+        config._js_profile_dir = timing.default_run_dir(config.getoption("--js-profile-dir"))
+    if not config.getoption("--timings"):
+        return
+    from pages.home_page import HomePage
+    from pages.login_page import Loginpage
+    from utils import timing
+
+    run_dir = timing.default_run_dir(config.getoption("--timings-dir"))
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if worker or not config.getoption("numprocesses", default=None):
+        timing.enable(run_dir / f"{worker or 'main'}.jsonl")
+        timing.instrument(HomePage, Loginpage)
+    config._timings_run_dir = run_dir
+
+
+def _start_browser_servers(config):
+    """On the xdist controller, before workers spawn: start the shared servers and publish them."""
+    workers = config.getoption("numprocesses", default=None)
+    raw = config.getoption("--browser-servers")
+    if os.getenv("PYTEST_XDIST_WORKER") or not isinstance(workers, int) or workers < 1 or raw in ("0", "off", ""):
+        return
+    from utils.browser_server import REGISTRY_ENV, ServerFleet
+
+    count = max(1, workers // 8) if raw == "auto" else min(int(raw), workers)
+    name = config.getoption("--browser") or "chromium"
+    name = name[0] if isinstance(name, list) else name
+    launch = {"headless": not config.getoption("--headed")}
+    if config.getoption("--browser-channel", default=None):
+        launch["channel"] = config.getoption("--browser-channel")
+    registry = config.rootpath / ".browsers" / f"servers.{os.getpid()}.json"
+    try:
+        config._browser_fleet = ServerFleet(count, name, launch, registry).start()
+    except RuntimeError as exc:
+        import warnings
+
+        warnings.warn(f"shared browser servers unavailable, workers launch their own: {exc}")
+        return
+    config._browser_workers = workers
+    os.environ[REGISTRY_ENV] = str(registry)  # inherited by the workers xdist spawns next
+
+
+def _enable_vitals(config):
+    from pages.home_page import HomePage
+    from pages.login_page import Loginpage
+    from utils import vitals
+
+    vitals.enable(
+        config.getoption("--vitals-dir"),
+        config.getoption("--vitals-budgets"),
+        config.getoption("--vitals-budget-mode"),
+    )
+    vitals.instrument(HomePage, "home")
+    vitals.instrument(Loginpage, "login")
+
+
+def pytest_unconfigure(config):
+    from utils import timing, vitals
+
+    if getattr(config, "_impact_recorder", None):
+        config._impact_recorder.stop()
+    timing.disable()
+    vitals.disable()
+    fleet = getattr(config, "_browser_fleet", None)
+    if fleet:
+        from utils.browser_server import REGISTRY_ENV
+
+        fleet.stop()
+        os.environ.pop(REGISTRY_ENV, None)
+
+
+def pytest_runtest_setup(item):
+    from utils import timing, vitals
+
+    if timing.tracer():
+        timing.tracer().begin_test(item.nodeid)
+    if vitals.collector():
+        vitals.collector().begin_test(item.nodeid)
+    affinity = _sched_affinity(item)
+    if affinity:
+        item.user_properties.append(("sched_affinity", affinity))
+    from utils import strategies
+
+    item.stash[_STRATEGY_SAVED_KEY] = strategies.registry().stats.saved_ms
+    recorder = getattr(item.config, "_impact_recorder", None)
+    if recorder:
+        recorder.push()
+        item.stash[_IMPACT_KEY] = True
+
+
+_STRATEGY_SAVED_KEY = pytest.StashKey[float]()
+_IMPACT_KEY = pytest.StashKey[bool]()
+
+
+# ---------- test-impact index ----------
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    recorder = getattr(request.config, "_impact_recorder", None)
+    if recorder:
+        recorder.push()
+    yield
+    if recorder:
+        recorder.pop_fixture(fixturedef.argname)
+
+
+def pytest_collection_modifyitems(config, items):
+    ref = config.getoption("--affected-since")
+    if not ref:
+        return
+    from utils.impact import ImpactIndex, select
+
+    selected, reason = select([i.nodeid for i in items], ImpactIndex(config.getoption("--impact-index")), ref, config.rootpath)
+    if selected is None:
+        config._impact_report = f"running the full suite: {reason}"
+        return
+    deselected = [i for i in items if i.nodeid not in selected]
+    items[:] = [i for i in items if i.nodeid in selected]
+    config.hook.pytest_deselected(items=deselected)
+    config._impact_report = f"{len(items)} affected test(s) selected, {len(deselected)} deselected ({reason})"
+
+
+# ---------- duration-history scheduling ----------
+_AUTH_FIXTURES = {"auth_state", "authenticated_context", "authenticated_page", "api_logged_in_page"}
+
+
+def _sched_affinity(item) -> str | None:
+    """Tests sharing a key share per-worker state (env fixtures, cached login)."""
+    callspec = getattr(item, "callspec", None)
+    env = callspec.params.get("test_env") if callspec else None
+    if _AUTH_FIXTURES & set(getattr(item, "fixturenames", ())):
+        marker = item.get_closest_marker("login_mode")
+        mode = marker.args[0] if marker else "phone"
+        return f"{env or os.getenv('TEST_ENV') or '-'}/{mode}"
+    return env
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    if config.getoption("--sched") != "history":
+        return None
+    from utils.scheduler import HistoryScheduling
+
+    config._history_sched = HistoryScheduling(config, log, history=_duration_history(config))
+    return config._history_sched
+
+
+def _duration_history(config):
+    if not hasattr(config, "_duration_history"):
+        from utils.scheduler import DurationHistory
+
+        config._duration_history = DurationHistory(config.getoption("--duration-history"))
+    return config._duration_history
+
+
+_TEST_SECONDS = None  # DurationTally, created on first report
+_TEST_AFFINITY: dict = {}
+
+
+def pytest_sessionfinish(session):
+    from utils import strategies
+
+    strategies.registry().save()
+    from utils import timeouts
+
+    timeouts.policy().save()
+    if _IMPACT and not os.getenv("PYTEST_XDIST_WORKER"):
+        from utils.impact import ImpactIndex, _git
+
+        index = ImpactIndex(session.config.getoption("--impact-index"))
+        for nodeid, entry in _IMPACT.items():
+            index.record(nodeid, entry)
+        try:
+            head = _git("rev-parse", "HEAD", cwd=session.config.rootpath).strip()
+        except Exception:
+            head = None
+        index.save(head)
+    # Only the controller (or a plain single-process run) owns the history file.
+    durations = _TEST_SECONDS.durations() if _TEST_SECONDS else {}
+    if not durations or os.getenv("PYTEST_XDIST_WORKER"):
+        return
+    history = _duration_history(session.config)
+    for nodeid, seconds in durations.items():
+        history.record(nodeid, seconds, _TEST_AFFINITY.get(nodeid))
+    history.save()
+
+
+def pytest_runtest_teardown(item):
+    from utils import strategies, timing, vitals
+
+    if vitals.collector():
+        for record in vitals.collector().end_test():
+            item.user_properties.append(("vitals", record))
+    if _BROWSER_SETUP and not _BROWSER_SETUP.get("reported"):
+        _BROWSER_SETUP["reported"] = True
+        item.user_properties.append(("browser_setup", {k: v for k, v in _BROWSER_SETUP.items() if k != "reported"}))
+    if item.stash.get(_IMPACT_KEY, False):
+        item.user_properties.append(("impact", item.config._impact_recorder.pop_test(item.fixturenames)))
+    saved = strategies.registry().stats.saved_ms - item.stash.get(_STRATEGY_SAVED_KEY, 0.0)
+    if saved:
+        item.user_properties.append(("strategy_saved_ms", round(saved, 1)))
+    if not timing.tracer():
+        return
+    spans = timing.tracer().end_test()
+    try:
+        import allure
+    except ImportError:
+        return
+    if spans:
+        allure.attach(json.dumps(spans, indent=1), name="timing-spans", attachment_type=allure.attachment_type.JSON)
+
+
+# ---------- context setup ----------
+def _prepare_context(context, pytestconfig):
+    """Applied to every context created through ``new_context`` (incl. ``context``)."""
+    from pages.overlays import OverlayDismisser
+
+    # Always watch overlays (page objects skip dismissal when none are shown);
+    # --overlay-guard only decides whether the page also closes them itself.
+    OverlayDismisser.install(context, auto_dismiss=pytestconfig.getoption("--overlay-guard") == "on")
+    if pytestconfig.getoption("--vitals"):
+        from utils.vitals import VitalsCollector
+
+        VitalsCollector.install(context)
+    return context
+
+
+@pytest.fixture(scope="session")
+def network_sizes(pytestconfig, network_profile):
+    """Learned response sizes, or None when nothing is blocked and learning wasn't asked for.
+
+    Only served responses are learned, so a blocking run adds just the URLs it let through.
+    """
+    if network_profile.name == "full" and not pytestconfig.getoption("--learn-network-sizes"):
+        yield None
+        return
+    from utils.network import SizeTable
+
+    sizes = SizeTable(".network/sizes.json")
+    yield sizes
+    sizes.save()
+
+
+@pytest.fixture(scope="session")
+def network_profile(pytestconfig, test_env):
+    from utils.network import resolve_profile
+
+    name = pytestconfig.getoption("--network-profile")
+    if name == "full":
+        return resolve_profile(name)
+    from utils.config import get_settings
+
+    env_settings = get_settings(test_env)
+    return resolve_profile(name, allow=env_settings.network_allow, deny=env_settings.network_deny)
+
+
+@pytest.fixture(scope="session")
+def har_archive(pytestconfig, test_env):
+    if pytestconfig.getoption("--network-mode") == "live":
+        return None
+    from utils.config import default_env
+    from utils.har import HarArchive
+
+    # Only the env name: replay must run offline without the env's credentials.
+    return HarArchive(pytestconfig.getoption("--har-dir"), test_env or default_env())
+
+
+@pytest.fixture
+def emulation(request, pytestconfig):
+    """The test's emulation profile: its marker, its --emulation matrix value, or the single --emulation."""
+    from utils import timeouts
+    from utils.emulation import resolve, use
+
+    marker = request.node.get_closest_marker("emulation")
+    name = marker.args[0] if marker else getattr(request, "param", None) or _emulation_names(pytestconfig)[0]
+    profile = resolve(name)
+    # Timeouts and vitals key their history by the active profile, so throttled
+    # latencies don't loosen normal timeouts or budgets.
+    use(profile.name)
+    first_timeout = len(timeouts.policy().timed_out)
+    yield profile
+    use(None)
+    request.node.user_properties.append((
+        "emulation",
+        {
+            "profile": profile.name,
+            "test": _without_param(request.node.nodeid, name),
+            "timed_out": timeouts.policy().timed_out[first_timeout:],
+        },
+    ))
+
+
+def _without_param(nodeid: str, value: str) -> str:
+    """``test_x[chromium-4g-id]`` -> ``test_x[chromium]`` so one test's runs line up across profiles."""
+    base, sep, params = nodeid.partition("[")
+    if not sep:
+        return nodeid
+    ids = params[:-1]
+    for candidate in (f"-{value}", f"{value}-", value):
+        if candidate in ids:
+            ids = ids.replace(candidate, "", 1)
+            break
+    return f"{base}[{ids}]" if ids else base
+
+
+@pytest.fixture
+def new_context(new_context, pytestconfig, request, base_url, network_profile, network_sizes, har_archive,
+                emulation, browser):
+    from utils.emulation import apply as apply_emulation
+    from utils.network import NetworkBlocker, first_party_hosts
+
+    mode = pytestconfig.getoption("--network-mode")
+    blockers = []
+    unmatched: list[str] = []
+    request.node.stash[_HAR_UNMATCHED_KEY] = unmatched
+
+    def _new_context(**kwargs):
+        index = len(blockers)
+        kwargs = {**emulation.context_kwargs(browser.browser_type.name), **kwargs}
+        if mode == "record":
+            kwargs = {**har_archive.record_kwargs(request.node.nodeid, index), **kwargs}
+        context = _prepare_context(new_context(**kwargs), pytestconfig)
+        apply_emulation(context, emulation, browser.browser_type.name)
+        if mode == "replay":
+            har = har_archive.path_for(request.node.nodeid, index)
+            if not har.exists():
+                pytest.skip(f"no HAR recording at {har}; run once with --network-mode=record")
+            har_archive.attach_replay(context, har, unmatched)
+        blocker = NetworkBlocker(network_profile, first_party_hosts(base_url or ""), network_sizes)
+        blocker.attach(context)
+        blockers.append(blocker)
+        return context
+
+    yield _new_context
+    _report_blocked(request, network_profile, blockers)
+    if unmatched:
+        request.node.user_properties.append(("har_unmatched", unmatched))
+        print(f"[har] {len(unmatched)} request(s) not in recording:", *unmatched[:10], sep="\n  ")
+
+
+_HAR_UNMATCHED_KEY = pytest.StashKey[list]()
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    # --har-strict fails the test itself (a FAILED, not a teardown ERROR), and
+    # only when its body passed, so a real assertion isn't masked.
+    result = yield
+    unmatched = item.stash.get(_HAR_UNMATCHED_KEY, None)
+    if unmatched and item.config.getoption("--har-strict"):
+        pytest.fail(f"{len(unmatched)} request(s) missing from HAR (first: {unmatched[0]})")
+    return result
+
+
+def _report_blocked(request, profile, blockers) -> None:
+    if profile.name == "full" or not blockers:
+        return
+    totals = {"profile": profile.name, "requests": 0, "bytes": 0, "estimated_bytes": 0}
+    for b in blockers:
+        for k in ("requests", "bytes", "estimated_bytes"):
+            totals[k] += getattr(b.stats, k)
+    request.node.user_properties.append(("network_blocked", totals))
+
+
+# ---------- shared browser servers ----------
+_BROWSER_SETUP: dict = {}
+
+
+@pytest.fixture(scope="session")
+def browser(launch_browser, browser_type):
+    """A connection to this worker's shared browser server if the controller started any, else our own."""
+    import time
+
+    from utils.browser_server import REGISTRY_ENV, SharedBrowser, process_tree_rss, read_registry
+
+    registry = os.getenv(REGISTRY_ENV)
+    started = time.perf_counter()
+    if registry and os.path.exists(registry) and read_registry(registry)["browser"] == browser_type.name:
+        b = SharedBrowser(browser_type, registry, os.getenv("PYTEST_XDIST_WORKER"))
+        mode = f"shared #{b.slot}"
+    else:
+        b = launch_browser()
+        mode = "own"
+    # Worker tree RSS: includes the browser when launched here, only the driver when shared.
+    _BROWSER_SETUP.update(mode=mode, seconds=round(time.perf_counter() - started, 3), rss=process_tree_rss(os.getpid()))
+    yield b
+    if isinstance(b, SharedBrowser):
+        _BROWSER_SETUP["reconnects"] = b.connects - 1
+    b.close()
+
+
+# ---------- warm context pool ----------
+@pytest.fixture(scope="session")
+def context_pool(pytestconfig, browser, browser_context_args, context_kwargs):
+    size = pytestconfig.getoption("--context-pool")
+    # HAR recording is fixed at context creation, so it can't share pooled contexts.
+    if not size or pytestconfig.getoption("--network-mode") != "live":
+        yield None
+        return
+    from utils.context_pool import ContextPool
+
+    pool = ContextPool(
+        browser,
+        {**browser_context_args, **context_kwargs},
+        size=size,
+        max_uses=pytestconfig.getoption("--context-max-uses"),
+        max_heap_mb=pytestconfig.getoption("--context-max-heap-mb"),
+        prepare=lambda c: _prepare_context(c, pytestconfig),
+    )
+    yield pool
+    pool.close()
+    print(f"\n[context-pool] {pool.stats.summary()}")
+
+
+@pytest.fixture
+def _pooled_slot(context_pool, request, base_url, network_profile, network_sizes, emulation):
+    # Device emulation is fixed at context creation, so emulated tests get fresh contexts.
+    if context_pool is None or emulation.name != "none":
+        yield None
+        return
+    from utils.network import NetworkBlocker, first_party_hosts
+
+    slot = context_pool.acquire()
+    blocker = NetworkBlocker(network_profile, first_party_hosts(base_url or ""), network_sizes)
+    blocker.attach(slot.context)
+    yield slot
+    _report_blocked(request, network_profile, [blocker])
+    blocker.detach(slot.context)
+    context_pool.release(slot)
+
+
+@pytest.fixture
+def context(_pooled_slot, request):
+    if _pooled_slot is None:
+        return request.getfixturevalue("new_context")()
+    return _pooled_slot.context
+
+
+@pytest.fixture
+def page(_pooled_slot, context, pytestconfig, request, base_url):
+    page = context.new_page() if _pooled_slot is None else _pooled_slot.page
+    if not pytestconfig.getoption("--js-profile"):
+        yield page
+        return
+    yield from _js_profiled(page, pytestconfig, request, base_url)
+
+
+def _js_profiled(page, pytestconfig, request, base_url):
+    import re
+    import warnings
+
+    from utils.jsprofile import js_profile
+    from utils.network import first_party_hosts
+
+    browser = page.context.browser
+    if browser is None or browser.browser_type.name != "chromium":
+        warnings.warn("--js-profile needs Chromium; not profiling")
+        yield page
+        return
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", request.node.nodeid).strip("_")
+    with js_profile(page, name, pytestconfig._js_profile_dir, first_party_hosts(base_url or "")) as profiler:
+        yield page
+    request.node.user_properties.append(("js_profile", profiler.report))
+
+
+_NETWORK_TOTALS: list = []
+_HAR_UNMATCHED: list = []
+_BENCH_ROWS: list = []
+_STRATEGY_SAVED: list = []
+_VITALS: list = []
+_IMPACT: dict = {}
+_WORKER_BROWSERS: list = []
+_ACCOUNT_LEASES: list = []
+_EMULATION_RUNS: list = []
+_JS_PROFILES: list = []
+_CALL_RESULTS: dict = {}
+
+
+def pytest_runtest_logreport(report):
+    global _TEST_SECONDS
+    if not os.getenv("PYTEST_XDIST_WORKER"):
+        if _TEST_SECONDS is None:
+            from utils.scheduler import DurationTally
+
+            _TEST_SECONDS = DurationTally()
+        _TEST_SECONDS.add(report.nodeid, report.when, report.duration, report.skipped)
+    if report.when == "call":
+        _CALL_RESULTS[report.nodeid] = (report.duration, report.outcome)
+    if report.when != "teardown":
+        return
+    call = _CALL_RESULTS.pop(report.nodeid, None)
+    affinity = dict(report.user_properties).get("sched_affinity")
+    if affinity:
+        _TEST_AFFINITY[report.nodeid] = affinity
+    for name, value in report.user_properties:
+        if name == "network_blocked":
+            _NETWORK_TOTALS.append((report.nodeid, value))
+        elif name == "har_unmatched":
+            _HAR_UNMATCHED.append((report.nodeid, value))
+        elif name == "bench":
+            _BENCH_ROWS.append(value)
+        elif name == "strategy_saved_ms":
+            _STRATEGY_SAVED.append(value)
+        elif name == "vitals":
+            _VITALS.append(value)
+        elif name == "impact":
+            _IMPACT[report.nodeid] = value
+        elif name == "browser_setup":
+            _WORKER_BROWSERS.append(value)
+        elif name == "account_lease":
+            _ACCOUNT_LEASES.append(value)
+        elif name == "js_profile":
+            _JS_PROFILES.append(value)
+        elif name == "emulation" and call:
+            _EMULATION_RUNS.append({**value, "seconds": call[0], "outcome": call[1]})
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    from utils import timeouts
+
+    adapted = timeouts.policy().report()
+    if adapted and config.getoption("--adaptive-timeouts") == "on":
+        terminalreporter.section("adaptive timeouts (default -> learned)")
+        for line in adapted:
+            terminalreporter.write_line(line)
+    if _JS_PROFILES:
+        from utils import jsprofile
+
+        terminalreporter.section(f"page JS profile by origin ({config._js_profile_dir})")
+        for line in jsprofile.summarize(_JS_PROFILES):
+            terminalreporter.write_line(line)
+    if any(r["profile"] != "none" for r in _EMULATION_RUNS):
+        from utils.emulation import summarize
+
+        terminalreporter.section("emulation profiles (call duration)")
+        for line in summarize(_EMULATION_RUNS):
+            terminalreporter.write_line(line)
+    if _ACCOUNT_LEASES:
+        from utils.accounts import summarize
+
+        terminalreporter.section(f"account leases ({config.getoption('--lease-dir')})")
+        for line in summarize(_ACCOUNT_LEASES):
+            terminalreporter.write_line(line)
+    fleet = getattr(config, "_browser_fleet", None)
+    if fleet or len(_WORKER_BROWSERS) > 1:
+        terminalreporter.section("browser processes")
+        if fleet:
+            for line in fleet.report(config._browser_workers):
+                terminalreporter.write_line(line)
+        seconds = sum(w["seconds"] for w in _WORKER_BROWSERS)
+        rss = sum(w["rss"] or 0 for w in _WORKER_BROWSERS)
+        modes = sorted({w["mode"].split(" #")[0] for w in _WORKER_BROWSERS})
+        terminalreporter.write_line(
+            f"{len(_WORKER_BROWSERS)} worker(s) [{'/'.join(modes)}]: browser setup {seconds:.1f}s total, "
+            f"worker RSS {rss / 2**20:.0f} MiB"
+        )
+    if getattr(config, "_impact_report", None):
+        terminalreporter.section("test impact")
+        terminalreporter.write_line(config._impact_report)
+    if _IMPACT:
+        terminalreporter.section("test impact")
+        terminalreporter.write_line(f"recorded {len(_IMPACT)} test(s) into {config.getoption('--impact-index')}")
+    if _VITALS:
+        from utils import vitals
+
+        terminalreporter.section(f"core web vitals (medians, {config.getoption('--vitals-dir')})")
+        for line in vitals.summarize(_VITALS):
+            terminalreporter.write_line(line)
+        for record in _VITALS:
+            for violation in record["violations"]:
+                terminalreporter.write_line(f"over budget: {violation} ({record['test']})")
+    if _STRATEGY_SAVED:
+        terminalreporter.section("fallback strategy cache")
+        terminalreporter.write_line(
+            f"learned strategy order skipped ~{sum(_STRATEGY_SAVED) / 1000:.1f}s of failing fallbacks "
+            f"in {len(_STRATEGY_SAVED)} test(s)"
+        )
+    sched = getattr(config, "_history_sched", None)
+    if sched and sched.makespan_report():
+        terminalreporter.section("history scheduler")
+        terminalreporter.write_line(sched.makespan_report())
+    if _BENCH_ROWS:
+        terminalreporter.section("benchmarks")
+        for row in _BENCH_ROWS:
+            terminalreporter.write_line(row)
+    run_dir = getattr(config, "_timings_run_dir", None)
+    if run_dir:
+        from utils import timing
+
+        timing.disable()  # flush the controller's own file before reading
+        spans = timing.load_spans(run_dir)
+        if spans:
+            terminalreporter.section(f"timing spans ({run_dir})")
+            for line in timing.summarize(spans):
+                terminalreporter.write_line(line)
+    if _HAR_UNMATCHED:
+        terminalreporter.section("har replay: unmatched requests")
+        for nodeid, urls in _HAR_UNMATCHED:
+            terminalreporter.write_line(f"{nodeid}: {len(urls)} unmatched (first: {urls[0]})")
+    if _NETWORK_TOTALS:
+        tr = terminalreporter
+        tr.section("network blocking")
+        for nodeid, v in _NETWORK_TOTALS:
+            tr.write_line(
+                f"{nodeid}: blocked {v['requests']} requests, "
+                f"{v['bytes'] / 1024:.0f} KiB known + ~{v['estimated_bytes'] / 1024:.0f} KiB estimated"
+            )
+        reqs = sum(v["requests"] for _, v in _NETWORK_TOTALS)
+        kib = sum(v["bytes"] + v["estimated_bytes"] for _, v in _NETWORK_TOTALS) / 1024
+        tr.write_line(f"total [{_NETWORK_TOTALS[0][1]['profile']}]: {reqs} requests, ~{kib:.0f} KiB avoided")
+
+
+# ---------- authenticated session cache ----------
+@pytest.fixture(scope="session")
+def auth_cache(pytestconfig):
+    from utils.auth_cache import AuthStateCache
+
+    return AuthStateCache(
+        pytestconfig.getoption("--auth-cache-dir"),
+        ttl_seconds=pytestconfig.getoption("--auth-ttl"),
+    )
+
+
+@pytest.fixture(scope="session")
+def auth_state(pytestconfig, browser, browser_context_args, auth_cache, test_env):
+    """Per-worker factory: ``auth_state(mode)`` -> path to a logged-in storage state.
+
+    The UI login runs at most once per (env, account, mode) per worker; later
+    calls reuse the file until its TTL expires or it is explicitly refreshed.
+    With ``--network-mode=replay`` nothing logs in or probes (both would open
+    unrouted contexts on the live site): a saved state is used as is, since
+    the HAR answers for the site anyway, and without one the test is skipped.
+    """
+    from pages.login_page import Loginpage
+    from utils.config import settings
+
+    def _login(mode: str, account):
+        # API form POST first; login_via_api falls back to the UI flow itself.
+        def _run(page) -> bool:
+            return _api_login(Loginpage(page, settings.login_url), account, mode)
+        return _run
+
+    resolved = {}
+    replay = pytestconfig.getoption("--network-mode") == "replay"
+
+    def _state(mode: str = "phone", *, refresh: bool = False, account=None):
+        account = account or settings.accounts[0]
+        ident = account.email if mode == "email" else f"{account.dial_code}{account.phone}"
+        key = (settings.test_env, ident, mode)
+        if replay:
+            path = auth_cache.path_for(*key)
+            if refresh or not path.exists():
+                pytest.skip("no saved login for replay; run once live or with --network-mode=record")
+            return path
+        path = resolved.get(key)
+        if refresh or path is None or auth_cache.fresh_path(*key) is None:
+            from utils.auth_cache import ensure_auth_state
+
+            path = ensure_auth_state(
+                browser,
+                auth_cache,
+                env=settings.test_env,
+                account=ident,
+                mode=mode,
+                login=_login(mode, account),
+                probe_url=settings.base_url.rstrip("/") + "/account",
+                context_args=browser_context_args,
+                force=refresh,
+            )
+            resolved[key] = path
+        return path
+
+    return _state
+
+
+def _api_login(login, account, mode: str) -> bool:
+    if mode == "email":
+        return login.login_via_api(email=account.email, password=account.password)
+    return login.login_via_api(phone=account.phone, password=account.password, dial_code=account.dial_code)
+
+
+def _login_mode(request) -> str:
+    marker = request.node.get_closest_marker("login_mode")
+    return marker.args[0] if marker else "phone"
+
+
+@pytest.fixture(scope="session")
+def account_pool(pytestconfig):
+    if pytestconfig.getoption("--account-leases") == "off":
+        return None
+    from utils.accounts import AccountPool
+
+    return AccountPool(
+        pytestconfig.getoption("--lease-dir"),
+        ttl_seconds=pytestconfig.getoption("--lease-ttl"),
+        wait_seconds=pytestconfig.getoption("--lease-wait"),
+    )
+
+
+@pytest.fixture
+def account(account_pool, request):
+    """A test account nobody else in the run is using until this test ends.
+
+    Workers get their previous account back when it's free, so its cached
+    session stays warm. With ``--account-leases=off`` this is the primary
+    settings account, unleased.
+    """
+    from utils.accounts import LeaseTimeout
+    from utils.config import settings
+
+    if account_pool is None:
+        yield settings.accounts[0]
+        return
+    env = settings.test_env
+    try:
+        lease = account_pool.acquire(env, settings.accounts, os.getenv("PYTEST_XDIST_WORKER") or "main")
+    except LeaseTimeout:
+        waited = round(account_pool.wait_seconds, 3)
+        request.node.user_properties.append(
+            ("account_lease", {"env": env, "account": None, "waited": waited, "contended": True})
+        )
+        raise
+    request.node.user_properties.append(
+        ("account_lease", {"env": env, "account": lease.key, "waited": round(lease.waited, 3), "contended": lease.contended})
+    )
+    yield lease.account
+    account_pool.release(env, lease)
+
+
+@pytest.fixture
+def authenticated_context(new_context, auth_state, account, request):
+    """A context already logged in; pick the login via ``@pytest.mark.login_mode("email")``."""
+    return new_context(storage_state=str(auth_state(_login_mode(request), account=account)))
+
+
+@pytest.fixture
+def authenticated_page(authenticated_context, new_context, auth_state, account, request):
+    from pages.login_page import Loginpage
+    from utils.config import settings
+
+    page = authenticated_context.new_page()
+    page.goto(settings.base_url.rstrip("/") + "/account", wait_until="domcontentloaded")
+    if not Loginpage(page, settings.login_url).is_logged_in():
+        # Session went stale mid-run: log in again and reopen on the new state.
+        # A fresh context restores localStorage (``origins``) too, not just cookies.
+        state = auth_state(_login_mode(request), refresh=True, account=account)
+        authenticated_context.close()
+        page = new_context(storage_state=str(state)).new_page()
+        page.goto(settings.base_url.rstrip("/") + "/account", wait_until="domcontentloaded")
+    return page
+
+
+@pytest.fixture
+def api_logged_in_page(page, account, request, pytestconfig):
+    """``page`` logged in with one HTTP form POST (no login UI); UI flow as fallback.
+
+    For tests that just need a session. Tests of the login itself should keep
+    driving ``Loginpage`` through the UI. Skipped in replay mode: the POST goes
+    through ``context.request``, which context routes (and so HARs) never see.
+    """
+    from pages.login_page import Loginpage
+    from utils.config import settings
+
+    if pytestconfig.getoption("--network-mode") == "replay":
+        pytest.skip("api_logged_in_page posts to the live site; use authenticated_page under --network-mode=replay")
+    login = Loginpage(page, settings.login_url)
+    assert _api_login(login, account, _login_mode(request)), f"Login failed, still on {page.url}"
+    return page
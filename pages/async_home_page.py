@@ -0,0 +1,67 @@
+# pages/async_home_page.py
+import re
+from contextlib import suppress
+from typing import AsyncIterator
+from playwright.async_api import Page, expect, TimeoutError as PWTimeout
+from pages.overlays import AsyncOverlayDismisser
+from pages.search_results import AsyncSearchResultsPage, Product
+from utils.timeouts import timed
+
+
+class AsyncHomePage:
+    """``playwright.async_api`` counterpart of :class:`pages.home_page.HomePage`."""
+
+    def __init__(self, page: Page, base_url: str | None):
+        self.page = page
+        self._overlays = AsyncOverlayDismisser(page)
+        base = base_url or "https://www.matahari.com"
+        if not re.match(r"^https?://", base):
+            base = "https://" + base.lstrip("/")
+        self.base_url = base.rstrip("/")
+
+    async def goto(self) -> None:
+        await self._overlays.register()
+        await self.page.goto(f"{self.base_url}/", wait_until="domcontentloaded")
+
+    async def is_loaded(self) -> bool:
+        await expect(self.page.locator("body")).to_be_visible()
+        return True
+
+    async def close_popup(self, timeout_ms: int = 0) -> None:
+        if timeout_ms:
+            with suppress(PWTimeout):
+                await self.page.locator("#ins-frameless-overlay").wait_for(state="attached", timeout=timeout_ms)
+        elif await self._overlays.nothing_showing():
+            return
+        await self._overlays.dismiss()
+
+    async def search(self, term: str) -> None:
+        await self.page.fill("input[type='search'], input[name*='search' i]", term)
+        await self.page.press("input[type='search'], input[name*='search' i]", "Enter")
+
+    async def search_products(self, term: str, *, max_pages: int | None = None,
+                              max_items: int | None = None, prune: bool = False) -> AsyncIterator[Product]:
+        await self.search(term)
+        with timed("HomePage.search.navigate", 15000) as t:
+            await self.page.wait_for_url(re.compile(r"/search"), wait_until="domcontentloaded", timeout=t)
+        results = AsyncSearchResultsPage(self.page, term, prune=prune)
+        async for product in results.iter_products(max_pages=max_pages, max_items=max_items):
+            yield product
+
+    async def go_to_login(self) -> None:
+        await self.close_popup()
+
+        account_icon = "a.site-nav__link.site-nav__link--icon.small--hide.header-account-icon"
+        try:
+            with timed("HomePage.go_to_login.click", 5000) as t:
+                await self.page.click(account_icon, timeout=t)
+        except Exception:
+            await self.close_popup()
+            await self.page.keyboard.press("Escape")
+            with timed("HomePage.go_to_login.force_click", 5000) as t:
+                await self.page.click(account_icon, force=True, timeout=t)
+
+        with timed("HomePage.go_to_login.navigate", 15000) as t:
+            await self.page.wait_for_url(re.compile(r"/account"), wait_until="domcontentloaded", timeout=t)
+
+        assert "/account" in self.page.url
@@ -0,0 +1,180 @@
+from __future__ import annotations
+import re
+from contextlib import suppress
+from playwright.async_api import Page, expect, TimeoutError as PWTimeout
+from pages.login_page import _ERROR_SELECTORS, _FORM_READY_JS
+from pages.overlays import AsyncOverlayDismisser
+from pages.snapshot import AsyncSnapshotter, PageSnapshot
+from utils.timeouts import timed
+
+try:
+    from utils.config import settings
+except Exception:
+    settings = None
+
+
+def _setting(name: str):
+    """``settings.<name>`` or None when no environment is configured."""
+    try:
+        return getattr(settings, name, None) if settings is not None else None
+    except Exception:
+        return None
+
+
+def _is_login_post(r) -> bool:
+    return r.request.method == "POST" and "/account/login" in r.url
+
+
+class AsyncLoginpage:
+    """``playwright.async_api`` counterpart of :class:`pages.login_page.Loginpage`."""
+
+    def __init__(self, page: Page, login_url: str | None = None):
+        self.page = page
+        self._overlays = AsyncOverlayDismisser(page)
+        if login_url:
+            resolved = login_url
+        elif _setting("login_url"):
+            resolved = settings.login_url
+        elif _setting("base_url"):
+            base = settings.base_url.rstrip("/")
+            resolved = f"{base}/account/login?return_url=%2Faccount"
+        else:
+            raise ValueError(
+                "Login URL not provided and config.settings not available. "
+                "Pass login_url explicitly or expose settings.login_url/base_url."
+            )
+        self.login_url = resolved.rstrip("/")
+
+        self._root           = "#CustomerLoginForm"
+        self._dial_select    = f"{self._root} #MobileCountryCode"
+        self._email_toggle   = ".btn.btn--full.btn--secondary.toggle-login"
+
+        self._phone_form = lambda: self.page.locator(f"{self._root} form").filter(
+            has=self.page.locator("#AddressPhoneNew")
+        ).first
+        self._email_form = lambda: self.page.locator(f"{self._root} form").filter(
+            has=self.page.locator("#CustomerEmail")
+        ).first
+
+        self._snap = AsyncSnapshotter(
+            page,
+            elements={"body": "body", "form": f"{self._root} form", **{sel: sel for sel in _ERROR_SELECTORS}},
+            fields={"dial_code": self._dial_select, "phone": f"{self._root} #AddressPhoneNew",
+                    "email": f"{self._root} #CustomerEmail", "password": f"{self._root} #CreatePassword"},
+            texts=_ERROR_SELECTORS,
+        )
+
+    # ---------- navigation ----------
+    async def goto(self) -> None:
+        await self._overlays.register()
+        await self.page.goto(self.login_url, wait_until="domcontentloaded")
+        with suppress(Exception):
+            with timed("Loginpage.goto.close_button", 600) as t:
+                await self.page.get_by_role("button", name=re.compile(r"close|tutup", re.I)).click(timeout=t)
+        await self._dismiss_banner_fast()
+
+    # ---------- banner handling ----------
+    async def _dismiss_banner_fast(self) -> None:
+        if await self._overlays.nothing_showing():
+            return
+        if not await self._overlays.dismiss():
+            with suppress(Exception):
+                await self.page.keyboard.press("Escape")
+
+    # ---------- page state ----------
+    async def snapshot(self, max_age_ms: float = 0) -> PageSnapshot:
+        return await self._snap.take(max_age_ms)
+
+    async def is_loaded(self) -> bool:
+        try:
+            with timed("Loginpage.is_loaded.form", 4000) as t:
+                await self.page.wait_for_function(_FORM_READY_JS, arg=f"{self._root} form", timeout=t)
+        except PWTimeout:
+            await expect(self.page.locator("body")).to_be_visible()
+        return True
+
+    # ---------- low-level actions ----------
+    async def select_dial_code(self, code: str = "+91") -> None:
+        el = self.page.locator(self._dial_select)
+        with timed("Loginpage.dial_select.visible", 4000) as t:
+            await el.wait_for(state="visible", timeout=t)
+        with suppress(Exception):
+            await el.select_option(code); return
+        with suppress(Exception):
+            await el.select_option(code.lstrip("+")); return
+        with suppress(Exception):
+            digits = re.sub(r"\D", "", code)
+            await el.select_option(label=re.compile(fr"\+?{re.escape(digits)}")); return
+        raise AssertionError(f"Could not select dial code {code}")
+
+    async def switch_to_email_login(self) -> None:
+        with suppress(Exception):
+            with timed("Loginpage.email_toggle.css", 600) as t:
+                await self.page.locator(self._email_toggle).click(timeout=t)
+            return
+        with suppress(Exception):
+            with timed("Loginpage.email_toggle.role", 800) as t:
+                await self.page.get_by_role("button", name=re.compile(r"masuk.*email", re.I)).click(timeout=t)
+
+    # ---------- helpers ----------
+    async def wait_until_logged_in(self, timeout: int | None = None) -> None:
+        if timeout is not None:
+            await self.page.wait_for_url(re.compile(r"/account(?!/login)"), timeout=timeout)
+            return
+        with timed("Loginpage.wait_until_logged_in", 9000) as t:
+            await self.page.wait_for_url(re.compile(r"/account(?!/login)"), timeout=t)
+
+    async def is_logged_in(self) -> bool:
+        url = str(self.page.url)
+        return "/account" in url and "/login" not in url
+
+    async def _submit(self, form) -> None:
+        submitted = False
+        with suppress(Exception):
+            with timed("Loginpage.login_post", 10000) as t:
+                async with self.page.expect_response(_is_login_post, timeout=t):
+                    await form.locator("button[type='submit']").click()
+                    submitted = True
+        if not submitted:
+            await form.locator("button[type='submit']").click()
+        with suppress(Exception):
+            await self.wait_until_logged_in()
+
+    async def _dump_login_errors(self) -> None:
+        try:
+            snap = await self.snapshot()
+        except Exception:
+            print("[login debug] still on:", self.page.url)
+            return
+        print("[login debug] still on:", snap.url)
+        for sel, texts in snap.visible_texts(_ERROR_SELECTORS).items():
+            print(f"[login error:{sel}]", " | ".join(texts))
+
+    # ---------- flows (return bool) ----------
+    async def login_with_phone(self, phone: str, password: str, dial_code: str = "+91") -> bool:
+        await self._dismiss_banner_fast()
+        await self.select_dial_code(dial_code)
+        form = self._phone_form()
+        await form.locator("#AddressPhoneNew").fill(phone)
+        await form.locator("#CreatePassword").fill(password)
+        await self._submit(form)
+        ok = await self.is_logged_in()
+        if not ok:
+            await self._dump_login_errors()
+        return ok
+
+    async def login_with_email(self, email: str, password: str) -> bool:
+        await self._dismiss_banner_fast()
+        await self.switch_to_email_login()
+        form = self._email_form()
+        with timed("Loginpage.email_form.email_visible", 3000) as t:
+            await form.locator("#CustomerEmail").wait_for(state="visible", timeout=t)
+        with timed("Loginpage.email_form.password_visible", 3000) as t:
+            await form.locator("#CreatePassword").wait_for(state="visible", timeout=t)
+        await form.locator("#CustomerEmail").fill(email)
+        await form.locator("#CreatePassword").fill(password)
+        await self._submit(form)
+        ok = await self.is_logged_in()
+        if not ok:
+            await self._dump_login_errors()
+        return ok
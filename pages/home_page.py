@@ -13,48 +13,67 @@
 # pages/home_page.py
 import re
 from contextlib import suppress
+from typing import Iterator
 from playwright.sync_api import Page
 from playwright.sync_api import Page, expect, TimeoutError as PWTimeout
+from pages.overlays import OverlayDismisser, overlay_state
+from pages.snapshot import PageSnapshot, Snapshotter
+from pages.search_results import Product, SearchResultsPage
+from utils.strategies import registry, strategy_key
+from utils.timeouts import call_timed, timed
+from utils.timing import note
 
 
 class HomePage:
     def __init__(self, page: Page, base_url: str | None):
         self.page = page
+        self._overlays = OverlayDismisser(page)
         base = base_url or "https://www.matahari.com"
         if not re.match(r"^https?://", base):
             base = "https://" + base.lstrip("/")
         self.base_url = base.rstrip("/")
+        self._snap = Snapshotter(
+            page,
+            elements={
+                "body": "body",
+                "search_input": "input[type='search'], input[name*='search' i]",
+                "account_icon": "a.site-nav__link.site-nav__link--icon.small--hide.header-account-icon",
+                "overlay": "#ins-frameless-overlay",
+            },
+            fields={"search": "input[type='search'], input[name*='search' i]"},
+            texts=[],
+        )
 
     def goto(self) -> None:
+        self._overlays.register()
         self.page.goto(f"{self.base_url}/", wait_until="domcontentloaded")
 
 
+    def snapshot(self, max_age_ms: float = 0) -> PageSnapshot:
+        """Visibility of header/search/overlay, search value, URL and viewport in one evaluation."""
+        return self._snap.take(max_age_ms)
+
     def is_loaded(self):
-        expect(self.page.locator("body")).to_be_visible()
+        # ``expect`` (auto-retrying) only when the snapshot doesn't already show the body.
+        if not self.snapshot().visible("body"):
+            expect(self.page.locator("body")).to_be_visible()
         return True
-    def close_popup(self, timeout_ms: int = 7000) -> None:
-        overlay = self.page.locator("#ins-frameless-overlay")
-        try:
-           
-            overlay.wait_for(state="attached", timeout=timeout_ms)
-        except PWTimeout:
-            return  
-
-       
-        try:
-            btn = self.page.locator("button[data-testid='closeButton']").first
-            if btn.is_visible():
-                btn.click(timeout=2000)
-                return
-        except Exception:
-            pass
-
-        
-        try:
-            self.page.keyboard.press("Escape")
-            self.page.wait_for_timeout(300)
-        except Exception:
-            pass
+    def close_popup(self, timeout_ms: int = 0) -> None:
+        """Close the Insider popup and any other known overlay.
+
+        Returns immediately when the overlay observer confirms nothing is
+        visible right now (never shown, or already dismissed). Overlays that
+        show up later are handled by the locator handler registered in ``goto``.
+        Pass ``timeout_ms`` to explicitly wait for ``#ins-frameless-overlay``.
+        """
+        if timeout_ms:
+            with suppress(PWTimeout):
+                self.page.locator("#ins-frameless-overlay").wait_for(state="attached", timeout=timeout_ms)
+        elif self._overlays.nothing_showing():
+            state = overlay_state(self.page)
+            note(branch="dismissed" if state.dismissed else "no-overlay")
+            return
+        self._overlays.dismiss()
 
 
     # def close_popup(self):
@@ -68,31 +87,39 @@ class HomePage:
     def search(self, term):
         self.page.fill("input[type='search'], input[name*='search' i]", term)
         self.page.press("input[type='search'], input[name*='search' i]", "Enter")
+        self._snap.invalidate()
+
+    def search_products(self, term: str, *, max_pages: int | None = None,
+                        max_items: int | None = None, prune: bool = False) -> Iterator[Product]:
+        """Search for ``term`` and lazily stream the result products (see :class:`SearchResultsPage`)."""
+        self.search(term)
+        with timed("HomePage.search.navigate", 15000) as t:
+            self.page.wait_for_url(re.compile(r"/search"), wait_until="domcontentloaded", timeout=t)
+        results = SearchResultsPage(self.page, term, prune=prune)
+        return results.iter_products(max_pages=max_pages, max_items=max_items)
+
+    def _force_click(self, selector: str) -> None:
+        # Something blocked the normal click: dismiss directly, don't trust the observer.
+        self._overlays.dismiss()
+        self.page.keyboard.press("Escape")
+        call_timed("HomePage.go_to_login.force_click", 5000,
+                   lambda t: self.page.click(selector, force=True, timeout=t))
 
     def go_to_login(self) -> None:
         self.close_popup()
 
         account_icon = "a.site-nav__link.site-nav__link--icon.small--hide.header-account-icon"
 
-        
-        try:
-            self.page.click(account_icon, timeout=5000)
-        except Exception:
-           
-            self.close_popup()
-            self.page.keyboard.press("Escape")
-            self.page.click(account_icon, force=True, timeout=5000)
-
-       
-        try:
-            self.page.wait_for_selector(
-                "form[action*='/account/login'], input[name='customer[email]']",
-                timeout=15000,
-            )
-        except PWTimeout:
-           
-            self.page.wait_for_url("**/account/**", timeout=15000)
-
-       
-        assert "/account" in self.page.url
+        winner = registry().run(strategy_key(self.page, "HomePage.go_to_login.click"), [
+            ("click", lambda: call_timed("HomePage.go_to_login.click", 5000,
+                                        lambda t: self.page.click(account_icon, timeout=t))),
+            ("dismiss-force-click", lambda: self._force_click(account_icon)),
+        ])
+        if winner is None:
+            raise AssertionError(f"Could not click the header account icon on {self.page.url}")
 
+        # Single event-driven wait on navigation instead of selector-then-URL fallbacks.
+        with timed("HomePage.go_to_login.navigate", 15000) as t:
+            self.page.wait_for_url(re.compile(r"/account"), wait_until="domcontentloaded", timeout=t)
+
+        assert "/account" in self.page.url
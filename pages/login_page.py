@@ -1,21 +1,79 @@
 from __future__ import annotations
 import re
 from contextlib import suppress
+from html.parser import HTMLParser
+from urllib.parse import urljoin
 from playwright.sync_api import Page, expect, TimeoutError as PWTimeout
+from pages.overlays import OverlayDismisser
+from pages.snapshot import PageSnapshot, Snapshotter
+from utils.strategies import registry, strategy_key
+from utils.timeouts import call_timed, timed
+from utils.timing import attempt, note
 
 try:
     from utils.config import settings
 except Exception:
     settings = None
 
+
+def _setting(name: str):
+    """``settings.<name>`` or None when no environment is configured."""
+    try:
+        return getattr(settings, name, None) if settings is not None else None
+    except Exception:
+        return None
+
+# Inline error messages the site shows next to the form.
+_ERROR_SELECTORS = [
+    ".form-message--error",
+    ".field__message--error",
+    ".errors",
+    "[data-error]",
+    "[role='alert']",
+]
+
+# Resolves once the login form is in the DOM and the body is rendered.
+_FORM_READY_JS = """
+(sel) => {
+  const r = document.body && document.body.getBoundingClientRect();
+  return !!document.querySelector(sel) && !!r && r.width > 0 && r.height > 0;
+}
+"""
+
+
+class _LoginFormParser(HTMLParser):
+    """Collects every <form> inside the page as {action, method, fields{name: value}, ids{id: name}}."""
+
+    def __init__(self):
+        super().__init__()
+        self.forms: list[dict] = []
+        self._form: dict | None = None
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "form":
+            self._form = {"action": a.get("action") or "", "method": (a.get("method") or "get").lower(), "fields": {}, "ids": {}}
+            self.forms.append(self._form)
+        elif self._form is not None and tag in ("input", "select", "textarea", "button") and a.get("name"):
+            if a.get("id"):
+                self._form["ids"][a["id"]] = a["name"]
+            if tag == "input" and (a.get("type") or "").lower() == "hidden":
+                self._form["fields"][a["name"]] = a.get("value") or ""
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._form = None
+
+
 class Loginpage:
     def __init__(self, page: Page, login_url: str | None = None):
         self.page = page
+        self._overlays = OverlayDismisser(page)
         if login_url:
             resolved = login_url
-        elif settings and getattr(settings, "login_url", None):
+        elif _setting("login_url"):
             resolved = settings.login_url
-        elif settings and getattr(settings, "base_url", None):
+        elif _setting("base_url"):
             base = settings.base_url.rstrip("/")
             resolved = f"{base}/account/login?return_url=%2Faccount"
         else:
@@ -40,97 +98,189 @@ class Loginpage:
             has=self.page.locator("#CustomerEmail")
         ).first
 
+        self._snap = Snapshotter(
+            page,
+            elements={
+                "body": "body",
+                "form": f"{self._root} form",
+                "phone_input": self._phone_input,
+                "email_input": self._email_input,
+                "email_toggle": self._email_toggle,
+                **{sel: sel for sel in _ERROR_SELECTORS},
+            },
+            fields={
+                "dial_code": self._dial_select,
+                "phone": self._phone_input,
+                "email": self._email_input,
+                "password": self._password_input,
+            },
+            texts=_ERROR_SELECTORS,
+        )
+
     # ---------- navigation ----------
     def goto(self) -> None:
+        self._overlays.register()
         self.page.goto(self.login_url, wait_until="domcontentloaded")
-        with suppress(Exception):
-            self.page.get_by_role("button", name=re.compile(r"close|tutup", re.I)).click(timeout=600)
+        self._close_start_popup()
         self._dismiss_banner_fast()
 
+    def _close_start_popup(self) -> None:
+        # Learned: on builds without this button, "no-close-button" wins and the 600 ms probe
+        # goes away. It only wins while the button really is absent (an instant count), so a
+        # build that shows it again falls through to the click instead of skipping it.
+        button = self.page.get_by_role("button", name=re.compile(r"close|tutup", re.I))
+
+        def expect_absent() -> None:
+            if button.count():
+                raise AssertionError("close button is showing")
+
+        registry().run(strategy_key(self.page, "Loginpage.goto.close"), [
+            ("role-close-button", lambda: call_timed("Loginpage.goto.close_button", 600,
+                                                     lambda t: button.click(timeout=t))),
+            ("no-close-button", expect_absent),
+        ])
+
     # ---------- banner handling ----------
     def _dismiss_banner_fast(self) -> None:
-        selectors = [
-            "span.ins-web-opt-in-reminder-close-button",
-            "[class*='ins-web-opt-in-reminder-close-button']",
-            "button:has-text('Saya Mengerti')",
-            "[aria-label='Close']",
-            ".modal__close, .popup__close, .overlay-close, .btn-close",
-        ]
-        for sel in selectors:
+        # Skip entirely when the overlay observer confirms nothing is showing.
+        if self._overlays.nothing_showing():
+            return
+        # Single evaluation per frame; Escape only as a last resort.
+        if not self._overlays.dismiss():
             with suppress(Exception):
-                self.page.locator(sel).first.click(timeout=300, force=True); return
-            for fr in self.page.frames:
-                with suppress(Exception):
-                    fr.locator(sel).first.click(timeout=300, force=True); return
-        with suppress(Exception):
-            w = self.page.evaluate("() => innerWidth")
-        with suppress(Exception):
-            h = self.page.evaluate("() => innerHeight")
-        with suppress(Exception):
-            self.page.mouse.click(int(w*0.5), int(h*0.5))
-        with suppress(Exception):
-            self.page.keyboard.press("Escape")
+                self.page.keyboard.press("Escape")
 
     # ---------- page state ----------
+    def snapshot(self, max_age_ms: float = 0) -> PageSnapshot:
+        """Visibility/errors/field values/URL/viewport of the login page in one evaluation."""
+        return self._snap.take(max_age_ms)
+
     def is_loaded(self) -> bool:
-        with suppress(PWTimeout):
-            self.page.locator(f"{self._root} form").first.wait_for(timeout=4000)
-        expect(self.page.locator("body")).to_be_visible()
+        # One polling wait covers both the form and the body; ``expect`` only
+        # runs (and reports properly) when the form never showed up.
+        try:
+            with timed("Loginpage.is_loaded.form", 4000) as t:
+                self.page.wait_for_function(_FORM_READY_JS, arg=f"{self._root} form", timeout=t)
+        except PWTimeout:
+            expect(self.page.locator("body")).to_be_visible()
         return True
 
     # ---------- low-level actions ----------
     def select_dial_code(self, code: str = "+91") -> None:
         el = self.page.locator(self._dial_select)
-        el.wait_for(state="visible", timeout=4000)
-        with suppress(Exception):
-            el.select_option(code); return
-        with suppress(Exception):
-            el.select_option(code.lstrip("+")); return
-        with suppress(Exception):
-            digits = re.sub(r"\D", "", code)
-            el.select_option(label=re.compile(fr"\+?{re.escape(digits)}")); return
-        raise AssertionError(f"Could not select dial code {code}")
+        with timed("Loginpage.dial_select.visible", 4000) as t:
+            el.wait_for(state="visible", timeout=t)
+        digits = re.sub(r"\D", "", code)
+        winner = registry().run(strategy_key(self.page, "Loginpage.select_dial_code"), [
+            ("dial-value", lambda: el.select_option(code)),
+            ("dial-value-no-plus", lambda: el.select_option(code.lstrip("+"))),
+            ("dial-label", lambda: el.select_option(label=re.compile(fr"\+?{re.escape(digits)}"))),
+        ])
+        self._snap.invalidate()
+        if winner is None:
+            raise AssertionError(f"Could not select dial code {code}")
 
     def switch_to_email_login(self) -> None:
-        with suppress(Exception):
-            self.page.locator(self._email_toggle).click(timeout=600); return
-        with suppress(Exception):
-            self.page.get_by_role("button", name=re.compile(r"masuk.*email", re.I)).click(timeout=800)
+        registry().run(strategy_key(self.page, "Loginpage.switch_to_email_login"), [
+            ("email-toggle-css", lambda: call_timed("Loginpage.email_toggle.css", 600,
+                                                    lambda t: self.page.locator(self._email_toggle).click(timeout=t))),
+            ("email-toggle-role", lambda: call_timed("Loginpage.email_toggle.role", 800, lambda t: self.page.get_by_role(
+                "button", name=re.compile(r"masuk.*email", re.I)).click(timeout=t))),
+        ])
+        self._snap.invalidate()
 
     def fill_phone(self, phone: str) -> None:
         self._phone_form().locator("#AddressPhoneNew").fill(phone)
+        self._snap.invalidate()
 
     def fill_email(self, email: str) -> None:
         self._email_form().locator("#CustomerEmail").fill(email)
+        self._snap.invalidate()
 
     def fill_password(self, password: str, *, mode: str = "phone") -> None:
         form = self._phone_form() if mode == "phone" else self._email_form()
         form.locator("#CreatePassword").fill(password)
+        self._snap.invalidate()
 
     # ---------- helpers ----------
-    def wait_until_logged_in(self, timeout: int = 9000) -> None:
-        self.page.wait_for_url(re.compile(r"/account(?!/login)"), timeout=timeout)
+    def wait_until_logged_in(self, timeout: int | None = None) -> None:
+        if timeout is not None:
+            self.page.wait_for_url(re.compile(r"/account(?!/login)"), timeout=timeout)
+            return
+        with timed("Loginpage.wait_until_logged_in", 9000) as t:
+            self.page.wait_for_url(re.compile(r"/account(?!/login)"), timeout=t)
 
     def is_logged_in(self) -> bool:
+        # ``page.url`` is tracked client-side; no protocol round trip.
         url = str(self.page.url)
         return "/account" in url and "/login" not in url
 
     def _dump_login_errors(self) -> None:
-        """Log common inline error messages shown by the site."""
-        selectors = [
-            ".form-message--error",
-            ".field__message--error",
-            ".errors",
-            "[data-error]",
-            "[role='alert']",
-        ]
-        for sel in selectors:
-            with suppress(Exception):
-                loc = self.page.locator(sel)
-                if loc.first.is_visible():
-                    texts = loc.all_inner_texts()
-                    if texts:
-                        print(f"[login error:{sel}]", " | ".join(t.strip() for t in texts if t.strip()))
+        """Log where we are and the inline error messages shown by the site (one evaluation)."""
+        try:
+            snap = self.snapshot()
+        except Exception:
+            print("[login debug] still on:", self.page.url)
+            return
+        print("[login debug] still on:", snap.url)
+        for sel, texts in snap.visible_texts(_ERROR_SELECTORS).items():
+            print(f"[login error:{sel}]", " | ".join(texts))
+
+    # ---------- API mode ----------
+    def login_via_api(
+        self,
+        *,
+        password: str,
+        phone: str | None = None,
+        email: str | None = None,
+        dial_code: str = "+91",
+        fallback_to_ui: bool = True,
+    ) -> bool:
+        """Log in with a plain form POST through ``page.context.request``.
+
+        The context's APIRequestContext shares its cookie jar with the browser
+        context, so a successful POST leaves the page logged in without
+        rendering the login UI. Hidden form tokens are scraped from one GET of
+        the login page. Falls back to the UI flow if anything goes wrong.
+        """
+        ok = False
+        with attempt("api-login"):
+            ok = self._post_login_form(password=password, phone=phone, email=email, dial_code=dial_code)
+        if ok or not fallback_to_ui:
+            return ok
+        note(branch="ui-fallback")
+        self.goto()
+        if email:
+            return self.login_with_email(email=email, password=password)
+        return self.login_with_phone(phone=phone or "", password=password, dial_code=dial_code)
+
+    def _post_login_form(self, *, password: str, phone: str | None, email: str | None, dial_code: str) -> bool:
+        request = self.page.context.request
+        resp = request.get(self.login_url)
+        if not resp.ok:
+            return False
+        parser = _LoginFormParser()
+        parser.feed(resp.text())
+        field_id = "CustomerEmail" if email else "AddressPhoneNew"
+        form = next((f for f in parser.forms if field_id in f["ids"] and f["method"] == "post"), None)
+        if form is None:
+            return False
+
+        payload = dict(form["fields"])
+        payload[form["ids"][field_id]] = email or phone or ""
+        if "CreatePassword" in form["ids"]:
+            payload[form["ids"]["CreatePassword"]] = password
+        if not email and "MobileCountryCode" in form["ids"]:
+            payload[form["ids"]["MobileCountryCode"]] = dial_code
+
+        action = urljoin(resp.url, form["action"] or self.login_url)
+        post = request.post(action, form=payload, max_redirects=0)
+        location = post.headers.get("location", "")
+        if post.status not in (301, 302, 303) or "/login" in location or "challenge" in location:
+            return False
+        # Confirm the session is accepted: /account must not bounce back to login.
+        account = request.get(urljoin(action, "/account"), max_redirects=0)
+        return account.status == 200
 
     # ---------- flows (return bool) ----------
     def login_with_phone(self, phone: str, password: str, dial_code: str = "+91") -> bool:
@@ -141,19 +291,21 @@ class Loginpage:
 
         # Try to observe the POST first (fast), then fall back to URL wait
         submitted = False
-        with suppress(Exception):
-            with self.page.expect_response(lambda r: r.request.method == "POST" and "/account/login" in r.url, timeout=10000):
+        with attempt("await-login-post"):
+            with timed("Loginpage.login_post", 10000) as t, self.page.expect_response(
+                lambda r: r.request.method == "POST" and "/account/login" in r.url, timeout=t
+            ):
                 self._phone_form().locator("button[type='submit']").click()
                 submitted = True
         if not submitted:
+            note(branch="submit-without-post-wait")
             self._phone_form().locator("button[type='submit']").click()
 
         with suppress(Exception):
-            self.wait_until_logged_in(timeout=9000)
+            self.wait_until_logged_in()
 
         ok = self.is_logged_in()
         if not ok:
-            print("[login debug] still on:", self.page.url)
             self._dump_login_errors()
         return ok
 
@@ -161,24 +313,28 @@ class Loginpage:
         self._dismiss_banner_fast()
         self.switch_to_email_login()
         email_form = self._email_form()
-        email_form.locator("#CustomerEmail").wait_for(state="visible", timeout=3000)
-        email_form.locator("#CreatePassword").wait_for(state="visible", timeout=3000)
+        with timed("Loginpage.email_form.email_visible", 3000) as t:
+            email_form.locator("#CustomerEmail").wait_for(state="visible", timeout=t)
+        with timed("Loginpage.email_form.password_visible", 3000) as t:
+            email_form.locator("#CreatePassword").wait_for(state="visible", timeout=t)
         email_form.locator("#CustomerEmail").fill(email)
         email_form.locator("#CreatePassword").fill(password)
 
         submitted = False
-        with suppress(Exception):
-            with self.page.expect_response(lambda r: r.request.method == "POST" and "/account/login" in r.url, timeout=10000):
+        with attempt("await-login-post"):
+            with timed("Loginpage.login_post", 10000) as t, self.page.expect_response(
+                lambda r: r.request.method == "POST" and "/account/login" in r.url, timeout=t
+            ):
                 email_form.locator("button[type='submit']").click()
                 submitted = True
         if not submitted:
+            note(branch="submit-without-post-wait")
             email_form.locator("button[type='submit']").click()
 
         with suppress(Exception):
-            self.wait_until_logged_in(timeout=9000)
+            self.wait_until_logged_in()
 
         ok = self.is_logged_in()
         if not ok:
-            print("[login debug] still on:", self.page.url)
             self._dump_login_errors()
         return ok
@@ -0,0 +1,278 @@
+# pages/overlays.py
+from __future__ import annotations
+
+import asyncio
+import json
+import weakref
+from contextlib import suppress
+from dataclasses import dataclass, field
+from playwright.async_api import BrowserContext as AsyncBrowserContext, Page as AsyncPage
+from playwright.sync_api import BrowserContext, Page
+
+# Close controls of the Insider/marketing overlays - the only ones the guard touches on its own.
+MARKETING_CLOSE_SELECTORS = [
+    "span.ins-web-opt-in-reminder-close-button",
+    "[class*='ins-web-opt-in-reminder-close-button']",
+    "button[data-testid='closeButton']",
+]
+# Close controls we know about (Insider opt-in reminder, generic modals); explicit ``dismiss()`` only,
+# since the generic ones also close app modals/drawers a test opened on purpose.
+CLOSE_SELECTORS = MARKETING_CLOSE_SELECTORS + [
+    "[aria-label='Close']",
+    ".modal__close, .popup__close, .overlay-close, .btn-close",
+]
+# Buttons matched by visible text (":has-text" is Playwright-only, so done in JS).
+CLOSE_TEXTS = ["Saya Mengerti"]
+# Overlay containers that swallow clicks; hidden if still visible after closing.
+OVERLAY_ROOTS = ["#ins-frameless-overlay"]
+
+_CONFIG = {"close": CLOSE_SELECTORS, "texts": CLOSE_TEXTS, "roots": OVERLAY_ROOTS}
+_GUARD_CONFIG = {"close": MARKETING_CLOSE_SELECTORS, "texts": [], "roots": OVERLAY_ROOTS}
+
+# Asks the main frame's observer what is visible right now (null: no observer yet).
+PRESENT_JS = "() => window.__overlayPresent ? window.__overlayPresent() : null"
+
+# Runs inside a single frame; returns how many overlays it closed or hid.
+DISMISS_JS = """
+(cfg) => {
+  const visible = (el) => {
+    const r = el.getBoundingClientRect();
+    const s = getComputedStyle(el);
+    return r.width > 0 && r.height > 0 && s.visibility !== 'hidden' && s.display !== 'none';
+  };
+  let closed = 0;
+  for (const sel of cfg.close) {
+    let nodes = [];
+    try { nodes = document.querySelectorAll(sel); } catch (e) { continue; }
+    for (const el of nodes) {
+      if (visible(el)) { el.click(); closed++; }
+    }
+  }
+  for (const el of document.querySelectorAll('button, [role=button]')) {
+    const text = (el.innerText || '').trim();
+    if (cfg.texts.includes(text) && visible(el)) { el.click(); closed++; }
+  }
+  for (const sel of cfg.roots) {
+    for (const el of document.querySelectorAll(sel)) {
+      if (visible(el)) { el.style.setProperty('display', 'none', 'important'); closed++; }
+    }
+  }
+  return closed;
+}
+"""
+
+# Watches the marketing overlays and reports visible/hidden transitions to Python
+# through the ``__overlayEvent`` binding; with ``cfg.auto`` it also dismisses them.
+# ``window.__overlayPresent()`` re-checks synchronously, so callers needn't wait
+# for the (asynchronous) binding events to arrive.
+_GUARD_JS = """
+(() => {
+  const cfg = %s;
+  const dismiss = %s;
+  const watched = cfg.roots.concat(cfg.close);
+  const present = {};
+  const visible = (el) => {
+    const r = el.getBoundingClientRect();
+    const s = getComputedStyle(el);
+    return r.width > 0 && r.height > 0 && s.visibility !== 'hidden' && s.display !== 'none';
+  };
+  const report = () => {
+    for (const sel of watched) {
+      let now = false;
+      try { now = Array.from(document.querySelectorAll(sel)).some(visible); } catch (e) {}
+      if (now !== !!present[sel]) {
+        present[sel] = now;
+        try { window.__overlayEvent && window.__overlayEvent(now ? 'attach' : 'detach', sel, Date.now()); } catch (e) {}
+      }
+    }
+  };
+  window.__overlayPresent = () => { report(); return watched.filter((sel) => present[sel]); };
+  let queued = false;
+  let reported = false;
+  const run = () => {
+    queued = false;
+    report();
+    if (!reported) {
+      reported = true;
+      try { window.__overlayEvent && window.__overlayEvent('ready', '', Date.now()); } catch (e) {}
+    }
+    if (cfg.auto) { try { if (dismiss(cfg)) report(); } catch (e) {} }
+  };
+  const start = () => {
+    new MutationObserver(() => {
+      if (!queued) { queued = true; setTimeout(run, 50); }
+    }).observe(document.documentElement, { childList: true, subtree: true, attributes: true, attributeFilter: ['style', 'class'] });
+    run();
+  };
+  if (document.documentElement) start();
+  else document.addEventListener('DOMContentLoaded', start, { once: true });
+})();
+"""
+
+
+def _guard_script(auto_dismiss: bool) -> str:
+    return _GUARD_JS % (json.dumps({**_GUARD_CONFIG, "auto": auto_dismiss}), DISMISS_JS.strip())
+
+
+@dataclass
+class OverlayState:
+    """What the page has told us about overlays, keyed by (frame, selector)."""
+
+    present: set = field(default_factory=set)
+    events: list = field(default_factory=list)  # (kind, selector, epoch ms)
+    ready: set = field(default_factory=set)     # id(frame) of frames whose observer has reported
+
+    @property
+    def dismissed(self) -> bool:
+        return bool(self.events) and not self.present
+
+
+_watched_contexts: "weakref.WeakSet[BrowserContext]" = weakref.WeakSet()
+_states: "weakref.WeakKeyDictionary[Page, OverlayState]" = weakref.WeakKeyDictionary()
+
+
+def overlay_state(page: Page) -> OverlayState | None:
+    """Overlay events reported so far for ``page``, or None if its context isn't being watched.
+
+    Events arrive asynchronously, so an empty ``present`` does not mean "no
+    overlay"; use :meth:`OverlayDismisser.nothing_showing` for that.
+    """
+    if page.context not in _watched_contexts:
+        return None
+    return _states.setdefault(page, OverlayState())
+
+
+def _on_overlay_event(source: dict, kind: str, selector: str, ts: float) -> None:
+    state = _states.setdefault(source["page"], OverlayState())
+    key = (id(source["frame"]), selector)
+    if kind == "ready":
+        state.ready.add(key[0])
+        return
+    if kind == "attach":
+        state.present.add(key)
+    else:
+        state.present.discard(key)
+    state.events.append((kind, selector, ts))
+
+
+def _on_frame_navigated(frame) -> None:
+    # A new document starts with no overlays; its observer reports fresh ones.
+    state = _states.get(frame.page)
+    if state:
+        state.present = {k for k in state.present if k[0] != id(frame)}
+        state.ready.discard(id(frame))
+
+
+_handled_pages: "weakref.WeakSet[Page | AsyncPage]" = weakref.WeakSet()
+
+
+class OverlayDismisser:
+    """Finds and closes every known overlay/banner without per-selector timeouts."""
+
+    def __init__(self, page: Page):
+        self.page = page
+
+    def showing(self) -> list[str] | None:
+        """Marketing overlays visible in the main frame right now (one evaluation), None if unwatched."""
+        with suppress(Exception):
+            return self.page.evaluate(PRESENT_JS)
+        return None
+
+    def nothing_showing(self) -> bool:
+        """True only if the observers positively report no marketing overlay.
+
+        The main frame (where the Insider popup lives) is asked directly; child
+        frames count only once their observer has reported in.
+        """
+        state = overlay_state(self.page)
+        if state is None or self.showing() != []:
+            return False
+        main = self.page.main_frame
+        children = [id(f) for f in self.page.frames if f is not main]
+        return all(c in state.ready for c in children) and not any(k[0] != id(main) for k in state.present)
+
+    def dismiss(self, marketing_only: bool = False) -> int:
+        """One evaluation per frame; returns the number of overlays closed.
+
+        ``marketing_only`` clicks only the marketing overlays' own close
+        controls (as the init-script guard does), never a generic "Close".
+        """
+        config = _GUARD_CONFIG if marketing_only else _CONFIG
+        closed = 0
+        for frame in self.page.frames:
+            with suppress(Exception):
+                closed += frame.evaluate(DISMISS_JS, config) or 0
+        return closed
+
+    def register(self) -> None:
+        """Let Playwright close marketing overlays right before any action they would block.
+
+        Only their own close controls: the handler fires mid-action, where a
+        generic close selector could shut the dialog the test is working in.
+        """
+        if self.page in _handled_pages:
+            return
+        _handled_pages.add(self.page)
+        with suppress(Exception):
+            self.page.add_locator_handler(
+                self.page.locator(", ".join(OVERLAY_ROOTS)),
+                lambda: self.dismiss(marketing_only=True),
+                no_wait_after=True,
+            )
+
+    @staticmethod
+    def install(context: BrowserContext, auto_dismiss: bool = True) -> None:
+        """Watch (and by default auto-dismiss) overlays in every page/frame of ``context``."""
+        context.expose_binding("__overlayEvent", _on_overlay_event)
+        context.on("page", lambda page: page.on("framenavigated", _on_frame_navigated))
+        context.add_init_script(_guard_script(auto_dismiss))
+        _watched_contexts.add(context)
+
+
+class AsyncOverlayDismisser:
+    """``playwright.async_api`` twin of :class:`OverlayDismisser`."""
+
+    def __init__(self, page: AsyncPage):
+        self.page = page
+
+    async def showing(self) -> list[str] | None:
+        with suppress(Exception):
+            return await self.page.evaluate(PRESENT_JS)
+        return None
+
+    async def nothing_showing(self) -> bool:
+        state = overlay_state(self.page)
+        if state is None or await self.showing() != []:
+            return False
+        main = self.page.main_frame
+        children = [id(f) for f in self.page.frames if f is not main]
+        return all(c in state.ready for c in children) and not any(k[0] != id(main) for k in state.present)
+
+    async def dismiss(self, marketing_only: bool = False) -> int:
+        # Frames are independent, so evaluate them concurrently.
+        config = _GUARD_CONFIG if marketing_only else _CONFIG
+        results = await asyncio.gather(
+            *(frame.evaluate(DISMISS_JS, config) for frame in self.page.frames),
+            return_exceptions=True,
+        )
+        return sum(r for r in results if isinstance(r, int))
+
+    async def register(self) -> None:
+        if self.page in _handled_pages:
+            return
+        _handled_pages.add(self.page)
+
+        async def _handler() -> None:
+            await self.dismiss(marketing_only=True)
+
+        with suppress(Exception):
+            await self.page.add_locator_handler(
+                self.page.locator(", ".join(OVERLAY_ROOTS)), _handler, no_wait_after=True
+            )
+
+    @staticmethod
+    async def install(context: AsyncBrowserContext, auto_dismiss: bool = True) -> None:
+        await context.expose_binding("__overlayEvent", _on_overlay_event)
+        context.on("page", lambda page: page.on("framenavigated", _on_frame_navigated))
+        await context.add_init_script(_guard_script(auto_dismiss))
+        _watched_contexts.add(context)
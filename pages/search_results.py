@@ -0,0 +1,207 @@
+# pages/search_results.py
+"""Search results as a lazy stream of product records.
+
+Each batch of result cards is read in ONE in-page evaluation (name, price,
+URL, availability for every card at once) instead of a locator round trip
+per field. The next batch is loaded only when the consumer asks for more:
+through the page's "next" link, or by scrolling when the listing is an
+infinite scroll (waiting up to the learned "more cards appeared" time). Extracted cards are tagged so a scroll batch only returns
+new ones; ``prune=True`` also removes them to keep the DOM small on very
+long listings.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator
+
+from playwright.async_api import Page as AsyncPage, TimeoutError as AsyncPWTimeout
+from playwright.sync_api import Page, TimeoutError as PWTimeout
+
+from utils.timeouts import timed
+
+_CONFIG = {
+    "root": "main, #MainContent, [role=main]",
+    "card": ".grid-product, .product-card, .product-item, .grid__item, [data-product-id], li",
+    "title": ".grid-product__title, .product-card__title, .product-item__title, [class*=title], h2, h3",
+    "price": "[class*=price]",
+    # Struck-through / compare-at amounts inside a price block are not the price.
+    "notPrice": "s, del, [class*=compare], [class*=original], [class*=regular], .visually-hidden",
+    "soldOut": "[class*=sold-out], [class*=soldout], [class*=sold_out]",
+    "soldOutTexts": ["sold out", "habis"],
+    "next": "a[rel=next], link[rel=next], .pagination__next a, a.pagination__next, .pagination .next a",
+}
+
+EXTRACT_JS = """
+(cfg) => {
+  const root = document.querySelector(cfg.root) || document.body;
+  const text = (el) => el ? (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim() : '';
+  const cards = new Map();
+  for (const a of root.querySelectorAll('a[href*="/products/"]')) {
+    const card = a.closest(cfg.card) || a;
+    if (!cards.has(card) && !card.hasAttribute('data-pw-extracted')) cards.set(card, a);
+  }
+  const items = [];
+  for (const [card, a] of cards) {
+    card.setAttribute('data-pw-extracted', '');
+    let price = '';
+    for (const el of card.querySelectorAll(cfg.price)) {
+      if (el.matches(cfg.notPrice)) continue;
+      const clone = el.cloneNode(true);
+      clone.querySelectorAll(cfg.notPrice).forEach((n) => n.remove());
+      const t = text(clone);
+      if (/\\d/.test(t)) { price = t; break; }
+    }
+    const body = text(card).toLowerCase();
+    const img = card.querySelector('img[alt]');
+    const url = new URL(a.getAttribute('href'), location.href);
+    url.search = ''; url.hash = '';
+    items.push({
+      name: text(card.querySelector(cfg.title)) || a.getAttribute('aria-label') || text(a) || (img ? img.alt : ''),
+      price_text: price,
+      url: url.href,
+      available: !(card.querySelector(cfg.soldOut) || cfg.soldOutTexts.some((t) => body.includes(t))),
+    });
+    if (cfg.prune) card.remove();
+  }
+  const next = document.querySelector(cfg.next);
+  return { items, next: next ? next.href : null };
+}
+"""
+
+# True once the listing has product cards that haven't been extracted yet.
+_HAS_NEW_JS = """
+(cfg) => {
+  const root = document.querySelector(cfg.root) || document.body;
+  return Array.from(root.querySelectorAll('a[href*="/products/"]'))
+    .some((a) => !(a.closest(cfg.card) || a).hasAttribute('data-pw-extracted'));
+}
+"""
+
+_SCROLL_JS = "() => window.scrollTo(0, document.documentElement.scrollHeight)"
+
+_AMOUNT = re.compile(r"\d[\d.,]*")
+
+
+def parse_price(text: str) -> float | None:
+    """First amount in ``text``: ``"Rp 199.000"`` -> 199000.0, ``"$1,299.50"`` -> 1299.5."""
+    m = _AMOUNT.search(text or "")
+    if not m:
+        return None
+    raw = m.group().rstrip(".,")
+    if "." in raw and "," in raw:
+        decimal = "." if raw.rfind(".") > raw.rfind(",") else ","
+    elif raw.count(".") == 1 and not re.fullmatch(r"\d{1,3}\.\d{3}", raw):
+        decimal = "."
+    elif raw.count(",") == 1 and not re.fullmatch(r"\d{1,3},\d{3}", raw):
+        decimal = ","
+    else:
+        decimal = None  # only thousands separators (Rp 1.299.000)
+    whole, _, frac = raw.rpartition(decimal) if decimal else (raw, "", "")
+    digits = re.sub(r"\D", "", whole)
+    return float(f"{digits}.{frac}" if frac else digits)
+
+
+@dataclass
+class Product:
+    name: str
+    price: float | None
+    price_text: str
+    url: str
+    available: bool
+    term: str | None = None
+    page: int = 1  # result page (or scroll batch) it came from
+
+
+def _products(raw: dict, term: str | None, page_no: int) -> list[Product]:
+    return [
+        Product(r["name"], parse_price(r["price_text"]), r["price_text"], r["url"], r["available"], term, page_no)
+        for r in raw["items"]
+    ]
+
+
+class SearchResultsPage:
+    """Streams products from the search results page ``page`` is on."""
+
+    def __init__(self, page: Page, term: str | None = None, *, scroll_timeout_ms: int | None = None, prune: bool = False):
+        self.page = page
+        self.term = term
+        self.scroll_timeout_ms = scroll_timeout_ms
+        self._cfg = {**_CONFIG, "prune": prune}
+
+    def extract(self, page_no: int = 1) -> tuple[list[Product], str | None]:
+        """Every not-yet-extracted card on the page, plus the "next page" URL if any."""
+        raw = self.page.evaluate(EXTRACT_JS, self._cfg)
+        return _products(raw, self.term, page_no), raw["next"]
+
+    def _scroll_for_more(self) -> bool:
+        self.page.evaluate(_SCROLL_JS)
+        try:
+            with timed("SearchResults.scroll_for_more", 3000) as t:
+                self.page.wait_for_function(_HAS_NEW_JS, arg=self._cfg, timeout=self.scroll_timeout_ms or t)
+        except PWTimeout:
+            return False
+        return True
+
+    def iter_products(self, max_pages: int | None = None, max_items: int | None = None) -> Iterator[Product]:
+        seen: set[str] = set()
+        page_no = 1
+        while True:
+            batch, next_url = self.extract(page_no)
+            for product in batch:
+                if product.url in seen:
+                    continue
+                seen.add(product.url)
+                yield product
+                if max_items and len(seen) >= max_items:
+                    return
+            if max_pages and page_no >= max_pages:
+                return
+            if next_url:
+                self.page.goto(next_url, wait_until="domcontentloaded")
+            elif not self._scroll_for_more():
+                return
+            page_no += 1
+
+
+class AsyncSearchResultsPage:
+    """``playwright.async_api`` twin of :class:`SearchResultsPage`."""
+
+    def __init__(self, page: AsyncPage, term: str | None = None, *, scroll_timeout_ms: int | None = None, prune: bool = False):
+        self.page = page
+        self.term = term
+        self.scroll_timeout_ms = scroll_timeout_ms
+        self._cfg = {**_CONFIG, "prune": prune}
+
+    async def extract(self, page_no: int = 1) -> tuple[list[Product], str | None]:
+        raw = await self.page.evaluate(EXTRACT_JS, self._cfg)
+        return _products(raw, self.term, page_no), raw["next"]
+
+    async def _scroll_for_more(self) -> bool:
+        await self.page.evaluate(_SCROLL_JS)
+        try:
+            with timed("SearchResults.scroll_for_more", 3000) as t:
+                await self.page.wait_for_function(_HAS_NEW_JS, arg=self._cfg, timeout=self.scroll_timeout_ms or t)
+        except AsyncPWTimeout:
+            return False
+        return True
+
+    async def iter_products(self, max_pages: int | None = None, max_items: int | None = None) -> AsyncIterator[Product]:
+        seen: set[str] = set()
+        page_no = 1
+        while True:
+            batch, next_url = await self.extract(page_no)
+            for product in batch:
+                if product.url in seen:
+                    continue
+                seen.add(product.url)
+                yield product
+                if max_items and len(seen) >= max_items:
+                    return
+            if max_pages and page_no >= max_pages:
+                return
+            if next_url:
+                await self.page.goto(next_url, wait_until="domcontentloaded")
+            elif not await self._scroll_for_more():
+                return
+            page_no += 1
@@ -0,0 +1,120 @@
+# pages/snapshot.py
+"""One-evaluation page state for page-object checks and debug dumps.
+
+A snapshot answers "which named elements are visible, what do they say,
+what's in the form fields, where are we, how big is the viewport" in a
+single ``page.evaluate`` instead of an ``is_visible``/``inner_text`` round
+trip per selector. Snapshots can be reused for ``max_age_ms`` while the URL
+stays the same; page objects invalidate them after their own actions.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+from playwright.async_api import Page as AsyncPage
+from playwright.sync_api import Page
+
+SNAPSHOT_JS = """
+(spec) => {
+  const visible = (el) => {
+    const r = el.getBoundingClientRect();
+    const s = getComputedStyle(el);
+    return r.width > 0 && r.height > 0 && s.visibility !== 'hidden' && s.display !== 'none';
+  };
+  const query = (sel) => { try { return Array.from(document.querySelectorAll(sel)); } catch (e) { return []; } };
+  const elements = {};
+  for (const [name, sel] of Object.entries(spec.elements)) {
+    const shown = query(sel).filter(visible);
+    elements[name] = {
+      count: shown.length,
+      texts: spec.texts.includes(name) ? shown.map((el) => (el.innerText || '').trim()).filter(Boolean) : [],
+    };
+  }
+  const fields = {};
+  for (const [name, sel] of Object.entries(spec.fields)) {
+    const el = query(sel).find(visible) || query(sel)[0];
+    if (!el) { fields[name] = null; continue; }
+    fields[name] = el.type === 'password' ? '*'.repeat((el.value || '').length) : (el.value ?? '');
+  }
+  return {
+    url: location.href,
+    title: document.title,
+    ready_state: document.readyState,
+    viewport: { width: window.innerWidth, height: window.innerHeight, scroll_y: window.scrollY },
+    elements,
+    fields,
+  };
+}
+"""
+
+
+@dataclass
+class PageSnapshot:
+    url: str
+    title: str
+    ready_state: str
+    viewport: dict
+    elements: dict = field(default_factory=dict)   # name -> {count, texts}
+    fields: dict = field(default_factory=dict)     # name -> value (passwords masked), None if absent
+    taken_at: float = 0.0
+
+    def visible(self, name: str) -> bool:
+        return self.elements.get(name, {}).get("count", 0) > 0
+
+    def texts(self, name: str) -> list[str]:
+        return self.elements.get(name, {}).get("texts", [])
+
+    def value(self, name: str) -> str | None:
+        return self.fields.get(name)
+
+    def visible_texts(self, names) -> dict[str, list[str]]:
+        """``{name: texts}`` for the given names that are visible and have text."""
+        return {n: self.texts(n) for n in names if self.visible(n) and self.texts(n)}
+
+
+class _SnapshotBase:
+    def __init__(self, page, elements: dict[str, str], fields: dict[str, str] | None = None,
+                 texts: list[str] | None = None):
+        self.page = page
+        self.spec = {"elements": dict(elements), "fields": dict(fields or {}), "texts": list(elements if texts is None else texts)}
+        self._last: PageSnapshot | None = None
+
+    def _cached(self, max_age_ms: float) -> PageSnapshot | None:
+        last = self._last
+        if (
+            last is not None
+            and max_age_ms
+            and last.url == self.page.url
+            and (time.monotonic() - last.taken_at) * 1000 <= max_age_ms
+        ):
+            return last
+        return None
+
+    def _store(self, raw: dict) -> PageSnapshot:
+        self._last = PageSnapshot(**raw, taken_at=time.monotonic())
+        return self._last
+
+    def invalidate(self) -> None:
+        self._last = None
+
+
+class Snapshotter(_SnapshotBase):
+    def __init__(self, page: Page, elements: dict[str, str], fields: dict[str, str] | None = None,
+                 texts: list[str] | None = None):
+        super().__init__(page, elements, fields, texts)
+
+    def take(self, max_age_ms: float = 0) -> PageSnapshot:
+        """A fresh snapshot, or the previous one if it is younger than ``max_age_ms`` on the same URL."""
+        return self._cached(max_age_ms) or self._store(self.page.evaluate(SNAPSHOT_JS, self.spec))
+
+
+class AsyncSnapshotter(_SnapshotBase):
+    """``playwright.async_api`` twin of :class:`Snapshotter`."""
+
+    def __init__(self, page: AsyncPage, elements: dict[str, str], fields: dict[str, str] | None = None,
+                 texts: list[str] | None = None):
+        super().__init__(page, elements, fields, texts)
+
+    async def take(self, max_age_ms: float = 0) -> PageSnapshot:
+        return self._cached(max_age_ms) or self._store(await self.page.evaluate(SNAPSHOT_JS, self.spec))
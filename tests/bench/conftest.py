@@ -0,0 +1,82 @@
+import time
+import pytest
+from pages.overlays import OverlayDismisser
+from utils.bench import Baseline, format_row
+from utils.standin_server import StandinConfig, StandinServer
+from utils.stats import summarize
+
+
+def pytest_runtest_setup(item):
+    # Before fixture setup, so skipped benchmarks never launch a browser.
+    if not item.config.getoption("--bench"):
+        pytest.skip("benchmarks only run with --bench")
+
+
+@pytest.fixture(scope="session")
+def _standin_server():
+    with StandinServer() as server:
+        yield server
+
+
+@pytest.fixture
+def standin(_standin_server):
+    """The stand-in storefront, with its config reset for every benchmark."""
+    _standin_server.config = StandinConfig()
+    return _standin_server
+
+
+def _overlay_page(browser, auto_dismiss: bool):
+    context = browser.new_context()
+    OverlayDismisser.install(context, auto_dismiss=auto_dismiss)
+    return context, context.new_page()
+
+
+@pytest.fixture
+def unguarded_page(browser):
+    """A page whose overlay observer reports but never dismisses (``--overlay-guard=off``)."""
+    context, page = _overlay_page(browser, auto_dismiss=False)
+    yield page
+    context.close()
+
+
+@pytest.fixture
+def guarded_page(browser):
+    """A page with the auto-dismissing overlay guard (``--overlay-guard=on``)."""
+    context, page = _overlay_page(browser, auto_dismiss=True)
+    yield page
+    context.close()
+
+
+@pytest.fixture(scope="session")
+def bench_baseline(pytestconfig):
+    baseline = Baseline(pytestconfig.getoption("--bench-baseline"))
+    yield baseline
+    if pytestconfig.getoption("--update-bench-baseline"):
+        baseline.save()
+
+
+@pytest.fixture
+def bench(pytestconfig, bench_baseline, request):
+    """``bench(name, fn, setup=None)``: time ``fn`` --bench-runs times after one warm-up."""
+    runs = pytestconfig.getoption("--bench-runs")
+
+    def _bench(name: str, fn, setup=None) -> dict:
+        samples = []
+        for i in range(runs + 1):
+            if setup:
+                setup()
+            started = time.perf_counter()
+            fn()
+            if i:  # iteration 0 is the warm-up
+                samples.append(time.perf_counter() - started)
+        stats = summarize(samples)
+        request.node.user_properties.append(("bench", format_row(name, samples)))
+        if pytestconfig.getoption("--update-bench-baseline"):
+            bench_baseline.update(name, stats)
+        else:
+            regression = bench_baseline.check(name, stats, pytestconfig.getoption("--bench-threshold"))
+            if regression:
+                pytest.fail(regression)
+        return stats
+
+    return _bench
@@ -0,0 +1,92 @@
+import pytest
+from pages.home_page import HomePage
+from pages.login_page import Loginpage
+
+
+@pytest.mark.bench
+def test_bench_home_goto(page, standin, bench):
+    home = HomePage(page, standin.base_url)
+    bench("HomePage.goto", home.goto)
+
+
+@pytest.mark.bench
+def test_bench_home_search(page, standin, bench):
+    home = HomePage(page, standin.base_url)
+    bench("HomePage.search", lambda: home.search("dress"), setup=home.goto)
+
+
+@pytest.mark.bench
+def test_bench_go_to_login_with_overlay(unguarded_page, standin, bench):
+    # Guard off: with it on, the overlay is gone before go_to_login runs and
+    # this would time the guard rather than the page object's overlay handling.
+    standin.config.overlay = "immediate"
+    home = HomePage(unguarded_page, standin.base_url)
+    bench("HomePage.go_to_login[overlay]", home.go_to_login, setup=home.goto)
+
+
+@pytest.mark.bench
+def test_bench_go_to_login_with_overlay_guarded(guarded_page, standin, bench):
+    standin.config.overlay = "immediate"
+    home = HomePage(guarded_page, standin.base_url)
+    bench("HomePage.go_to_login[overlay, guard]", home.go_to_login, setup=home.goto)
+
+
+@pytest.mark.bench
+def test_bench_login_goto_with_banner(page, standin, bench):
+    standin.config.banner_iframe = True
+    login = Loginpage(page, standin.login_url)
+    bench("Loginpage.goto[banner]", login.goto)
+
+
+@pytest.mark.bench
+def test_bench_login_with_phone(page, standin, bench):
+    login = Loginpage(page, standin.login_url)
+
+    def setup():
+        page.context.clear_cookies()
+        login.goto()
+
+    def run():
+        assert login.login_with_phone("7000000000", "secret", dial_code="+91")
+
+    bench("Loginpage.login_with_phone", run, setup=setup)
+
+
+@pytest.mark.bench
+def test_bench_login_with_email(page, standin, bench):
+    login = Loginpage(page, standin.login_url)
+
+    def setup():
+        page.context.clear_cookies()
+        login.goto()
+
+    def run():
+        assert login.login_with_email("qa@example.com", "secret")
+
+    bench("Loginpage.login_with_email", run, setup=setup)
+
+
+@pytest.mark.bench
+def test_bench_search_products_paged(page, standin, bench):
+    standin.config.catalogue_size = 120
+    home = HomePage(page, standin.base_url)
+
+    def run():
+        products = list(home.search_products("dress"))
+        assert len(products) == 120
+        assert sum(not p.available for p in products) == 120 // 7
+
+    bench("HomePage.search_products[5 pages]", run, setup=home.goto)
+
+
+@pytest.mark.bench
+def test_bench_search_products_scroll(page, standin, bench):
+    standin.config.search_scroll = True
+    home = HomePage(page, standin.base_url)
+
+    def run():
+        products = list(home.search_products("dress", prune=True))
+        assert [p.price for p in products[:2]] == [49000.0, 59000.0]
+        assert len(products) == 60
+
+    bench("HomePage.search_products[scroll]", run, setup=home.goto)
@@ -0,0 +1,30 @@
+import pytest
+from playwright.sync_api import Error as PWError
+
+from pages.login_page import Loginpage
+from utils.har import HarArchive
+
+
+@pytest.mark.bench
+def test_replay_makes_no_network_requests(browser, standin, tmp_path):
+    standin.config.banner_iframe = True
+    har = HarArchive(tmp_path, "standin")
+    recording = browser.new_context(**har.record_kwargs("test_replay"))
+    page = recording.new_page()
+    page.goto(standin.login_url, wait_until="load")
+    recording.close()
+    assert standin.requests
+
+    standin.requests.clear()
+    unmatched: list[str] = []
+    replay = browser.new_context()
+    HarArchive.attach_replay(replay, har.path_for("test_replay"), unmatched)
+    page = replay.new_page()
+    page.goto(standin.login_url, wait_until="load")
+    assert Loginpage(page, standin.login_url).is_loaded()
+    # Not in the recording: aborted and reported, never sent.
+    with pytest.raises(PWError):
+        page.goto(f"{standin.base_url}/search?q=kaos")
+    replay.close()
+    assert standin.requests == []
+    assert unmatched == [f"GET {standin.base_url}/search?q=kaos"]
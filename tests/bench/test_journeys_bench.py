@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.journeys import home_journey, login_journey, run_journeys_sync
+
+
+def _run(journeys, **kwargs):
+    # The async API gets a thread (and event loop) of its own, away from the sync ``browser`` fixture.
+    with ThreadPoolExecutor(1) as pool:
+        return pool.submit(run_journeys_sync, journeys, **kwargs).result()
+
+
+@pytest.mark.bench
+def test_run_journeys_against_standin(standin):
+    standin.config.overlay = "delayed"
+    standin.config.overlay_delay_ms = 100
+    journeys = [
+        ("home", home_journey(standin.base_url, search_term="kaos")),
+        ("login-phone", login_journey(standin.login_url, password="secret", phone="7000000000", dial_code="+62")),
+        ("login-email", login_journey(standin.login_url, password="secret", email="qa@example.com")),
+    ]
+    results = _run(journeys, concurrency=2)
+    assert [r.name for r in results] == ["home", "login-phone", "login-email"]
+    assert all(r.ok for r in results), [r.error for r in results if not r.ok]
+    assert standin.login_posts == 2
+
+
+@pytest.mark.bench
+def test_run_journeys_reports_failures_without_stopping_the_others(standin):
+    standin.config.login_outcome = "fail"
+    results = _run([
+        ("home", home_journey(standin.base_url)),
+        ("login", login_journey(standin.login_url, password="wrong", phone="7000000000", dial_code="+62")),
+    ])
+    home, login = results
+    assert home.ok and not login.ok
+    assert login.error.startswith("AssertionError") and login.seconds > 0
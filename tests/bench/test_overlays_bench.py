@@ -0,0 +1,56 @@
+import pytest
+from pages.home_page import HomePage
+
+_APP_DRAWER_JS = """
+() => {
+  const d = document.createElement('div');
+  d.id = 'cart-drawer';
+  d.innerHTML = '<button aria-label="Close" class="modal__close" onclick="this.parentNode.remove()">x</button>';
+  document.body.appendChild(d);
+}
+"""
+
+
+@pytest.mark.bench
+def test_close_popup_when_overlay_appears_after_goto(unguarded_page, standin):
+    standin.config.overlay = "delayed"
+    standin.config.overlay_delay_ms = 150
+    home = HomePage(unguarded_page, standin.base_url)
+    home.goto()
+    # Shown after goto returned; close_popup must not trust "no events yet".
+    unguarded_page.wait_for_selector("#ins-frameless-overlay")
+    home.close_popup()
+    assert not unguarded_page.is_visible("#ins-frameless-overlay")
+    home.go_to_login()
+    assert "/account" in unguarded_page.url
+
+
+@pytest.mark.bench
+def test_guard_dismisses_late_marketing_overlay(guarded_page, standin):
+    standin.config.overlay = "delayed"
+    standin.config.overlay_delay_ms = 150
+    guarded_page.goto(standin.base_url, wait_until="domcontentloaded")
+    guarded_page.wait_for_timeout(400)
+    assert not guarded_page.is_visible("#ins-frameless-overlay")
+
+
+@pytest.mark.bench
+def test_guard_leaves_app_modals_open(guarded_page, standin):
+    standin.config.overlay = "immediate"
+    guarded_page.goto(standin.base_url, wait_until="domcontentloaded")
+    guarded_page.evaluate(_APP_DRAWER_JS)
+    guarded_page.wait_for_selector("#ins-frameless-overlay", state="detached")
+    # Several guard runs (mutations are throttled to 50 ms) later, the drawer is still open.
+    guarded_page.evaluate("() => document.body.classList.add('drawer-open')")
+    guarded_page.wait_for_timeout(300)
+    assert guarded_page.is_visible("#cart-drawer .modal__close")
+
+
+@pytest.mark.bench
+def test_explicit_dismiss_still_closes_generic_modals(unguarded_page, standin):
+    from pages.overlays import OverlayDismisser
+
+    unguarded_page.goto(standin.base_url, wait_until="domcontentloaded")
+    unguarded_page.evaluate(_APP_DRAWER_JS)
+    assert OverlayDismisser(unguarded_page).dismiss() == 1
+    assert not unguarded_page.is_visible("#cart-drawer")
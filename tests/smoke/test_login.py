@@ -13,19 +13,19 @@ def test_can_open_loginpage(page):
     assert isinstance(page.title(), str) and len(page.title()) > 0
 
 @pytest.mark.smoke
-def test_login_with_phone_india(page):
+def test_login_with_phone_india(page, account):
     login = Loginpage(page, settings.login_url)
     login.goto()
     assert login.is_loaded()
 
-    login.login_with_phone(phone=settings.phone, password=settings.password, dial_code="+91")
+    login.login_with_phone(phone=account.phone, password=account.password, dial_code=account.dial_code)
     assert login.is_logged_in(), f"Expected to be on account page, got {page.url}"
 
 @pytest.mark.smoke
-def test_login_with_email(page):
+def test_login_with_email(page, account):
     login = Loginpage(page, settings.login_url)
     login.goto()
     assert login.is_loaded()
 
-    login.login_with_email(email=settings.email, password=settings.password)
+    login.login_with_email(email=account.email, password=account.password)
     assert login.is_logged_in(), f"Expected to be on account page, got {page.url}"
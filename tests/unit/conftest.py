@@ -0,0 +1,10 @@
+import pytest
+
+from utils import strategies, timeouts
+
+
+@pytest.fixture(autouse=True)
+def _in_memory_learning(monkeypatch):
+    """Unit-test fakes must not feed (or be steered by) the run's learned timeouts and strategy order."""
+    monkeypatch.setattr(timeouts, "_policy", timeouts.TimeoutPolicy())
+    monkeypatch.setattr(strategies, "_registry", strategies.StrategyRegistry())
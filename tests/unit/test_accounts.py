@@ -0,0 +1,92 @@
+import json
+import multiprocessing
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from utils import config
+from utils.accounts import AccountPool, LeaseTimeout, account_key
+from utils.config import Account
+
+ACCOUNTS = [Account(phone_number=f"70000000{i}", email=f"qa{i}@example.com", password="secret") for i in range(2)]
+
+
+def _hold(lease_dir, ready, done):
+    pool = AccountPool(lease_dir)
+    lease = pool.acquire("dev", ACCOUNTS[:1], "gw1")
+    ready.set()
+    done.wait(10)
+    pool.release("dev", lease)
+
+
+def test_leases_are_exclusive_and_released(tmp_path):
+    pool = AccountPool(tmp_path, wait_seconds=0)
+    first = pool.acquire("dev", ACCOUNTS, "gw0")
+    second = pool.acquire("dev", ACCOUNTS, "gw0")
+    assert {first.key, second.key} == {account_key(a) for a in ACCOUNTS}
+    with pytest.raises(LeaseTimeout):
+        pool.acquire("dev", ACCOUNTS, "gw0")
+    pool.release("dev", second)
+    assert pool.acquire("dev", ACCOUNTS, "gw0").key == second.key
+    assert pool.stats.timeouts == 1
+
+
+def test_prefers_the_account_held_last(tmp_path):
+    pool = AccountPool(tmp_path)
+    with pool.lease("dev", ACCOUNTS, "gw0"):
+        with pool.lease("dev", ACCOUNTS, "gw0") as inner:
+            pass
+    assert pool.acquire("dev", ACCOUNTS, "gw0").key == inner.key
+
+
+def test_other_process_holding_the_account_makes_us_wait(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    ready, done = ctx.Event(), ctx.Event()
+    holder = ctx.Process(target=_hold, args=(str(tmp_path), ready, done))
+    holder.start()
+    try:
+        assert ready.wait(20)
+        pool = AccountPool(tmp_path, wait_seconds=0.3, poll_seconds=0.05)
+        with pytest.raises(LeaseTimeout):
+            pool.acquire("dev", ACCOUNTS[:1], "gw0")
+        done.set()
+        holder.join(10)
+        lease = pool.acquire("dev", ACCOUNTS[:1], "gw0", wait_seconds=5)
+        assert lease.key == account_key(ACCOUNTS[0])
+    finally:
+        done.set()
+        holder.join(10)
+
+
+def test_expired_and_orphaned_leases_are_reclaimed(tmp_path):
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    table = {
+        account_key(ACCOUNTS[0]): {"holder": "gw9", "pid": int(dead.stdout), "host": socket.gethostname(), "expires": 9e12},
+        account_key(ACCOUNTS[1]): {"holder": "gw8", "pid": 1, "host": "elsewhere", "expires": 0},
+    }
+    (tmp_path / "dev.json").write_text(json.dumps(table))
+    pool = AccountPool(tmp_path, wait_seconds=0)
+    assert {pool.acquire("dev", ACCOUNTS, "gw0").key for _ in ACCOUNTS} == set(table)
+    assert pool.stats.reclaimed == 2
+
+
+def test_accounts_file_extends_the_pool(tmp_path, monkeypatch):
+    for key, value in (("BASE_URL", "https://dev.example.com"), ("PHONE", "7000000000"),
+                       ("EMAIL", "qa@example.com"), ("PASSWORD", "secret")):
+        monkeypatch.setenv(f"DEV_{key}", value)
+    accounts = tmp_path / "accounts.json"
+    accounts.write_text(json.dumps([{"phone": "7000000001", "email": "qa1@example.com", "password": "s1"}]))
+    monkeypatch.setenv("DEV_ACCOUNTS_FILE", str(accounts))
+    config.get_settings.cache_clear()
+    try:
+        pool = config.get_settings("dev").accounts
+        assert [a.email for a in pool] == ["qa@example.com", "qa1@example.com"]
+        assert pool[1].dial_code == "+91"
+        accounts.write_text(json.dumps([{"phone": "7000000001"}]))
+        config.get_settings.cache_clear()
+        with pytest.raises(config.ConfigError, match="entry 0"):
+            config.get_settings("dev")
+    finally:
+        config.get_settings.cache_clear()
@@ -0,0 +1,125 @@
+import json
+import os
+import time
+
+import pytest
+
+from utils import auth_cache
+from utils.auth_cache import AuthStateCache, ensure_auth_state
+
+
+def test_path_does_not_leak_account(tmp_path):
+    cache = AuthStateCache(tmp_path)
+    path = cache.path_for("dev", "someone@example.com", "email")
+    assert "someone" not in path.name
+    assert path.name.startswith("dev-email-")
+
+
+def test_fresh_path_respects_ttl(tmp_path):
+    cache = AuthStateCache(tmp_path, ttl_seconds=60)
+    assert cache.fresh_path("dev", "+917000000000", "phone") is None
+
+    path = cache.save({"cookies": [], "origins": []}, "dev", "+917000000000", "phone")
+    assert cache.fresh_path("dev", "+917000000000", "phone") == path
+
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert cache.fresh_path("dev", "+917000000000", "phone") is None
+
+
+class _FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    def new_page(self):
+        return _FakePage()
+
+    def storage_state(self):
+        return {"cookies": [{"name": "_secure_session_id", "value": "new"}], "origins": []}
+
+    def close(self):
+        self.closed = True
+
+
+class _FakePage:
+    url = "https://shop.test/account/login"
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def new_context(self, **kwargs):
+        context = _FakeContext()
+        self.contexts.append(context)
+        return context
+
+
+class _FakeLogin:
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.calls = 0
+
+    def __call__(self, page):
+        self.calls += 1
+        return self.ok
+
+
+@pytest.fixture
+def probe(monkeypatch):
+    """Stand-in for ``probe_state``: answers ``accepts`` and counts its calls."""
+    calls = []
+
+    def _probe(browser, state_path, probe_url, context_args=None):
+        calls.append(state_path)
+        return _probe.accepts
+
+    _probe.accepts = True
+    _probe.calls = calls
+    monkeypatch.setattr(auth_cache, "probe_state", _probe)
+    return _probe
+
+
+def _ensure(browser, cache, login):
+    return ensure_auth_state(
+        browser, cache, env="dev", account="+917000000000", mode="phone",
+        login=login, probe_url="https://shop.test/account",
+    )
+
+
+def test_fresh_state_accepted_by_the_probe_is_reused(tmp_path, probe):
+    cache = AuthStateCache(tmp_path)
+    cached = cache.save({"cookies": [], "origins": []}, "dev", "+917000000000", "phone")
+    browser, login = _FakeBrowser(), _FakeLogin()
+    assert _ensure(browser, cache, login) == cached
+    assert probe.calls == [cached]
+    assert login.calls == 0 and browser.contexts == []
+
+
+@pytest.mark.parametrize("stale", ["expired", "rejected"])
+def test_stale_state_logs_in_again(tmp_path, probe, stale):
+    cache = AuthStateCache(tmp_path, ttl_seconds=60)
+    cached = cache.save({"cookies": [], "origins": []}, "dev", "+917000000000", "phone")
+    if stale == "expired":
+        old = time.time() - 120
+        os.utime(cached, (old, old))
+    else:
+        probe.accepts = False
+    browser, login = _FakeBrowser(), _FakeLogin()
+    path = _ensure(browser, cache, login)
+    assert login.calls == 1
+    assert probe.calls == ([] if stale == "expired" else [cached])
+    assert json.loads(path.read_text())["cookies"][0]["value"] == "new"
+    assert cache.fresh_path("dev", "+917000000000", "phone") == path
+    assert [c.closed for c in browser.contexts] == [True]
+
+
+def test_failed_login_raises_and_leaves_no_state(tmp_path, probe):
+    cache = AuthStateCache(tmp_path)
+    cache.save({"cookies": [], "origins": []}, "dev", "+917000000000", "phone")
+    probe.accepts = False
+    browser = _FakeBrowser()
+    with pytest.raises(AssertionError, match="UI login failed for env=dev mode=phone"):
+        _ensure(browser, cache, _FakeLogin(ok=False))
+    assert not cache.path_for("dev", "+917000000000", "phone").exists()
+    assert [c.closed for c in browser.contexts] == [True]
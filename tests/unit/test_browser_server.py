@@ -0,0 +1,71 @@
+import json
+import os
+
+from utils.browser_server import ServerFleet, SharedBrowser, process_tree_rss, read_registry, worker_slot
+
+
+class _FakeBrowser:
+    def __init__(self, ws):
+        self.ws = ws
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    def new_context(self, **kwargs):
+        return ("context", self.ws)
+
+
+class _FakeBrowserType:
+    name = "chromium"
+
+    def __init__(self):
+        self.connected = []
+
+    def connect(self, ws):
+        self.connected.append(_FakeBrowser(ws))
+        return self.connected[-1]
+
+
+def _publish(tmp_path, generations):
+    fleet = ServerFleet(len(generations), "chromium", {"headless": True}, tmp_path / "servers.json")
+    for server, gen in zip(fleet.servers, generations):
+        server.ws_endpoint = f"ws://127.0.0.1:{9000 + server.index}/x"
+        server.generation = gen
+    fleet.publish()
+    return fleet
+
+
+def test_worker_slots_round_robin():
+    assert [worker_slot(f"gw{i}", 3) for i in range(6)] == [0, 1, 2, 0, 1, 2]
+    assert worker_slot(None, 3) == 0
+
+
+def test_registry_is_published(tmp_path):
+    _publish(tmp_path, [1, 1])
+    doc = read_registry(tmp_path / "servers.json")
+    assert doc["browser"] == "chromium"
+    assert [s["ws"] for s in doc["servers"]] == ["ws://127.0.0.1:9000/x", "ws://127.0.0.1:9001/x"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_shared_browser_reconnects_to_relaunched_server(tmp_path):
+    _publish(tmp_path, [1, 1])
+    browser_type = _FakeBrowserType()
+    shared = SharedBrowser(browser_type, tmp_path / "servers.json", "gw3", reconnect_timeout=0)
+    assert shared.slot == 1
+    assert shared.new_context() == ("context", "ws://127.0.0.1:9001/x")
+
+    browser_type.connected[-1].connected = False
+    fleet = _publish(tmp_path, [1, 2])
+    fleet.servers[1].ws_endpoint = "ws://127.0.0.1:9101/x"
+    fleet.publish()
+    assert shared.new_context() == ("context", "ws://127.0.0.1:9101/x")
+    assert shared.connects == 2
+
+
+def test_process_tree_rss_counts_this_process():
+    if not os.path.exists("/proc"):
+        return
+    assert process_tree_rss(os.getpid()) > 1024 * 1024
+    assert json.dumps(process_tree_rss(2**22 + 7)) in ("0", "null")
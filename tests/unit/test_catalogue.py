@@ -0,0 +1,84 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from utils import catalogue
+
+
+class _FakeContext:
+    def __init__(self, closed):
+        self.closed = closed
+
+    async def new_page(self):
+        return object()
+
+    async def close(self):
+        self.closed.append(self)
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.contexts_closed = []
+        self.closed = False
+
+    async def new_context(self, **kwargs):
+        return _FakeContext(self.contexts_closed)
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakePlaywright:
+    def __init__(self, browser):
+        async def launch(**kwargs):
+            return browser
+
+        self.chromium = SimpleNamespace(launch=launch)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeHome:
+    def __init__(self, page, base_url):
+        pass
+
+    async def goto(self):
+        pass
+
+    async def search_products(self, term, **kwargs):
+        for i in range(100):
+            yield f"{term}-{i}"
+
+
+def _run(coro):
+    # Own thread: the session-wide sync ``playwright`` fixture keeps a loop running on this one.
+    with ThreadPoolExecutor(1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def test_stopping_early_with_a_full_buffer_closes_cleanly(monkeypatch):
+    browser = _FakeBrowser()
+    monkeypatch.setattr(catalogue, "async_playwright", lambda: _FakePlaywright(browser))
+    monkeypatch.setattr(catalogue, "AsyncHomePage", _FakeHome)
+
+    async def _noop(context):
+        pass
+
+    monkeypatch.setattr(catalogue.AsyncOverlayDismisser, "install", staticmethod(_noop))
+
+    async def consume():
+        stream = catalogue.stream_search(["dress", "kemeja"], "https://shop.test", concurrency=2, buffer=4)
+        got = []
+        async for product in stream:
+            got.append(product)
+            if len(got) == 3:
+                break
+        await asyncio.wait_for(stream.aclose(), timeout=5)
+        return got
+
+    assert len(_run(consume())) == 3
+    assert browser.closed and len(browser.contexts_closed) == 2
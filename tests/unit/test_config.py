@@ -0,0 +1,31 @@
+import pytest
+from utils import config
+
+
+@pytest.fixture
+def two_envs(monkeypatch):
+    for prefix, host in (("DEV", "dev.example.com"), ("STAGING", "staging.example.com")):
+        monkeypatch.setenv(f"{prefix}_BASE_URL", f"https://{host}")
+        monkeypatch.setenv(f"{prefix}_PHONE", "7000000000")
+        monkeypatch.setenv(f"{prefix}_EMAIL", "qa@example.com")
+        monkeypatch.setenv(f"{prefix}_PASSWORD", "secret")
+    monkeypatch.setenv("TEST_ENV", "dev")
+    config.get_settings.cache_clear()
+    yield
+    config.use_env(None)
+    config.get_settings.cache_clear()
+
+
+def test_settings_proxy_follows_active_env(two_envs):
+    assert config.settings.base_url == "https://dev.example.com"
+    config.use_env("staging")
+    assert config.settings.login_url == "https://staging.example.com/account/login?return_url=%2Faccount"
+    assert config.get_settings("staging") is config.get_settings("staging")
+
+
+def test_missing_values_raise_instead_of_exiting(two_envs, monkeypatch):
+    monkeypatch.delenv("STAGING_PHONE")
+    with pytest.raises(config.ConfigError, match="STAGING_PHONE"):
+        config.get_settings("staging")
+    with pytest.raises(config.ConfigError, match="Invalid"):
+        config.get_settings("qa")
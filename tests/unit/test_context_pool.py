@@ -0,0 +1,148 @@
+from types import SimpleNamespace
+
+from utils.context_pool import ContextPool
+
+
+class _FakeCDP:
+    def __init__(self, heap_mb=10):
+        self.sent = []
+        self.heap_mb = heap_mb
+
+    def send(self, method, params=None):
+        self.sent.append((method, params))
+        if method == "Performance.getMetrics":
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": self.heap_mb * 1024 * 1024}]}
+        return {}
+
+    def methods(self):
+        return [m for m, _ in self.sent]
+
+
+class _FakePage:
+    def __init__(self):
+        self.handlers = {}
+        self.closed = False
+        self.evaluated = []
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def navigate(self, url):
+        for handler in self.handlers.get("framenavigated", []):
+            handler(SimpleNamespace(url=url))
+
+    def is_closed(self):
+        return self.closed
+
+    def evaluate(self, script, *args):
+        self.evaluated.append(script)
+
+    def goto(self, url):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeContext:
+    def __init__(self, cdp):
+        self.cdp = cdp
+        self.sessions = 0
+        self.pages = []
+        self.handlers = []
+        self.closed = False
+
+    def on(self, event, handler):
+        assert event == "page"
+        self.handlers.append(handler)
+
+    def new_page(self):
+        page = _FakePage()
+        self.pages.append(page)
+        for handler in self.handlers:
+            handler(page)
+        return page
+
+    def new_cdp_session(self, page):
+        self.sessions += 1
+        return self.cdp
+
+    def clear_cookies(self):
+        pass
+
+    def clear_permissions(self):
+        pass
+
+    def unroute_all(self, behavior=None):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self, name="chromium", heap_mb=10):
+        self.browser_type = SimpleNamespace(name=name)
+        self.heap_mb = heap_mb
+        self.contexts = []
+
+    def new_context(self, **kwargs):
+        context = _FakeContext(_FakeCDP(self.heap_mb))
+        self.contexts.append(context)
+        return context
+
+
+def test_performance_domain_is_enabled_once_per_slot():
+    browser = _FakeBrowser()
+    pool = ContextPool(browser, size=1, max_heap_mb=100)
+    for _ in range(3):
+        pool.release(pool.acquire())
+    context = browser.contexts[0]
+    methods = context.cdp.methods()
+    assert context.sessions == 1
+    assert methods.count("Performance.enable") == 1
+    assert methods.count("Performance.getMetrics") == 3
+    assert methods.index("Performance.enable") < methods.index("Performance.getMetrics")
+    assert pool.stats.hits == 3 and pool.stats.retired == 0
+
+
+def test_heap_over_budget_retires_the_slot():
+    browser = _FakeBrowser(heap_mb=300)
+    pool = ContextPool(browser, size=1, max_heap_mb=100)
+    pool.release(pool.acquire())
+    assert pool.stats.retire_reasons == {"memory": 1}
+    assert browser.contexts[0].closed and len(browser.contexts) == 2
+
+
+def test_reset_clears_site_data_of_every_origin_the_context_loaded():
+    browser = _FakeBrowser()
+    pool = ContextPool(browser, size=1)
+    slot = pool.acquire()
+    slot.page.navigate("https://shop.test/account/login")
+    slot.page.navigate("https://insider.example/banner.html")  # marketing iframe
+    popup = slot.context.new_page()
+    popup.navigate("https://pay.example/checkout")
+    slot.page.navigate("about:blank")
+    pool.release(slot)
+    cleared = [p["origin"] for m, p in slot.cdp.sent if m == "Storage.clearDataForOrigin"]
+    assert cleared == ["https://insider.example", "https://pay.example", "https://shop.test"]
+    assert all(p["storageTypes"] == "all" for m, p in slot.cdp.sent if m == "Storage.clearDataForOrigin")
+    session = [p["storageId"] for m, p in slot.cdp.sent if m == "DOMStorage.clear"]
+    assert {"securityOrigin": "https://shop.test", "isLocalStorage": False} in session
+    assert "Performance.enable" not in slot.cdp.methods()  # no heap budget, no Performance domain
+    assert not slot.origins and pool.stats.retired == 0 and popup.closed
+
+    # Nothing loaded since: the next reset has no origin to clear.
+    pool.release(pool.acquire())
+    assert slot.cdp.methods().count("Storage.clearDataForOrigin") == 3
+
+
+def test_reset_without_cdp_falls_back_to_in_page_clear():
+    browser = _FakeBrowser(name="firefox")
+    pool = ContextPool(browser, size=1, max_heap_mb=100)
+    slot = pool.acquire()
+    slot.page.navigate("https://shop.test/")
+    pool.release(slot)
+    assert browser.contexts[0].sessions == 0
+    assert len(slot.page.evaluated) == 1 and "indexedDB" in slot.page.evaluated[0]
+    assert pool.stats.retired == 0
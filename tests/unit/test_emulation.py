@@ -0,0 +1,55 @@
+import pytest
+
+from utils import emulation, timeouts
+from utils.emulation import PROFILES, resolve, summarize
+from utils.timeouts import TimeoutPolicy
+
+
+def test_profiles_map_to_context_options_and_cdp_units():
+    low = resolve("low-end-android")
+    assert low.context_kwargs() == {
+        "viewport": {"width": 360, "height": 640},
+        "device_scale_factor": 2,
+        "user_agent": low.user_agent,
+        "has_touch": True,
+        "is_mobile": True,
+    }
+    assert "is_mobile" not in low.context_kwargs("firefox")
+    assert low._network()["downloadThroughput"] == 200_000  # 1600 kbps in bytes/s
+    assert not PROFILES["none"].throttled and PROFILES["none"].context_kwargs() == {}
+    with pytest.raises(ValueError, match="4g-id"):
+        resolve("5g")
+
+
+def test_summary_flags_waits_that_only_break_under_emulation():
+    rows = [
+        {"test": "t::login", "profile": "none", "seconds": 2.0, "outcome": "passed",
+         "timed_out": ["Loginpage.email_toggle.css"]},
+        {"test": "t::login", "profile": "slow-3g", "seconds": 14.0, "outcome": "failed",
+         "timed_out": ["Loginpage.email_toggle.css", "Loginpage.is_loaded.form"]},
+        {"test": "t::home", "profile": "none", "seconds": 1.0, "outcome": "passed", "timed_out": []},
+        {"test": "t::home", "profile": "slow-3g", "seconds": 3.0, "outcome": "passed", "timed_out": []},
+    ]
+    lines = summarize(rows)
+    assert lines[1].startswith("t::login") and "14.0s FAILED" in lines[1]
+    assert lines[-1] == "timed out only under emulation: Loginpage.is_loaded.form (slow-3g)"
+
+
+def test_timeouts_under_a_condition_are_kept_apart(monkeypatch):
+    class PWTimeout(Exception):
+        pass
+
+    policy = TimeoutPolicy(min_samples=1)
+    monkeypatch.setattr(timeouts, "_policy", policy)
+    monkeypatch.setattr("utils.config.active_env", lambda: "dev")
+    emulation.use("slow-3g")
+    try:
+        with timeouts.timed("HomePage.search.navigate", 8000):
+            pass
+        with pytest.raises(PWTimeout):
+            with timeouts.timed("Loginpage.is_loaded.form", 5000):
+                raise PWTimeout
+    finally:
+        emulation.use(None)
+    assert list(policy.samples) == ["dev/slow-3g"]
+    assert policy.timed_out == ["Loginpage.is_loaded.form"]
@@ -0,0 +1,70 @@
+import subprocess
+
+from utils.impact import Changes, ImpactIndex, affected_tests, changes_since
+
+_PAGE = '''\
+CLOSE = ["#close"]
+
+
+class Page:
+    root = "#root"
+
+    def open(self):
+        return "#open"
+
+    def close(self):
+        return CLOSE
+'''
+
+
+def _repo(tmp_path):
+    (tmp_path / "pages").mkdir()
+    (tmp_path / "pages" / "p.py").write_text(_PAGE)
+    git = ["git", "-c", "user.email=t@t", "-c", "user.name=t"]
+    subprocess.run(git + ["init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(git + ["add", "."], cwd=tmp_path, check=True)
+    subprocess.run(git + ["commit", "-qm", "base"], cwd=tmp_path, check=True)
+    return tmp_path
+
+
+def _edit(root, old, new):
+    path = root / "pages" / "p.py"
+    path.write_text(path.read_text().replace(old, new))
+
+
+def test_method_change_maps_to_that_method(tmp_path):
+    root = _repo(tmp_path)
+    _edit(root, '"#open"', '"#open-v2"')
+    changes = changes_since("HEAD", root)
+    assert changes.functions == {"pages/p.py::Page.open"}
+    assert {"#open", "#open-v2"} <= changes.literals
+    assert not changes.unknown
+
+
+def test_module_constant_change_maps_to_its_users(tmp_path):
+    root = _repo(tmp_path)
+    _edit(root, '["#close"]', '["#close", ".x"]')
+    assert changes_since("HEAD", root).functions == {"pages/p.py::Page.close"}
+
+
+def test_class_body_change_covers_all_methods(tmp_path):
+    root = _repo(tmp_path)
+    _edit(root, 'root = "#root"', 'root = "#main"')
+    index = ImpactIndex(tmp_path / "index.json")
+    index.record("t::a", {"functions": ["pages/p.py::Page.open"], "selectors": []})
+    index.record("t::b", {"functions": ["pages/other.py::Other.go"], "selectors": []})
+    assert affected_tests(index, changes_since("HEAD", root)) == {"t::a"}
+
+
+def test_selector_literals_select_tests_that_used_them(tmp_path):
+    index = ImpactIndex(tmp_path / "index.json")
+    index.record("t::login", {"functions": [], "selectors": ["#CustomerLoginForm #MobileCountryCode"]})
+    index.record("t::home", {"functions": [], "selectors": ["input[type='search']"]})
+    assert affected_tests(index, Changes(literals={"#MobileCountryCode"})) == {"t::login"}
+
+
+def test_non_python_change_is_unknown(tmp_path):
+    root = _repo(tmp_path)
+    (root / "pages" / "data.json").write_text("{}")
+    subprocess.run(["git", "add", "-N", "pages/data.json"], cwd=root, check=True)
+    assert changes_since("HEAD", root).unknown
@@ -0,0 +1,54 @@
+from utils.jsprofile import build_report, summarize, unused_css_bytes, unused_js_bytes
+
+
+def _fn(*ranges):
+    return {"ranges": [{"startOffset": s, "endOffset": e, "count": c} for s, e, c in ranges]}
+
+
+def test_unused_js_uses_innermost_range():
+    # Script of 100 bytes, a never-called function at 10-40 containing a hot block at 20-25,
+    # and a called function at 50-90 with an unexecuted branch at 60-70.
+    functions = [_fn((0, 100, 1)), _fn((10, 40, 0), (20, 25, 3)), _fn((50, 90, 2), (60, 70, 0))]
+    assert unused_js_bytes(functions) == (100, 25 + 10)
+    assert unused_js_bytes([]) == (0, 0)
+
+
+def test_unused_css_merges_overlapping_used_rules():
+    rules = [
+        {"startOffset": 0, "endOffset": 10, "used": True},
+        {"startOffset": 5, "endOffset": 20, "used": True},
+        {"startOffset": 20, "endOffset": 50, "used": False},
+    ]
+    assert unused_css_bytes(100, rules) == (100, 80)
+
+
+def test_report_aggregates_self_time_and_bytes_per_origin():
+    profile = {
+        "nodes": [
+            {"id": 1, "callFrame": {"functionName": "(root)", "url": ""}},
+            {"id": 2, "callFrame": {"functionName": "(idle)", "url": ""}},
+            {"id": 3, "callFrame": {"functionName": "init", "url": "https://www.matahari.com/cdn/app.js"}},
+            {"id": 4, "callFrame": {"functionName": "t", "url": "https://api.useinsider.com/ins.js?v=1"}},
+        ],
+        "samples": [3, 4, 4, 2],
+        "timeDeltas": [1000, 2000, 3000, 500],
+    }
+    coverage = [
+        {"url": "https://api.useinsider.com/ins.js?v=1", "functions": [_fn((0, 1000, 1), (100, 900, 0))]},
+        {"url": "https://www.matahari.com/cdn/app.js", "functions": [_fn((0, 400, 1))]},
+    ]
+    sheets = {"s1": {"styleSheetId": "s1", "sourceURL": "https://www.matahari.com/cdn/theme.css", "length": 300}}
+    css = [{"styleSheetId": "s1", "startOffset": 0, "endOffset": 100, "used": True}]
+    report = build_report(profile, coverage, sheets, css, first_party=["matahari.com", "*.matahari.com"])
+
+    insider = report["origins"]["https://api.useinsider.com"]
+    assert insider == {"self_ms": 5.0, "js_bytes": 1000, "js_unused": 800, "css_bytes": 0, "css_unused": 0,
+                       "third_party": True}
+    ours = report["origins"]["https://www.matahari.com"]
+    assert (ours["self_ms"], ours["css_unused"], ours["third_party"]) == (1.0, 200, False)
+    assert report["origins"]["(idle)"]["self_ms"] == 0.5
+    assert list(report["origins"])[0] == "https://api.useinsider.com"
+    assert report["top_scripts"][0] == {"url": "https://api.useinsider.com/ins.js?v=1", "self_ms": 5.0}
+
+    lines = summarize([report, report])
+    assert lines[1].startswith("https://api.useinsider.com [3p]") and "80%" in lines[1]
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pages.login_page import Loginpage, _LoginFormParser
+from utils import strategies
+from utils.standin_server import StandinServer
+
+
+class _FakeButton:
+    def __init__(self):
+        self.showing = False
+        self.clicks = 0
+
+    def count(self):
+        return int(self.showing)
+
+    def click(self, timeout=None):
+        if not self.showing:
+            raise TimeoutError("no close button")
+        self.clicks += 1
+        self.showing = False
+
+
+class _FakePage:
+    def __init__(self):
+        self.button = _FakeButton()
+
+    def get_by_role(self, role, name=None):
+        return self.button
+
+    def evaluate(self, script, *args):
+        return "build-1"
+
+
+def test_close_step_only_skips_while_the_button_is_absent(monkeypatch):
+    reg = strategies.StrategyRegistry()
+    monkeypatch.setattr(strategies, "_registry", reg)
+    page = _FakePage()
+    login = Loginpage(page, login_url="https://shop.test/account/login")
+    for _ in range(3):
+        login._close_start_popup()
+    key = strategies.strategy_key(page, "Loginpage.goto.close")
+    assert reg.order(key, ["role-close-button", "no-close-button"])[0] == "no-close-button"
+    # The learned "absent" answer must not hide a button that shows up again.
+    page.button.showing = True
+    login._close_start_popup()
+    assert page.button.clicks == 1
+
+
+def test_form_parser_collects_hidden_fields_and_named_inputs():
+    parser = _LoginFormParser()
+    parser.feed(
+        '<form action="/account/login" method="POST">'
+        '<input type="hidden" name="authenticity_token" value="t0k">'
+        '<input id="CustomerEmail" name="customer[email]" type="email">'
+        '</form><input id="Outside" name="q">'
+    )
+    assert parser.forms == [{
+        "action": "/account/login",
+        "method": "post",
+        "fields": {"authenticity_token": "t0k"},
+        "ids": {"CustomerEmail": "customer[email]"},
+    }]
+
+
+@pytest.fixture
+def standin():
+    with StandinServer() as server:
+        yield server
+
+
+@pytest.fixture
+def api_login(playwright, standin):
+    """``Loginpage`` on a page stub whose context only has a real APIRequestContext (no browser)."""
+    request = playwright.request.new_context()
+    login = Loginpage(SimpleNamespace(context=SimpleNamespace(request=request)), standin.login_url)
+    yield login, request
+    request.dispose()
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"phone": "7000000000", "dial_code": "+62"},
+    {"email": "qa@example.com"},
+])
+def test_login_via_api_logs_in_with_one_post(api_login, standin, kwargs):
+    login, request = api_login
+    assert login.login_via_api(password="secret", fallback_to_ui=False, **kwargs)
+    assert standin.login_posts == 1
+    assert request.get(f"{standin.base_url}/account", max_redirects=0).status == 200
+
+
+def test_login_via_api_without_the_hidden_token_is_rejected(api_login, standin):
+    standin.config.login_token_in_form = False
+    login, request = api_login
+    assert not login.login_via_api(phone="7000000000", password="secret", fallback_to_ui=False)
+    assert standin.login_posts == 1
+    assert request.get(f"{standin.base_url}/account", max_redirects=0).status == 302
+
+
+def test_login_via_api_reports_a_rejected_login(api_login, standin):
+    standin.config.login_outcome = "fail"
+    login, request = api_login
+    assert not login.login_via_api(email="qa@example.com", password="wrong", fallback_to_ui=False)
+    assert standin.login_posts == 1
+    assert request.get(f"{standin.base_url}/account", max_redirects=0).status == 302
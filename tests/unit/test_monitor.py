@@ -0,0 +1,38 @@
+import csv
+import json
+
+from utils.monitor import Iteration, MonitorConfig, ramp_offsets, report, write_csv, write_json
+
+
+def _results():
+    steps = {"home": 100.0, "login_page": 50.0, "login_post": 200.0, "account": 80.0}
+    ok = [Iteration(0, i, True, dict(steps)) for i in range(3)]
+    failed = Iteration(1, 3, False, {"home": 120.0}, error="TimeoutError: x", failed_step="login_page")
+    return ok + [failed]
+
+
+def test_ramp_spreads_session_starts():
+    assert ramp_offsets(4, 8) == [0, 2, 4, 6]
+    assert ramp_offsets(3, 0) == [0, 0, 0]
+
+
+def test_report_rates_and_step_breakdown():
+    summary = report(_results(), wall_s=60)
+    assert summary["iterations"] == 4 and summary["errors"] == 1
+    assert summary["success_rate"] == 0.75
+    assert summary["steps_ms"]["home"]["n"] == 4
+    assert summary["steps_ms"]["account"]["n"] == 3
+    assert summary["journey_ms"]["p50"] == 430
+    assert summary["errors_by_step"] == {"login_page": 1}
+
+
+def test_outputs_leave_out_password(tmp_path):
+    results = _results()
+    summary = report(results, wall_s=60)
+    cfg = MonitorConfig(base_url="http://x", password="hunter2", phone="1")
+    write_json(tmp_path / "out.json", cfg, summary, results)
+    write_csv(tmp_path / "out.csv", summary)
+    assert "hunter2" not in (tmp_path / "out.json").read_text()
+    assert len(json.loads((tmp_path / "out.json").read_text())["iterations"]) == 4
+    rows = list(csv.DictReader((tmp_path / "out.csv").open()))
+    assert [r["step"] for r in rows] == ["home", "login_page", "login_post", "account", "journey"]
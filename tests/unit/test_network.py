@@ -0,0 +1,76 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from utils.network import NetworkBlocker, SizeTable, first_party_hosts, resolve_profile
+
+
+def test_full_profile_blocks_nothing():
+    blocker = NetworkBlocker(resolve_profile("full"), first_party_hosts("https://www.matahari.com"))
+    assert blocker.block_reason("https://cdn.example.com/a.png", "image") is None
+
+
+def test_no_media_blocks_images_but_not_analytics():
+    blocker = NetworkBlocker(resolve_profile("no-media"))
+    assert blocker.block_reason("https://www.matahari.com/a.png", "image") == "image"
+    assert blocker.block_reason("https://api.useinsider.com/x.js", "script") is None
+    assert blocker.block_reason("https://www.matahari.com/", "document") is None
+
+
+def test_analytics_blocking_is_its_own_profile():
+    analytics = NetworkBlocker(resolve_profile("no-analytics"))
+    assert analytics.block_reason("https://api.useinsider.com/x.js", "script") == "deny"
+    assert analytics.block_reason("https://www.matahari.com/a.png", "image") is None
+    both = NetworkBlocker(resolve_profile("no-media-analytics"))
+    assert both.block_reason("https://api.useinsider.com/x.js", "script") == "deny"
+    assert both.block_reason("https://www.matahari.com/a.png", "image") == "image"
+
+
+def test_first_party_only_honours_allow_list():
+    profile = resolve_profile("first-party-only", allow=["cdn.shopify.com"])
+    blocker = NetworkBlocker(profile, first_party_hosts("https://www.matahari.com"))
+    assert blocker.block_reason("https://matahari.com/cart.js", "script") is None
+    assert blocker.block_reason("https://cdn.shopify.com/theme.js", "script") is None
+    assert blocker.block_reason("https://unpkg.com/lib.js", "script") == "third-party"
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        resolve_profile("turbo")
+
+
+class _FakeContext:
+    def __init__(self):
+        self.listeners = []
+        self.routes = []
+
+    def on(self, event, handler):
+        self.listeners.append(event)
+
+    def route(self, pattern, handler):
+        self.routes.append(pattern)
+
+
+def test_full_profile_without_size_table_leaves_context_alone():
+    context = _FakeContext()
+    NetworkBlocker(resolve_profile("full")).attach(context)
+    assert context.listeners == [] and context.routes == []
+    context = _FakeContext()
+    NetworkBlocker(resolve_profile("no-media"), sizes=SizeTable()).attach(context)
+    assert context.listeners == ["response"] and context.routes == ["**/*"]
+
+
+def test_size_table_rewrites_file_only_when_it_learned_something(tmp_path):
+    path = tmp_path / "sizes.json"
+    response = SimpleNamespace(url="https://cdn.example.com/a.png?v=1", headers={"content-length": "1200"})
+    table = SizeTable(path)
+    table.save()
+    assert not path.exists()
+    table.learn(response)
+    table.save()
+    assert json.loads(path.read_text()) == {"cdn.example.com/a.png": 1200}
+    mtime = path.stat().st_mtime_ns
+    again = SizeTable(path)
+    again.learn(response)  # same size as on disk
+    again.save()
+    assert path.stat().st_mtime_ns == mtime
@@ -0,0 +1,163 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from pages import overlays
+from pages.overlays import AsyncOverlayDismisser, OverlayDismisser, _guard_script, _on_overlay_event
+
+
+class _FakeContext:
+    pass
+
+
+class _FakePage:
+    """A watched page whose main-frame observer answers ``showing``."""
+
+    def __init__(self, showing, frames=1):
+        self.context = _FakeContext()
+        self.frames = [object() for _ in range(frames)]
+        self.main_frame = self.frames[0]
+        self.showing = showing
+        overlays._watched_contexts.add(self.context)
+
+    def evaluate(self, script, *args):
+        assert script == overlays.PRESENT_JS
+        return self.showing
+
+    def report(self, frame_index, kind, selector=""):
+        _on_overlay_event({"page": self, "frame": self.frames[frame_index]}, kind, selector, 0)
+
+
+def test_overlay_visible_before_its_binding_event_arrives_is_not_skipped():
+    # The popup attached after goto; the page sees it, the ``attach`` event is still in flight.
+    page = _FakePage(showing=["#ins-frameless-overlay"])
+    page.report(0, "ready")
+    assert not overlays.overlay_state(page).present
+    assert not OverlayDismisser(page).nothing_showing()
+
+
+def test_child_frames_count_only_once_their_observer_reported():
+    page = _FakePage(showing=[], frames=2)
+    page.report(0, "ready")
+    assert not OverlayDismisser(page).nothing_showing()
+    page.report(1, "ready")
+    assert OverlayDismisser(page).nothing_showing()
+    page.report(1, "attach", "span.ins-web-opt-in-reminder-close-button")
+    assert not OverlayDismisser(page).nothing_showing()
+
+
+def test_unwatched_page_or_missing_observer_is_never_skipped():
+    page = _FakePage(showing=None)
+    page.report(0, "ready")
+    assert not OverlayDismisser(page).nothing_showing()
+    overlays._watched_contexts.discard(page.context)
+    page.showing = []
+    assert not OverlayDismisser(page).nothing_showing()
+
+
+def test_guard_only_auto_dismisses_marketing_overlays():
+    script = _guard_script(True)
+    cfg = json.loads(script.split("const cfg = ", 1)[1].split(";\n", 1)[0])
+    assert cfg["auto"] is True
+    assert cfg["roots"] == overlays.OVERLAY_ROOTS
+    assert cfg["close"] == overlays.MARKETING_CLOSE_SELECTORS
+    assert not cfg["texts"]
+    generic = set(overlays.CLOSE_SELECTORS) - set(overlays.MARKETING_CLOSE_SELECTORS)
+    assert generic and not generic & set(cfg["close"])
+
+
+class _FakeAsyncContext:
+    def __init__(self):
+        self.bindings = {}
+        self.handlers = {}
+        self.scripts = []
+
+    async def expose_binding(self, name, callback):
+        self.bindings[name] = callback
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def add_init_script(self, script):
+        self.scripts.append(script)
+
+
+def _run(coro):
+    # Own thread: the session-wide sync ``playwright`` fixture keeps a loop running on this one.
+    with ThreadPoolExecutor(1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+class _FakeAsyncPage(_FakePage):
+    async def evaluate(self, script, *args):
+        return super().evaluate(script, *args)
+
+
+def test_async_install_exposes_the_overlay_binding_like_the_sync_one():
+    context = _FakeAsyncContext()
+    _run(AsyncOverlayDismisser.install(context, auto_dismiss=False))
+    assert context.bindings == {"__overlayEvent": _on_overlay_event}
+    assert "page" in context.handlers and context.scripts == [_guard_script(False)]
+    assert context in overlays._watched_contexts
+
+    page = _FakeAsyncPage(showing=[], frames=2)
+    page.context = context
+    dismisser = AsyncOverlayDismisser(page)
+    page.report(0, "ready")
+    assert not _run(dismisser.nothing_showing())
+    context.bindings["__overlayEvent"]({"page": page, "frame": page.frames[1]}, "ready", "", 0)
+    assert _run(dismisser.nothing_showing())
+
+
+class _FakeFrame:
+    def __init__(self):
+        self.configs = []
+
+    def evaluate(self, script, config):
+        assert script == overlays.DISMISS_JS
+        self.configs.append(config)
+        return 1
+
+
+class _FakeAsyncFrame(_FakeFrame):
+    async def evaluate(self, script, config):
+        return super().evaluate(script, config)
+
+
+class _HandledPage:
+    """Captures what ``register`` hands to ``add_locator_handler``."""
+
+    def __init__(self, frame):
+        self.frames = [frame]
+        self.handlers = []
+
+    def locator(self, selector):
+        return selector
+
+    def add_locator_handler(self, locator, handler, no_wait_after=False):
+        self.handlers.append((locator, handler))
+
+
+class _AsyncHandledPage(_HandledPage):
+    async def add_locator_handler(self, locator, handler, no_wait_after=False):
+        super().add_locator_handler(locator, handler, no_wait_after)
+
+
+def test_locator_handler_clicks_only_the_overlays_own_close_controls():
+    frame = _FakeFrame()
+    page = _HandledPage(frame)
+    OverlayDismisser(page).register()
+    [(locator, handler)] = page.handlers
+    assert locator == ", ".join(overlays.OVERLAY_ROOTS)
+    handler()
+    assert frame.configs == [overlays._GUARD_CONFIG]
+    # An explicit dismiss() still uses the generic selectors.
+    OverlayDismisser(page).dismiss()
+    assert frame.configs[-1] == overlays._CONFIG
+
+    frame = _FakeAsyncFrame()
+    page = _AsyncHandledPage(frame)
+    _run(AsyncOverlayDismisser(page).register())
+    [(_, handler)] = page.handlers
+    _run(handler())
+    assert frame.configs == [overlays._GUARD_CONFIG]
@@ -0,0 +1,43 @@
+from utils.scheduler import DurationHistory, DurationTally, plan_lpt
+
+
+def _history(tmp_path, durations, affinity=None):
+    history = DurationHistory(tmp_path / "durations.json")
+    for nodeid, seconds in durations.items():
+        history.record(nodeid, seconds, (affinity or {}).get(nodeid))
+    return history
+
+
+def test_longest_tests_are_spread_first(tmp_path):
+    history = _history(tmp_path, {"slow_a": 10, "slow_b": 9, "fast_1": 1, "fast_2": 1, "fast_3": 1})
+    plan = plan_lpt(["fast_1", "slow_a", "fast_2", "slow_b", "fast_3"], 2, history)
+    slow_bins = {k for k, b in enumerate(plan.bins) for i in b if i in (1, 3)}
+    assert slow_bins == {0, 1}
+    assert plan.makespan == 11
+
+
+def test_affinity_group_lands_on_one_worker(tmp_path):
+    durations = {"login_a": 3, "login_b": 3, "home_a": 2, "home_b": 2, "home_c": 2}
+    affinity = {"login_a": "dev/phone", "login_b": "dev/phone"}
+    history = _history(tmp_path, durations, affinity)
+    plan = plan_lpt(list(durations), 2, history)
+    assert any({0, 1} <= set(b) for b in plan.bins)
+
+
+def test_unknown_tests_use_median_duration(tmp_path):
+    history = _history(tmp_path, {"a": 2, "b": 4, "c": 6})
+    assert history.predict("new", history.default_duration()) == 4
+
+
+def test_tally_keeps_only_tests_whose_call_ran_unskipped():
+    tally = DurationTally()
+    for when, duration in (("setup", 0.5), ("call", 2.0), ("teardown", 0.25)):
+        tally.add("ran", when, duration, skipped=False)
+    # Skipped in setup: pytest still reports a passed teardown.
+    tally.add("setup_skip", "setup", 0.0, skipped=True)
+    tally.add("setup_skip", "teardown", 0.0, skipped=False)
+    # pytest.skip() inside the test body.
+    tally.add("call_skip", "setup", 0.1, skipped=False)
+    tally.add("call_skip", "call", 0.0, skipped=True)
+    tally.add("call_skip", "teardown", 0.1, skipped=False)
+    assert tally.durations() == {"ran": 2.75}
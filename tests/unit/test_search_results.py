@@ -0,0 +1,17 @@
+import pytest
+
+from pages.search_results import parse_price
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Rp 199.000", 199000.0),
+    ("Rp1.299.000", 1299000.0),
+    ("Rp 199.000,00", 199000.0),
+    ("$1,299.50", 1299.5),
+    ("19.99", 19.99),
+    ("Mulai dari Rp 89.000", 89000.0),
+    ("Habis", None),
+    ("", None),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
@@ -0,0 +1,50 @@
+from pages.snapshot import Snapshotter
+
+
+class _FakePage:
+    """Just enough of a Page to count evaluations."""
+
+    def __init__(self):
+        self.url = "https://shop.test/account/login"
+        self.evaluations = 0
+
+    def evaluate(self, script, spec):
+        self.evaluations += 1
+        return {
+            "url": self.url,
+            "title": "Login",
+            "ready_state": "complete",
+            "viewport": {"width": 1280, "height": 720, "scroll_y": 0},
+            "elements": {"body": {"count": 1, "texts": []}, "[role='alert']": {"count": 1, "texts": ["Salah"]}},
+            "fields": {"password": "******"},
+        }
+
+
+def test_snapshot_answers_checks_from_one_evaluation():
+    page = _FakePage()
+    snap = Snapshotter(page, {"body": "body", "[role='alert']": "[role='alert']"}).take()
+    assert snap.visible("body") and not snap.visible("form")
+    assert snap.visible_texts(["[role='alert']", ".errors"]) == {"[role='alert']": ["Salah"]}
+    assert snap.value("password") == "******"
+    assert page.evaluations == 1
+
+
+def test_memoised_snapshot_expires_on_navigation_and_invalidate():
+    page = _FakePage()
+    snapper = Snapshotter(page, {"body": "body"})
+    snapper.take()
+    snapper.take(max_age_ms=10_000)
+    assert page.evaluations == 1
+    snapper.invalidate()
+    snapper.take(max_age_ms=10_000)
+    page.url = "https://shop.test/account"
+    snapper.take(max_age_ms=10_000)
+    assert page.evaluations == 3
+    snapper.take()  # no max age: always fresh
+    assert page.evaluations == 4
+
+
+def test_empty_texts_collects_no_text():
+    # ``texts=[]`` (HomePage) must not fall back to serialising innerText of every element.
+    assert Snapshotter(_FakePage(), {"body": "body"}, texts=[]).spec["texts"] == []
+    assert Snapshotter(_FakePage(), {"body": "body"}).spec["texts"] == ["body"]
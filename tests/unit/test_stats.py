@@ -0,0 +1,20 @@
+from utils.bench import Baseline
+from utils.stats import percentile, summarize
+
+
+def test_percentile_interpolates():
+    values = [1, 2, 3, 4, 5]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 4.8
+    assert percentile([], 99) == 0.0
+
+
+def test_baseline_flags_p95_regression(tmp_path):
+    baseline = Baseline(tmp_path / "baseline.json")
+    baseline.update("flow", summarize([0.10] * 20))
+    baseline.save()
+
+    baseline = Baseline(tmp_path / "baseline.json")
+    assert baseline.check("flow", summarize([0.11] * 20), threshold=0.25) is None
+    assert "exceeds baseline" in baseline.check("flow", summarize([0.20] * 20), threshold=0.25)
+    assert baseline.check("unknown", summarize([1.0]), threshold=0.25) is None
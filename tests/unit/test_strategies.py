@@ -0,0 +1,76 @@
+from utils.strategies import StrategyRegistry
+
+
+def _fail():
+    raise RuntimeError("no match")
+
+
+def _ok():
+    return None
+
+
+def test_known_winner_is_tried_first(tmp_path):
+    reg = StrategyRegistry(tmp_path / "registry.json")
+    calls = []
+
+    def track(name, fn):
+        return name, lambda: (calls.append(name), fn())
+
+    strategies = [track("css", _fail), track("role", _ok)]
+    assert reg.run("chain", strategies) == "role"
+    calls.clear()
+    assert reg.run("chain", strategies) == "role"
+    assert calls == ["role"]
+
+
+def test_failing_winner_decays_back_behind_declared_order():
+    reg = StrategyRegistry(decay=0.5)
+    for _ in range(2):
+        reg.record("chain", "b", True, 1)
+    assert reg.order("chain", ["a", "b"]) == ["b", "a"]
+    for _ in range(3):
+        reg.record("chain", "b", False, 1)
+    assert reg.order("chain", ["a", "b"]) == ["a", "b"]
+
+
+def test_savings_count_skipped_failure_time():
+    reg = StrategyRegistry()
+    reg.record("chain", "slow", False, 600)
+    reg.record("chain", "fast", True, 5)
+    assert reg.run("chain", [("slow", _fail), ("fast", _ok)]) == "fast"
+    assert reg.stats.reordered_runs == 1
+    assert reg.stats.saved_ms == 600
+
+
+def test_save_merges_with_other_workers(tmp_path):
+    path = tmp_path / "registry.json"
+    one, two = StrategyRegistry(path), StrategyRegistry(path)
+    one.record("a", "x", True, 1)
+    two.record("b", "y", True, 1)
+    one.save()
+    two.save()
+    assert set(StrategyRegistry(path).data) == {"a", "b"}
+
+
+def test_save_merges_workers_per_strategy(tmp_path):
+    path = tmp_path / "registry.json"
+    seed = StrategyRegistry(path)
+    seed.record("chain", "css", True, 5)
+    seed.save()
+    # Two workers load the same file, then both record the same strategy.
+    a, b = StrategyRegistry(path), StrategyRegistry(path)
+    a.record("chain", "css", True, 5)
+    b.record("chain", "css", False, 600)
+    b.record("chain", "role", True, 8)
+    a.save()
+    b.save()
+    merged = StrategyRegistry(path).data["chain"]
+    assert (merged["css"]["wins"], merged["css"]["fails"]) == (2, 1)
+    assert merged["css"]["fail_ms"] == 600
+    assert merged["role"]["wins"] == 1
+
+
+def test_save_without_new_outcomes_leaves_file_alone(tmp_path):
+    path = tmp_path / "registry.json"
+    StrategyRegistry(path).save()
+    assert not path.exists()
@@ -0,0 +1,57 @@
+import pytest
+
+from utils.timeouts import TimeoutPolicy
+
+
+@pytest.fixture(autouse=True)
+def _dev_env(monkeypatch):
+    # Samples are keyed by the active env; pin it so TEST_ENV/.env can't change the key.
+    monkeypatch.setattr("utils.config.active_env", lambda: "dev")
+
+
+def _policy(tmp_path, samples, **kwargs):
+    policy = TimeoutPolicy(tmp_path / "latency.json", min_samples=5, **kwargs)
+    for ms in samples:
+        policy.observe("Loginpage.email_toggle.css", ms)
+    return policy
+
+
+def test_default_until_enough_samples(tmp_path):
+    policy = _policy(tmp_path, [40, 50, 60])
+    assert policy.timeout("Loginpage.email_toggle.css", 600) == 600
+
+
+def test_learned_timeout_is_clamped_to_floor_and_cap(tmp_path):
+    fast = _policy(tmp_path, [20] * 10)
+    assert fast.timeout("Loginpage.email_toggle.css", 600) == 250
+    slow = _policy(tmp_path, [1500] * 10)
+    assert slow.timeout("Loginpage.email_toggle.css", 600) == 1800
+    typical = _policy(tmp_path, [200] * 10)
+    assert typical.timeout("Loginpage.email_toggle.css", 600) == 400
+
+
+def test_record_mode_learns_but_keeps_defaults(tmp_path):
+    policy = _policy(tmp_path, [200] * 10, mode="record")
+    assert policy.timeout("Loginpage.email_toggle.css", 600) == 600
+    assert policy.learned("Loginpage.email_toggle.css", 600) == 400
+
+
+def test_failures_are_not_samples(monkeypatch):
+    from utils import timeouts
+
+    monkeypatch.setattr(timeouts, "_policy", TimeoutPolicy(min_samples=1))
+    with pytest.raises(TimeoutError):
+        with timeouts.timed("probe", 600):
+            raise TimeoutError
+    with timeouts.timed("probe", 600) as t:
+        assert t == 600
+    assert list(timeouts.policy().samples["dev"]) == ["probe"]
+    assert len(timeouts.policy().samples["dev"]["probe"]) == 1
+
+
+def test_save_appends_to_other_workers_samples(tmp_path):
+    first = _policy(tmp_path, [100, 110])
+    second = _policy(tmp_path, [120])
+    first.save()
+    second.save()
+    assert len(TimeoutPolicy(tmp_path / "latency.json").samples["dev"]["Loginpage.email_toggle.css"]) == 3
@@ -0,0 +1,40 @@
+from playwright.sync_api import TimeoutError as PWTimeout
+from utils import timing
+
+
+class _Flow:
+    def run(self):
+        with timing.attempt("first"):
+            raise PWTimeout("slow")
+        with timing.attempt("second"):
+            timing.note(branch="second")
+            return self._helper()
+
+    def _helper(self):
+        return 42
+
+
+def test_disabled_attempt_suppresses_like_suppress():
+    assert timing.tracer() is None
+    with timing.attempt("noop"):
+        raise RuntimeError("ignored")
+
+
+def test_spans_record_nesting_branches_and_timeouts(tmp_path):
+    timing.enable(tmp_path / "main.jsonl")
+    try:
+        timing.instrument(_Flow)
+        timing.tracer().begin_test("t::flow")
+        assert _Flow().run() == 42
+        spans = {s["name"]: s for s in timing.tracer().end_test()}
+    finally:
+        timing.disable()
+
+    assert spans["attempt:first"]["timeout"] is True
+    assert spans["attempt:second"]["ok"] is True
+    assert spans["attempt:second"]["attrs"] == {"branch": "second"}
+    assert spans["_Flow._helper"]["parent"] == "attempt:second"
+    assert spans["_Flow.run"]["depth"] == 0
+
+    summary = timing.summarize(timing.load_spans(tmp_path))
+    assert summary[-1].startswith("time lost to timeouts")
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from utils import emulation
+from utils.vitals import Budgets, VitalsCollector, VitalsStore, summarize
+
+
+def test_env_section_overrides_default_budgets(tmp_path):
+    path = tmp_path / "budgets.json"
+    path.write_text(json.dumps({
+        "default": {"login": {"lcp_ms": 3500, "cls": 0.1}},
+        "prod": {"login": {"lcp_ms": 2500}},
+    }))
+    assert Budgets.load(path, "prod").pages["login"] == {"lcp_ms": 2500, "cls": 0.1}
+    assert Budgets.load(path, "dev").pages["login"]["lcp_ms"] == 3500
+
+
+def test_check_reports_only_measured_metrics_over_budget():
+    budgets = Budgets({"login": {"lcp_ms": 2500, "cls": 0.1, "fcp_ms": 1000}})
+    violations = budgets.check("login", {"lcp_ms": 3100.5, "cls": 0.02, "fcp_ms": None})
+    assert violations == ["login lcp_ms=3100.5 > budget 2500"]
+    assert budgets.check("home", {"lcp_ms": 99999}) == []
+
+
+def test_store_keeps_one_series_per_env_and_page(tmp_path):
+    store = VitalsStore(tmp_path)
+    for env, page, lcp in [("dev", "login", 1000), ("dev", "login", 1200), ("prod", "login", 900)]:
+        store.append({"env": env, "page": page, "lcp_ms": lcp, "violations": []})
+    assert [r["lcp_ms"] for r in store.history("dev", "login")] == [1000, 1200]
+    assert store.path_for("prod", "login").exists()
+    lines = summarize(store.history("dev", "login"))
+    assert lines[1].startswith("dev/login")
+
+
+def test_emulation_profile_budgets_layer_over_env(tmp_path):
+    path = tmp_path / "budgets.json"
+    path.write_text(json.dumps({
+        "default": {"login": {"lcp_ms": 3500, "cls": 0.1}},
+        "prod": {"login": {"lcp_ms": 2500}},
+        "slow-3g": {"login": {"lcp_ms": 9000}},
+        "prod/slow-3g": {"login": {"cls": 0.2}},
+    }))
+    assert Budgets.load(path, "prod").pages["login"] == {"lcp_ms": 2500, "cls": 0.1}
+    assert Budgets.load(path, "prod", "slow-3g").pages["login"] == {"lcp_ms": 9000, "cls": 0.2}
+    assert Budgets.load(path, "dev", "slow-3g").pages["login"] == {"lcp_ms": 9000, "cls": 0.1}
+
+
+class _FakePage:
+    url = "https://shop.test/account/login"
+
+    def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    def evaluate(self, script):
+        return {"lcp_ms": 6000.0, "cls": 0.01}
+
+
+@pytest.fixture
+def throttled():
+    emulation.use("slow-3g")
+    yield
+    emulation.use(None)
+
+
+def test_collector_keys_history_and_budgets_by_emulation_profile(tmp_path, monkeypatch, throttled):
+    monkeypatch.setattr("utils.config.active_env", lambda: "dev")
+    budgets = tmp_path / "budgets.json"
+    budgets.write_text(json.dumps({"default": {"login": {"lcp_ms": 3500}}, "slow-3g": {"login": {"lcp_ms": 9000}}}))
+    store = VitalsStore(tmp_path / "vitals")
+    record = VitalsCollector(store, budgets, mode="fail").collect(_FakePage(), "login")
+    assert record["profile"] == "slow-3g" and record["violations"] == []
+    assert store.history("dev", "login") == []
+    assert [r["lcp_ms"] for r in store.history("dev", "login", "slow-3g")] == [6000.0]
+
+
+def test_summary_keeps_profiles_apart():
+    records = [
+        {"env": "dev", "page": "login", "lcp_ms": 1000, "violations": []},
+        {"env": "dev", "profile": "slow-3g", "page": "login", "lcp_ms": 7000, "violations": []},
+    ]
+    lines = summarize(records)
+    assert [line.split()[0] for line in lines[1:]] == ["dev/login", "dev/slow-3g/login"]
+    assert [line.split()[4] for line in lines[1:]] == ["1000", "7000"]
@@ -0,0 +1,204 @@
+# utils/accounts.py
+"""Exclusive test-account leases shared by every process of a run.
+
+Two workers logging into the same account invalidate each other's
+sessions, so tests that log in lease an account from the env's pool first.
+The lease table lives in ``<dir>/<env>.json`` and is only read or written
+under an exclusive ``flock`` on ``<dir>/<env>.lock``, which makes it safe
+across xdist workers (and separate pytest invocations) on one machine.
+
+A lease expires ``ttl_seconds`` after it was taken or last renewed, and a
+lease whose holder process has exited is reclaimed straight away, so a
+crashed worker never keeps an account. Accounts are identified by a hash
+(as in the auth cache), never by phone number or email.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class LeaseTimeout(TimeoutError):
+    """No account of the pool became free within the wait timeout."""
+
+
+def account_key(account) -> str:
+    ident = f"{account.dial_code}{account.phone_number}|{account.email}"
+    return hashlib.sha1(ident.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class Lease:
+    account: object
+    key: str
+    holder: str
+    waited: float = 0.0     # seconds spent waiting for a free account
+    contended: bool = False  # every account was taken when we asked
+
+
+@dataclass
+class LeaseStats:
+    leases: int = 0
+    contended: int = 0
+    wait_seconds: float = 0.0
+    max_wait: float = 0.0
+    timeouts: int = 0
+    reclaimed: int = 0      # expired or orphaned leases taken over
+
+
+class AccountPool:
+    def __init__(self, lease_dir: str | Path = ".leases", *, ttl_seconds: float = 600, wait_seconds: float = 300,
+                 poll_seconds: float = 0.2):
+        self.lease_dir = Path(lease_dir)
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+        self.stats = LeaseStats()
+        self._last: dict[str, str] = {}  # env -> key this process held last (its cached session is warm)
+
+    # ----- lease table -----
+    @contextmanager
+    def _table(self, env: str) -> Iterator[dict]:
+        self.lease_dir.mkdir(parents=True, exist_ok=True)
+        path = self.lease_dir / f"{env}.json"
+        with open(self.lease_dir / f"{env}.lock", "a+b") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                try:
+                    table = json.loads(path.read_text(encoding="utf-8"))
+                except (FileNotFoundError, ValueError):
+                    table = {}
+                before = json.dumps(table, sort_keys=True)
+                yield table
+                if json.dumps(table, sort_keys=True) != before:
+                    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                    tmp.write_text(json.dumps(table, indent=1, sort_keys=True), encoding="utf-8")
+                    os.replace(tmp, path)
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+                else:
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def _stale(entry: dict, now: float) -> bool:
+        if entry["expires"] <= now:
+            return True
+        if entry.get("host") != socket.gethostname():
+            return False
+        try:
+            os.kill(entry["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    def _try_take(self, env: str, accounts: Sequence, holder: str) -> Lease | None:
+        keys = [account_key(a) for a in accounts]
+        preferred = self._last.get(env)
+        order = sorted(range(len(accounts)), key=lambda i: keys[i] != preferred)
+        now = time.time()
+        with self._table(env) as table:
+            for i in order:
+                entry = table.get(keys[i])
+                if entry is not None and not self._stale(entry, now):
+                    continue
+                if entry is not None:
+                    self.stats.reclaimed += 1
+                table[keys[i]] = {
+                    "holder": holder,
+                    "pid": os.getpid(),
+                    "host": socket.gethostname(),
+                    "expires": now + self.ttl_seconds,
+                }
+                return Lease(accounts[i], keys[i], holder)
+        return None
+
+    # ----- public API -----
+    def acquire(self, env: str, accounts: Sequence, holder: str, wait_seconds: float | None = None) -> Lease:
+        """Take a free account (this process's previous one if free), waiting up to ``wait_seconds``."""
+        if not accounts:
+            raise ValueError(f"no test accounts configured for env={env}")
+        wait_seconds = self.wait_seconds if wait_seconds is None else wait_seconds
+        started = time.monotonic()
+        lease = self._try_take(env, accounts, holder)
+        contended = lease is None
+        delay = self.poll_seconds
+        while lease is None:
+            if time.monotonic() - started >= wait_seconds:
+                self.stats.timeouts += 1
+                raise LeaseTimeout(
+                    f"all {len(accounts)} {env} account(s) stayed leased for {wait_seconds:.0f}s; "
+                    f"add accounts via {env.upper()}_ACCOUNTS_FILE or lower -n"
+                )
+            time.sleep(delay)
+            delay = min(delay * 1.5, 2.0)
+            lease = self._try_take(env, accounts, holder)
+        lease.waited = time.monotonic() - started
+        lease.contended = contended
+        self._last[env] = lease.key
+        s = self.stats
+        s.leases += 1
+        s.contended += contended
+        s.wait_seconds += lease.waited
+        s.max_wait = max(s.max_wait, lease.waited)
+        return lease
+
+    def renew(self, env: str, lease: Lease) -> bool:
+        """Push the expiry out again; False if the lease was lost (expired and taken over)."""
+        with self._table(env) as table:
+            entry = table.get(lease.key)
+            if not entry or entry["holder"] != lease.holder or entry["pid"] != os.getpid():
+                return False
+            entry["expires"] = time.time() + self.ttl_seconds
+            return True
+
+    def release(self, env: str, lease: Lease) -> None:
+        with self._table(env) as table:
+            entry = table.get(lease.key)
+            if entry and entry["holder"] == lease.holder and entry["pid"] == os.getpid():
+                del table[lease.key]
+
+    @contextmanager
+    def lease(self, env: str, accounts: Sequence, holder: str) -> Iterator[Lease]:
+        lease = self.acquire(env, accounts, holder)
+        try:
+            yield lease
+        finally:
+            self.release(env, lease)
+
+
+def summarize(records: list[dict]) -> list[str]:
+    """Totals over per-test lease records (``{"env", "account", "waited", "contended"}``; ``account`` None on timeout)."""
+    if not records:
+        return []
+    waits = [r["waited"] for r in records]
+    contended = sum(1 for r in records if r["contended"])
+    timeouts = sum(1 for r in records if r["account"] is None)
+    accounts = {(r["env"], r["account"]) for r in records if r["account"]}
+    lines = [
+        f"{len(records) - timeouts} lease(s) over {len(accounts)} account(s): {contended} contended, "
+        f"waited {sum(waits):.1f}s total (max {max(waits):.1f}s)",
+    ]
+    if timeouts:
+        lines.append(f"{timeouts} test(s) gave up waiting for a free account")
+    return lines
@@ -0,0 +1,97 @@
+# utils/auth_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable
+
+from playwright.sync_api import Browser, Page
+
+
+class AuthStateCache:
+    """On-disk cache of Playwright storage states, one file per (env, account, mode).
+
+    A file is considered fresh while its mtime is within ``ttl_seconds``.
+    Writes go through a temp file + ``os.replace`` so parallel xdist workers
+    never read a half-written state.
+    """
+
+    def __init__(self, cache_dir: str | Path = ".auth", ttl_seconds: int = 1800):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+
+    def path_for(self, env: str, account: str, mode: str) -> Path:
+        # Hash the account so phone numbers/emails don't end up in file names.
+        digest = hashlib.sha1(account.encode("utf-8")).hexdigest()[:12]
+        return self.cache_dir / f"{env}-{mode}-{digest}.json"
+
+    def fresh_path(self, env: str, account: str, mode: str) -> Path | None:
+        path = self.path_for(env, account, mode)
+        try:
+            age = time.time() - path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        return path if age < self.ttl_seconds else None
+
+    def save(self, state: dict, env: str, account: str, mode: str) -> Path:
+        path = self.path_for(env, account, mode)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    def invalidate(self, env: str, account: str, mode: str) -> None:
+        self.path_for(env, account, mode).unlink(missing_ok=True)
+
+
+def probe_state(browser: Browser, state_path: Path, probe_url: str, context_args: dict | None = None) -> bool:
+    """Open ``probe_url`` with the cached state and report whether we are still logged in."""
+    from pages.login_page import Loginpage
+
+    context = browser.new_context(**(context_args or {}), storage_state=str(state_path))
+    try:
+        page = context.new_page()
+        page.goto(probe_url, wait_until="domcontentloaded")
+        return Loginpage(page, probe_url).is_logged_in()
+    except Exception:
+        return False
+    finally:
+        context.close()
+
+
+def ensure_auth_state(
+    browser: Browser,
+    cache: AuthStateCache,
+    *,
+    env: str,
+    account: str,
+    mode: str,
+    login: Callable[[Page], bool],
+    probe_url: str,
+    context_args: dict | None = None,
+    force: bool = False,
+) -> Path:
+    """Return a path to a valid storage state, logging in through the UI if needed.
+
+    A cached file is reused only if it is within TTL *and* the probe confirms
+    the session is still accepted by the site; otherwise ``login`` runs once
+    and its resulting ``storage_state()`` replaces the cached file.
+    """
+    if not force:
+        cached = cache.fresh_path(env, account, mode)
+        if cached and probe_state(browser, cached, probe_url, context_args):
+            return cached
+        cache.invalidate(env, account, mode)
+
+    context = browser.new_context(**(context_args or {}))
+    try:
+        page = context.new_page()
+        if not login(page):
+            raise AssertionError(f"UI login failed for env={env} mode={mode}; still on {page.url}")
+        return cache.save(context.storage_state(), env, account, mode)
+    finally:
+        context.close()
@@ -0,0 +1,42 @@
+# utils/bench.py
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from utils.stats import summarize
+
+
+class Baseline:
+    """Stored p50/p95/p99 per benchmark, used to flag regressions between runs."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.data: dict[str, dict] = {}
+        if self.path.exists():
+            self.data = json.loads(self.path.read_text(encoding="utf-8"))
+
+    def check(self, name: str, stats: dict, threshold: float, metric: str = "p95") -> str | None:
+        """Return a message if ``stats[metric]`` is more than ``threshold`` above baseline."""
+        base = self.data.get(name, {}).get(metric)
+        if not base:
+            return None
+        limit = base * (1 + threshold)
+        if stats[metric] > limit:
+            return (
+                f"{name}: {metric} {stats[metric] * 1000:.0f} ms exceeds baseline "
+                f"{base * 1000:.0f} ms by more than {threshold:.0%}"
+            )
+        return None
+
+    def update(self, name: str, stats: dict) -> None:
+        self.data[name] = {k: stats[k] for k in ("n", "p50", "p95", "p99")}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.data, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def format_row(name: str, samples: list[float]) -> str:
+    s = summarize(samples)
+    return f"{name:<36} n={s['n']:<4} p50={s['p50'] * 1000:7.1f}ms p95={s['p95'] * 1000:7.1f}ms p99={s['p99'] * 1000:7.1f}ms"
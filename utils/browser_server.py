@@ -0,0 +1,296 @@
+# utils/browser_server.py
+"""Shared browser servers for xdist runs (``pytest -n auto --browser-servers=2``).
+
+The controller starts a few ``playwright launch-server`` processes and
+publishes their websocket endpoints in a small registry file; each worker
+connects to one of them (round-robin by worker number) instead of
+launching its own browser, and creates its isolated contexts there. A
+monitor thread relaunches a server that dies and bumps its generation in
+the registry; workers reconnect on the next context they create.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+REGISTRY_ENV = "PW_BROWSER_SERVERS"
+_WS = re.compile(r"(wss?://\S+)")
+
+
+# ---------- process memory ----------
+def process_tree_rss(pid: int) -> int | None:
+    """Resident bytes of ``pid`` and all its descendants (None where /proc is unavailable)."""
+    try:
+        import psutil  # optional
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            procs = [root, *root.children(recursive=True)]
+        except psutil.Error:
+            return None
+        total = 0
+        for p in procs:
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+    children: dict[int, list[int]] = {}
+    for stat in proc.glob("[0-9]*/stat"):
+        try:
+            # "pid (comm) state ppid ..." - comm may contain spaces, so split after ')'.
+            ppid = int(stat.read_text().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(stat.parent.name))
+    page = os.sysconf("SC_PAGE_SIZE")
+    total, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        try:
+            total += int((proc / str(p) / "statm").read_text().split()[1]) * page
+        except (OSError, ValueError, IndexError):
+            continue
+        stack.extend(children.get(p, ()))
+    return total
+
+
+# ---------- controller side ----------
+@dataclass
+class ServerProcess:
+    index: int
+    browser_name: str
+    launch_options: dict
+    proc: subprocess.Popen | None = None
+    ws_endpoint: str | None = None
+    generation: int = 0
+    startup_seconds: list = field(default_factory=list)
+    base_rss: int | None = None   # right after startup, before any context
+    peak_rss: int | None = None
+
+    def start(self, timeout: float = 60.0) -> None:
+        cfg = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        json.dump(self.launch_options, cfg)
+        cfg.close()
+        started = time.perf_counter()
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "playwright", "launch-server", "--browser", self.browser_name, "--config", cfg.name],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            start_new_session=True,  # so stop() can take the browser children down too
+        )
+        deadline = time.monotonic() + timeout
+        output = []
+        while time.monotonic() < deadline:
+            line = self.proc.stdout.readline()
+            if not line:
+                break
+            output.append(line)
+            m = _WS.search(line)
+            if m:
+                self.ws_endpoint = m.group(1)
+                break
+        os.unlink(cfg.name)
+        if not self.ws_endpoint:
+            self.stop()
+            raise RuntimeError(f"browser server {self.index} did not start: {''.join(output)[-500:]}")
+        # Keep draining output so the server never blocks on a full pipe.
+        threading.Thread(target=self.proc.stdout.read, daemon=True).start()
+        self.startup_seconds.append(time.perf_counter() - started)
+        self.generation += 1
+        self.base_rss = process_tree_rss(self.proc.pid)
+        self.peak_rss = max(self.peak_rss or 0, self.base_rss or 0) or None
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def sample_rss(self) -> None:
+        if self.alive():
+            rss = process_tree_rss(self.proc.pid)
+            if rss:
+                self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def stop(self) -> None:
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            try:
+                os.killpg(self.proc.pid, signal.SIGTERM)
+            except (OSError, AttributeError):
+                self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.proc = None
+
+
+class ServerFleet:
+    """Browser servers owned by the xdist controller, published through a registry file."""
+
+    def __init__(self, count: int, browser_name: str, launch_options: dict, registry: str | Path,
+                 poll_seconds: float = 1.0):
+        self.servers = [ServerProcess(i, browser_name, launch_options) for i in range(count)]
+        self.browser_name = browser_name
+        self.registry = Path(registry)
+        self.poll_seconds = poll_seconds
+        self.relaunches = 0
+        self._stop = threading.Event()
+        self._monitor: threading.Thread | None = None
+
+    def start(self) -> "ServerFleet":
+        threads = [threading.Thread(target=s.start) for s in self.servers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if not all(s.ws_endpoint for s in self.servers):
+            self.stop()
+            raise RuntimeError("not every browser server started")
+        self.publish()
+        self._monitor = threading.Thread(target=self._watch, name="browser-server-monitor", daemon=True)
+        self._monitor.start()
+        return self
+
+    def publish(self) -> None:
+        doc = {
+            "browser": self.browser_name,
+            "servers": [{"index": s.index, "ws": s.ws_endpoint, "generation": s.generation} for s in self.servers],
+        }
+        self.registry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.registry.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(doc), encoding="utf-8")
+        os.replace(tmp, self.registry)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            for server in self.servers:
+                if server.alive():
+                    server.sample_rss()
+                    continue
+                if self._stop.is_set():
+                    return
+                server.ws_endpoint = None
+                try:
+                    server.start()
+                except RuntimeError:
+                    continue  # try again on the next poll
+                self.relaunches += 1
+                self.publish()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._monitor:
+            self._monitor.join(timeout=5)
+        for server in self.servers:
+            server.sample_rss()
+            server.stop()
+        if self.registry.exists():
+            self.registry.unlink()
+
+    def report(self, workers: int) -> list[str]:
+        """Shared-server cost vs. an estimate of one browser per worker."""
+        startup = sum(sum(s.startup_seconds) for s in self.servers)
+        first = [s.startup_seconds[0] for s in self.servers if s.startup_seconds]
+        peak = sum(s.peak_rss or 0 for s in self.servers)
+        base = [s.base_rss for s in self.servers if s.base_rss]
+        lines = [
+            f"{len(self.servers)} shared {self.browser_name} server(s) for {workers} worker(s): "
+            f"startup {startup:.1f}s total, peak RSS {peak / 2**20:.0f} MiB, {self.relaunches} relaunch(es)",
+        ]
+        if first and base:
+            per_start = sum(first) / len(first)
+            per_rss = sum(base) / len(base)
+            lines.append(
+                f"per-worker model (est. from idle server): {workers} browsers, ~{per_start * workers:.1f}s startup, "
+                f"~{per_rss * workers / 2**20:.0f} MiB before any context"
+            )
+        return lines
+
+
+# ---------- worker side ----------
+def read_registry(path: str | Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def worker_slot(worker: str | None, count: int) -> int:
+    """Round-robin server index for an xdist worker id like ``gw5``."""
+    digits = re.sub(r"\D", "", worker or "")
+    return int(digits) % count if digits and count else 0
+
+
+class SharedBrowser:
+    """A ``Browser`` connected to a shared server; reconnects after the server is relaunched.
+
+    Attribute access is forwarded to the current connection, so it can stand
+    in for the ``browser`` fixture.
+    """
+
+    def __init__(self, browser_type, registry: str | Path, worker: str | None, reconnect_timeout: float = 60.0):
+        self._browser_type = browser_type
+        self._registry = Path(registry)
+        self._worker = worker
+        self._reconnect_timeout = reconnect_timeout
+        self._browser = None
+        self._generation = 0
+        self.slot = 0
+        self.connects = 0
+        self.connect_seconds = 0.0
+        self._connect()
+
+    def _endpoint(self) -> tuple[str, int]:
+        deadline = time.monotonic() + self._reconnect_timeout
+        while True:
+            doc = read_registry(self._registry)
+            servers = doc["servers"]
+            self.slot = worker_slot(self._worker, len(servers))
+            server = servers[self.slot]
+            # After a disconnect, wait for the controller to publish the relaunched server.
+            if server["generation"] > self._generation or self._browser is None:
+                return server["ws"], server["generation"]
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"browser server {self.slot} was not relaunched within {self._reconnect_timeout:.0f}s")
+            time.sleep(0.5)
+
+    def _connect(self) -> None:
+        started = time.perf_counter()
+        ws, generation = self._endpoint()
+        self._browser = self._browser_type.connect(ws)
+        self._generation = generation
+        self.connects += 1
+        self.connect_seconds += time.perf_counter() - started
+
+    @property
+    def browser(self):
+        if not self._browser.is_connected():
+            self._connect()
+        return self._browser
+
+    def new_context(self, **kwargs):
+        return self.browser.new_context(**kwargs)
+
+    def new_page(self, **kwargs):
+        return self.browser.new_page(**kwargs)
+
+    def close(self) -> None:
+        # For a connected browser this closes our contexts and disconnects; the server stays up.
+        if self._browser is not None and self._browser.is_connected():
+            self._browser.close()
+
+    def __getattr__(self, name):
+        return getattr(self.browser, name)
@@ -0,0 +1,91 @@
+# utils/catalogue.py
+"""Stream search results for many terms concurrently from one browser.
+
+    async for product in stream_search(["dress", "kemeja", "sepatu"], base_url, concurrency=3):
+        check(product)
+
+Each term runs in its own context; products are handed over through a
+bounded queue, so a slow consumer pauses the extractors instead of letting
+results pile up in memory.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Iterable
+
+from playwright.async_api import async_playwright
+
+from pages.async_home_page import AsyncHomePage
+from pages.overlays import AsyncOverlayDismisser
+from pages.search_results import Product
+
+
+class SearchFailed(RuntimeError):
+    """One or more terms failed; the products of the other terms were still streamed."""
+
+    def __init__(self, errors: dict[str, BaseException]):
+        self.errors = errors
+        first_term, first = next(iter(errors.items()))
+        super().__init__(f"{len(errors)} search term(s) failed, e.g. {first_term!r}: {type(first).__name__}: {first}")
+
+
+async def stream_search(
+    terms: Iterable[str],
+    base_url: str,
+    *,
+    concurrency: int = 4,
+    buffer: int = 256,
+    max_pages: int | None = None,
+    max_items_per_term: int | None = None,
+    prune: bool = False,
+    browser_name: str = "chromium",
+    headless: bool = True,
+    context_args: dict | None = None,
+) -> AsyncIterator[Product]:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+    done = object()
+    errors: dict[str, BaseException] = {}
+    sem = asyncio.Semaphore(concurrency)
+
+    async with async_playwright() as p:
+        browser = await getattr(p, browser_name).launch(headless=headless)
+
+        async def _term(term: str) -> None:
+            async with sem:
+                context = await browser.new_context(**(context_args or {}))
+                await AsyncOverlayDismisser.install(context)
+                try:
+                    home = AsyncHomePage(await context.new_page(), base_url)
+                    await home.goto()
+                    async for product in home.search_products(
+                        term, max_pages=max_pages, max_items=max_items_per_term, prune=prune
+                    ):
+                        await queue.put(product)
+                except Exception as e:
+                    errors[term] = e
+                finally:
+                    await context.close()
+
+        async def _produce() -> None:
+            stopped = False
+            try:
+                await asyncio.gather(*(_term(t) for t in terms))
+            except asyncio.CancelledError:
+                # The consumer stopped early: nobody waits for ``done``, and a put
+                # on a full buffer would never return.
+                stopped = True
+                raise
+            finally:
+                if not stopped:
+                    await queue.put(done)
+
+        producer = asyncio.create_task(_produce())
+        try:
+            while (item := await queue.get()) is not done:
+                yield item
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            await browser.close()
+    if errors:
+        raise SearchFailed(errors)
@@ -1,8 +1,9 @@
 # utils/config.py
 from pydantic import BaseModel
 from dotenv import load_dotenv
+import json
 import os
-import sys
+from functools import lru_cache
 
 # Load .env file from project root
 load_dotenv()
@@ -10,6 +11,21 @@ load_dotenv()
 def pick(env: str, key: str, default: str | None = None) -> str | None:
     return os.getenv(f"{env.upper()}_{key}", default)
 
+def pick_list(env: str, key: str) -> list[str]:
+    """Comma-separated env var -> list, e.g. DEV_NETWORK_DENY="*.hotjar.com,*.tiktok.com"."""
+    return [v.strip() for v in (pick(env, key) or "").split(",") if v.strip()]
+
+class Account(BaseModel):
+    phone_number: str
+    email: str
+    password: str
+    dial_code: str = "+91"
+
+    @property
+    def phone(self) -> str:
+        return self.phone_number
+
+
 class Settings(BaseModel):
     test_env: str
     env_prefix: str
@@ -26,36 +42,129 @@ class Settings(BaseModel):
     phone_number: str
     email: str
     password: str
+    dial_code: str = "+91"
+
+    # Network blocking (host patterns for the "custom"/"first-party-only" profiles)
+    network_allow: list[str] = []
+    network_deny: list[str] = []
+
+    # Extra test accounts (<PREFIX>_ACCOUNTS_FILE); see ``accounts``.
+    extra_accounts: list[Account] = []
 
     @property
     def phone(self) -> str:
         return self.phone_number
 
+    @property
+    def accounts(self) -> list[Account]:
+        """The lease pool: the primary PHONE/EMAIL/PASSWORD account first, then the extras."""
+        primary = Account(phone_number=self.phone_number, email=self.email, password=self.password, dial_code=self.dial_code)
+        return [primary, *self.extra_accounts]
+
+
+# ---------- Build Settings (lazy, cached per env) ----------
+ENV_PREFIXES = {"dev": "DEV", "staging": "STAGING", "prod": "PROD"}
+
+
+class ConfigError(RuntimeError):
+    """Raised when an environment's settings are missing or invalid."""
+
+
+def _require(prefix: str, key: str) -> str:
+    value = pick(prefix, key)
+    if not value:
+        raise ConfigError(f"❌ {prefix}_{key} missing")
+    return value
+
+
+def _load_accounts(prefix: str, dial_code: str) -> list[Account]:
+    """``<PREFIX>_ACCOUNTS_FILE``: JSON list of ``{"phone", "email", "password", "dial_code"?}``."""
+    path = pick(prefix, "ACCOUNTS_FILE")
+    if not path:
+        return []
+    try:
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+    except (OSError, ValueError) as exc:
+        raise ConfigError(f"❌ {prefix}_ACCOUNTS_FILE={path} unreadable: {exc}") from exc
+    accounts = []
+    for i, entry in enumerate(raw):
+        try:
+            accounts.append(Account(
+                phone_number=entry["phone"],
+                email=entry["email"],
+                password=entry["password"],
+                dial_code=entry.get("dial_code", dial_code),
+            ))
+        except (KeyError, TypeError) as exc:
+            raise ConfigError(f"❌ {prefix}_ACCOUNTS_FILE entry {i} needs phone, email and password") from exc
+    return accounts
+
+
+def default_env() -> str:
+    raw_env = os.getenv("TEST_ENV")
+    if not raw_env:
+        raise ConfigError("❌ ERROR: TEST_ENV not found in .env. Please set TEST_ENV=dev|staging|prod")
+    return raw_env.lower()
+
+
+@lru_cache(maxsize=None)
+def get_settings(env: str | None = None) -> Settings:
+    """Build (once) and return the Settings for ``env`` (default: ``TEST_ENV``)."""
+    env = (env or default_env()).lower()
+    if env not in ENV_PREFIXES:
+        raise ConfigError(f"❌ ERROR: Invalid TEST_ENV={env}. Must be one of dev|staging|prod")
+    prefix = ENV_PREFIXES[env]
+    base_url = _require(prefix, "BASE_URL")
+    dial_code = pick(prefix, "DIAL_CODE", "+91")
+
+    built = Settings(
+        test_env=env,
+        env_prefix=prefix,
+        base_url=base_url,
+        login_url=pick(prefix, "LOGIN_URL") or f"{base_url.rstrip('/')}/account/login?return_url=%2Faccount",
+        browser=pick(prefix, "BROWSER", "chromium"),
+        headless=(pick(prefix, "HEADLESS", "true").lower() == "true"),
+        phone_number=_require(prefix, "PHONE"),
+        email=_require(prefix, "EMAIL"),
+        password=_require(prefix, "PASSWORD"),
+        dial_code=dial_code,
+        network_allow=pick_list(prefix, "NETWORK_ALLOW"),
+        network_deny=pick_list(prefix, "NETWORK_DENY"),
+        extra_accounts=_load_accounts(prefix, dial_code),
+    )
+    print(f"[settings] ✅ Using env={built.test_env} url={built.login_url} email={bool(built.email)} phone={bool(built.phone)}")
+    return built
+
+
+_active_env: str | None = None
+
+
+def use_env(env: str | None) -> None:
+    """Point ``settings`` at ``env`` (None = back to ``TEST_ENV``); used by the --envs matrix."""
+    global _active_env
+    _active_env = env.lower() if env else None
+
+
+def active_env() -> str:
+    return _active_env or default_env()
+
+
+class _SettingsProxy:
+    """``settings.<field>`` resolves against the active env on every access.
+
+    Keeps ``from utils.config import settings`` side-effect free at import time
+    and lets one process switch environments between tests.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(active_env()), name)
 
-# ---------- Build Settings ----------
-raw_env = os.getenv("TEST_ENV")
-if not raw_env:
-    sys.exit("❌ ERROR: TEST_ENV not found in .env. Please set TEST_ENV=dev|staging|prod")
-
-env = raw_env.lower()
-if env not in {"dev", "staging", "prod"}:
-    sys.exit(f"❌ ERROR: Invalid TEST_ENV={env}. Must be one of dev|staging|prod")
-
-prefix = {"dev": "DEV", "staging": "STAGING", "prod": "PROD"}[env]
-
-settings = Settings(
-    test_env=env,
-    env_prefix=prefix,
-    base_url=pick(prefix, "BASE_URL") or sys.exit(f"❌ {prefix}_BASE_URL missing"),
-    login_url=pick(prefix, "LOGIN_URL") or f"{pick(prefix, 'BASE_URL').rstrip('/')}/account/login?return_url=%2Faccount",
-    browser=pick(prefix, "BROWSER", "chromium"),
-    headless=(pick(prefix, "HEADLESS", "true").lower() == "true"),
-    phone_number=pick(prefix, "PHONE") or sys.exit(f"❌ {prefix}_PHONE missing"),
-    email=pick(prefix, "EMAIL") or sys.exit(f"❌ {prefix}_EMAIL missing"),
-    password=pick(prefix, "PASSWORD") or sys.exit(f"❌ {prefix}_PASSWORD missing"),
-)
-
-print(f"[settings] ✅ Using env={settings.test_env} url={settings.login_url} email={bool(settings.email)} phone={bool(settings.phone)}")
+    def __repr__(self) -> str:
+        return f"<settings env={_active_env or os.getenv('TEST_ENV')}>"
+
+
+settings = _SettingsProxy()
 
 
 # # utils/config.py
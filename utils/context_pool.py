@@ -0,0 +1,216 @@
+# utils/context_pool.py
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Callable
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Browser, BrowserContext, Page
+
+# Fallback without CDP: everything the current origin can reach from the page.
+_CLEAR_STORAGE_JS = """
+async () => {
+  try { localStorage.clear(); } catch (e) {}
+  try { sessionStorage.clear(); } catch (e) {}
+  try {
+    for (const db of await indexedDB.databases()) indexedDB.deleteDatabase(db.name);
+  } catch (e) {}
+  try {
+    for (const reg of await navigator.serviceWorker.getRegistrations()) await reg.unregister();
+  } catch (e) {}
+  try {
+    for (const key of await caches.keys()) await caches.delete(key);
+  } catch (e) {}
+}
+"""
+
+
+def _origin(url: str) -> str | None:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+@dataclass
+class PooledContext:
+    context: BrowserContext
+    page: Page
+    uses: int = 0
+    cdp: object | None = None  # CDP session on ``page`` (Chromium), opened once per slot
+    origins: set[str] = field(default_factory=set)  # origins any page/frame loaded since the last reset
+
+
+@dataclass
+class PoolStats:
+    acquires: int = 0
+    hits: int = 0
+    created: int = 0
+    retired: int = 0
+    create_seconds: float = 0.0
+    reset_seconds: float = 0.0
+    resets: int = 0
+    retire_reasons: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.acquires if self.acquires else 0.0
+
+    @property
+    def saved_seconds(self) -> float:
+        """Time saved by resetting instead of creating a fresh context for every hit."""
+        if not self.created or not self.resets:
+            return 0.0
+        avg_create = self.create_seconds / self.created
+        avg_reset = self.reset_seconds / self.resets
+        return max(0.0, (avg_create - avg_reset) * self.hits)
+
+    def summary(self) -> str:
+        return (
+            f"acquires={self.acquires} hit_rate={self.hit_rate:.0%} created={self.created} "
+            f"retired={self.retired} {self.retire_reasons or ''} saved~{self.saved_seconds:.1f}s"
+        ).rstrip()
+
+
+class ContextPool:
+    """Per-worker pool of warm browser contexts, reset between tests instead of recreated.
+
+    Reset clears cookies, permissions, routes and extra pages. On Chromium it also
+    clears all site data (local/session storage, IndexedDB, Cache Storage, service
+    workers) of every origin any page or frame of the context loaded since the last
+    reset, through CDP. Other browsers have no CDP, so their reset is partial: only
+    the origin the page was last on is cleared, from inside the page. Init scripts
+    installed at creation (e.g. the overlay guard) stay in place, which is what we want.
+
+    A context is retired after ``max_uses`` tests, or (Chromium only) once its
+    JS heap exceeds ``max_heap_mb``.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        context_args: dict | None = None,
+        *,
+        size: int = 2,
+        max_uses: int = 50,
+        max_heap_mb: float | None = None,
+        prepare: Callable[[BrowserContext], object] | None = None,
+    ):
+        self.browser = browser
+        self.context_args = dict(context_args or {})
+        self.size = size
+        self.max_uses = max_uses
+        self.max_heap_mb = max_heap_mb
+        self.prepare = prepare
+        self.stats = PoolStats()
+        self._idle: deque[PooledContext] = deque()
+        for _ in range(size):
+            self._idle.append(self._create())
+
+    def _create(self) -> PooledContext:
+        started = time.perf_counter()
+        context = self.browser.new_context(**self.context_args)
+        if self.prepare:
+            self.prepare(context)
+        origins: set[str] = set()
+
+        def seen(frame) -> None:
+            origin = _origin(frame.url)
+            if origin:
+                origins.add(origin)
+
+        # Every page of the context (popups and the replacement page included), every frame.
+        context.on("page", lambda page: page.on("framenavigated", seen))
+        slot = PooledContext(context, context.new_page(), origins=origins)
+        self.stats.create_seconds += time.perf_counter() - started
+        self.stats.created += 1
+        return slot
+
+    def _cdp(self, slot: PooledContext):
+        """The slot's CDP session (None off Chromium); domains are enabled once, when it opens."""
+        if slot.cdp is None and self.browser.browser_type.name == "chromium":
+            slot.cdp = slot.context.new_cdp_session(slot.page)
+            slot.cdp.send("DOMStorage.enable")
+            if self.max_heap_mb:
+                slot.cdp.send("Performance.enable")
+        return slot.cdp
+
+    def acquire(self) -> PooledContext:
+        self.stats.acquires += 1
+        if self._idle:
+            self.stats.hits += 1
+            slot = self._idle.popleft()
+        else:
+            slot = self._create()
+        slot.uses += 1
+        return slot
+
+    def release(self, slot: PooledContext) -> None:
+        reason = self._retire_reason(slot)
+        if reason is None:
+            try:
+                self._reset(slot)
+            except Exception:
+                reason = "reset-failed"
+        if reason is not None:
+            self.stats.retired += 1
+            self.stats.retire_reasons[reason] = self.stats.retire_reasons.get(reason, 0) + 1
+            with suppress(Exception):
+                slot.context.close()
+            slot = self._create()
+        if len(self._idle) < self.size:
+            self._idle.append(slot)
+        else:
+            slot.context.close()
+
+    def _retire_reason(self, slot: PooledContext) -> str | None:
+        if slot.uses >= self.max_uses:
+            return "max-uses"
+        if self.max_heap_mb and self._heap_mb(slot) > self.max_heap_mb:
+            return "memory"
+        return None
+
+    def _heap_mb(self, slot: PooledContext) -> float:
+        with suppress(Exception):
+            metrics = self._cdp(slot).send("Performance.getMetrics")["metrics"]
+            used = next(m["value"] for m in metrics if m["name"] == "JSHeapUsedSize")
+            return used / (1024 * 1024)
+        return 0.0
+
+    def _clear_site_data(self, slot: PooledContext) -> None:
+        cdp = self._cdp(slot)
+        if cdp is None:
+            with suppress(Exception):
+                slot.page.evaluate(_CLEAR_STORAGE_JS)
+            return
+        for origin in sorted(slot.origins):
+            cdp.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            # sessionStorage belongs to the tab, not the origin's site data.
+            with suppress(Exception):
+                cdp.send("DOMStorage.clear", {"storageId": {"securityOrigin": origin, "isLocalStorage": False}})
+
+    def _reset(self, slot: PooledContext) -> None:
+        started = time.perf_counter()
+        context = slot.context
+        for extra in list(context.pages):
+            if extra is not slot.page:
+                extra.close()
+        if slot.page.is_closed():
+            slot.page = context.new_page()
+            slot.cdp = None
+        self._clear_site_data(slot)
+        slot.origins.clear()
+        context.clear_cookies()
+        context.clear_permissions()
+        context.unroute_all(behavior="ignoreErrors")
+        slot.page.goto("about:blank")
+        self.stats.reset_seconds += time.perf_counter() - started
+        self.stats.resets += 1
+
+    def close(self) -> None:
+        while self._idle:
+            with suppress(Exception):
+                self._idle.popleft().context.close()
@@ -0,0 +1,190 @@
+# utils/emulation.py
+"""Named device/network emulation profiles (``--emulation=4g-id``).
+
+A profile bundles the device (viewport, DPR, touch, user agent - fixed when
+the context is created) with CDP network throttling and CPU slowdown,
+applied to every page of the context as it opens. Throttling needs
+Chromium; other engines get the device part only.
+"""
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass
+
+from playwright.async_api import BrowserContext as AsyncBrowserContext, Page as AsyncPage
+from playwright.sync_api import BrowserContext, Page
+
+_ANDROID_MID = (
+    "Mozilla/5.0 (Linux; Android 13; SM-A546E) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36"
+)
+_ANDROID_LOW = (
+    "Mozilla/5.0 (Linux; Android 11; Redmi 9A) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36"
+)
+
+
+@dataclass(frozen=True)
+class EmulationProfile:
+    name: str
+    latency_ms: float = 0           # added to every request
+    download_kbps: float = 0        # 0 = unthrottled
+    upload_kbps: float = 0
+    cpu_rate: float = 1             # 4 = four times slower than this machine
+    viewport: tuple[int, int] | None = None
+    device_scale_factor: float | None = None
+    is_mobile: bool = False
+    user_agent: str | None = None
+
+    @property
+    def throttled(self) -> bool:
+        return bool(self.latency_ms or self.download_kbps or self.upload_kbps or self.cpu_rate > 1)
+
+    def context_kwargs(self, browser_name: str = "chromium") -> dict:
+        """Device options for ``browser.new_context`` (must be fixed at creation)."""
+        kwargs: dict = {}
+        if self.viewport:
+            kwargs["viewport"] = {"width": self.viewport[0], "height": self.viewport[1]}
+        if self.device_scale_factor:
+            kwargs["device_scale_factor"] = self.device_scale_factor
+        if self.user_agent:
+            kwargs["user_agent"] = self.user_agent
+        if self.is_mobile:
+            kwargs["has_touch"] = True
+            if browser_name != "firefox":  # Firefox has no mobile emulation
+                kwargs["is_mobile"] = True
+        return kwargs
+
+    def _network(self) -> dict:
+        return {
+            "offline": False,
+            "latency": self.latency_ms,
+            # CDP wants bytes/second; -1 disables the limit.
+            "downloadThroughput": self.download_kbps * 1000 / 8 if self.download_kbps else -1,
+            "uploadThroughput": self.upload_kbps * 1000 / 8 if self.upload_kbps else -1,
+        }
+
+
+PROFILES = {
+    "none": EmulationProfile("none"),
+    # Mid-range Android on an Indonesian 4G connection.
+    "4g-id": EmulationProfile(
+        "4g-id", latency_ms=90, download_kbps=9000, upload_kbps=3000, cpu_rate=4,
+        viewport=(412, 915), device_scale_factor=2.625, is_mobile=True, user_agent=_ANDROID_MID,
+    ),
+    # DevTools' "Slow 3G" network on the same phone.
+    "slow-3g": EmulationProfile(
+        "slow-3g", latency_ms=2000, download_kbps=400, upload_kbps=400, cpu_rate=4,
+        viewport=(412, 915), device_scale_factor=2.625, is_mobile=True, user_agent=_ANDROID_MID,
+    ),
+    # Entry-level Android (slow CPU, small screen) on a weak 4G signal.
+    "low-end-android": EmulationProfile(
+        "low-end-android", latency_ms=150, download_kbps=1600, upload_kbps=750, cpu_rate=6,
+        viewport=(360, 640), device_scale_factor=2, is_mobile=True, user_agent=_ANDROID_LOW,
+    ),
+}
+
+
+def resolve(name: str) -> EmulationProfile:
+    if name not in PROFILES:
+        raise ValueError(f"Unknown emulation profile {name!r}. Use one of: {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+_active: str | None = None
+
+
+def use(name: str | None) -> None:
+    """Mark ``name`` as the profile the running test is under; None (or "none") when unthrottled."""
+    global _active
+    _active = None if name == "none" else name
+
+
+def active() -> str | None:
+    """The profile set by :func:`use`; timeouts and vitals key their history by it."""
+    return _active
+
+
+def _warn_unthrottled(profile: EmulationProfile, browser_name: str) -> None:
+    warnings.warn(f"emulation {profile.name!r}: {browser_name} has no CDP, applying the device only")
+
+
+def throttle(page: Page, profile: EmulationProfile) -> None:
+    cdp = page.context.new_cdp_session(page)
+    cdp.send("Network.enable")
+    cdp.send("Network.emulateNetworkConditions", profile._network())
+    if profile.cpu_rate > 1:
+        cdp.send("Emulation.setCPUThrottlingRate", {"rate": profile.cpu_rate})
+
+
+def apply(context: BrowserContext, profile: EmulationProfile, browser_name: str = "chromium") -> BrowserContext:
+    """Throttle every current and future page of ``context`` per ``profile``."""
+    if not profile.throttled:
+        return context
+    if browser_name != "chromium":
+        _warn_unthrottled(profile, browser_name)
+        return context
+    for page in context.pages:
+        throttle(page, profile)
+    context.on("page", lambda page: throttle(page, profile))
+    return context
+
+
+async def throttle_async(page: AsyncPage, profile: EmulationProfile) -> None:
+    cdp = await page.context.new_cdp_session(page)
+    await cdp.send("Network.enable")
+    await cdp.send("Network.emulateNetworkConditions", profile._network())
+    if profile.cpu_rate > 1:
+        await cdp.send("Emulation.setCPUThrottlingRate", {"rate": profile.cpu_rate})
+
+
+async def apply_async(context: AsyncBrowserContext, profile: EmulationProfile,
+                      browser_name: str = "chromium") -> AsyncBrowserContext:
+    """``playwright.async_api`` twin of :func:`apply`; new pages should be opened after it returns."""
+    if not profile.throttled:
+        return context
+    if browser_name != "chromium":
+        _warn_unthrottled(profile, browser_name)
+        return context
+    for page in context.pages:
+        await throttle_async(page, profile)
+
+    async def _on_page(page: AsyncPage) -> None:
+        await throttle_async(page, profile)
+
+    context.on("page", _on_page)
+    return context
+
+
+def summarize(rows: list[dict]) -> list[str]:
+    """Per-test call duration for each profile, slowest relative to ``none`` first.
+
+    ``rows``: ``{"test", "profile", "seconds", "outcome", "timed_out": [actions]}``.
+    """
+    by_test: dict[str, dict[str, dict]] = {}
+    for r in rows:
+        by_test.setdefault(r["test"], {})[r["profile"]] = r
+    profiles = [p for p in PROFILES if any(p in v for v in by_test.values())]
+
+    def _slowdown(test: str) -> float:
+        runs = by_test[test]
+        base = runs.get("none", {}).get("seconds")
+        return max((r["seconds"] / base for r in runs.values()), default=1) if base else 0
+
+    lines = [f"{'test':<48}" + "".join(f"{p:>17}" for p in profiles)]
+    for test in sorted(by_test, key=_slowdown, reverse=True):
+        cells = []
+        for p in profiles:
+            r = by_test[test].get(p)
+            cells.append("-" if r is None else f"{r['seconds']:.1f}s{'' if r['outcome'] == 'passed' else ' ' + r['outcome'].upper()}")
+        lines.append(f"{test[-48:]:<48}" + "".join(f"{c:>17}" for c in cells))
+    # Waits that time out only under emulation are the hard-coded ones too tight for real devices.
+    broke: dict[str, set] = {}
+    fine = {a for r in rows if r["profile"] == "none" for a in r.get("timed_out", ())}
+    for r in rows:
+        for action in r.get("timed_out", ()):
+            if r["profile"] != "none" and action not in fine:
+                broke.setdefault(action, set()).add(r["profile"])
+    for action, where in sorted(broke.items()):
+        lines.append(f"timed out only under emulation: {action} ({', '.join(sorted(where))})")
+    return lines
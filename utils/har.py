@@ -0,0 +1,46 @@
+# utils/har.py
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+from playwright.sync_api import BrowserContext, Request, Route
+
+MODES = ("live", "record", "replay")
+
+
+class HarArchive:
+    """One HAR archive per test (and per context within a test), grouped by env.
+
+    Layout: ``<root>/<env>/<test-id>[-<n>].har.zip``. The ``.zip`` suffix makes
+    Playwright store response bodies as attachments, which keeps archives small.
+    """
+
+    def __init__(self, root: str | Path, env: str):
+        self.root = Path(root)
+        self.env = env
+
+    def path_for(self, nodeid: str, index: int = 0) -> Path:
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", nodeid).strip("_")
+        suffix = f"-{index}" if index else ""
+        return self.root / self.env / f"{slug}{suffix}.har.zip"
+
+    def record_kwargs(self, nodeid: str, index: int = 0) -> dict:
+        path = self.path_for(nodeid, index)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return {"record_har_path": str(path), "record_har_mode": "minimal"}
+
+    @staticmethod
+    def attach_replay(context: BrowserContext, path: Path, unmatched: list[str]) -> None:
+        """Serve ``context`` entirely from ``path``; anything not in the archive is aborted.
+
+        Routes registered later take precedence, so the catch-all goes first and
+        only sees requests the HAR router fell back on.
+        """
+
+        def _unmatched(route: Route, request: Request) -> None:
+            unmatched.append(f"{request.method} {request.url}")
+            route.abort("internetdisconnected")
+
+        context.route("**/*", _unmatched)
+        context.route_from_har(str(path), not_found="fallback")
@@ -0,0 +1,350 @@
+# utils/impact.py
+"""Test-impact index: which tests exercise which page-object/utils code.
+
+Recording (``pytest --impact-record``) traces Python calls into ``pages/``
+and ``utils/`` (function granularity, no line tracing) and the selector
+strings handed to Playwright, per test. Fixture work is attributed to the
+fixture and shared by every test that uses it, so session fixtures that run
+once still count for all their users.
+
+Selection (``pytest --affected-since=<ref>``) maps ``git diff <ref>`` hunks in
+``pages/`` and ``utils/`` to the functions they touch; module- or class-level
+changes expand to the functions that reference the changed names. Tests
+whose recorded functions or selectors intersect are kept. Anything that
+can't be mapped (non-Python files, conftest/test helpers referencing the
+changed names, unparseable diffs) means the full suite runs.
+"""
+from __future__ import annotations
+
+import ast
+import functools
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+WATCHED_DIRS = ("pages", "utils")
+
+# Playwright calls whose first positional argument is a selector.
+_SELECTOR_METHODS = {
+    "Page": ["locator", "click", "dblclick", "fill", "press", "type", "check", "uncheck", "hover", "focus",
+             "select_option", "wait_for_selector", "is_visible", "is_hidden", "inner_text", "text_content",
+             "query_selector", "query_selector_all", "get_attribute", "frame_locator", "tap"],
+    "Frame": ["locator", "click", "fill", "press", "wait_for_selector", "is_visible", "query_selector"],
+    "Locator": ["locator", "frame_locator"],
+}
+
+
+# ---------- recording ----------
+class Recorder:
+    def __init__(self, root: str | Path = "."):
+        self.root = Path(root).resolve()
+        self._prefixes = tuple(str(self.root / d) + os.sep for d in WATCHED_DIRS)
+        self._own = str(Path(__file__).resolve())
+        self._keys: dict[str, str | None] = {}
+        self._stack: list[tuple[set, set]] = []
+        self.fixtures: dict[str, tuple[set, set]] = {}
+        self._patched: list[tuple[type, str, object]] = []
+
+    def _key(self, code) -> str | None:
+        fn = code.co_filename
+        if fn not in self._keys:
+            self._keys[fn] = (
+                Path(fn).resolve().relative_to(self.root).as_posix()
+                if fn.startswith(self._prefixes) and fn != self._own
+                else None
+            )
+        path = self._keys[fn]
+        return path and f"{path}::{getattr(code, 'co_qualname', code.co_name)}"
+
+    def _trace(self, frame, event, arg):
+        if event == "call" and self._stack:
+            key = self._key(frame.f_code)
+            if key:
+                self._stack[-1][0].add(key)
+        return None
+
+    def selector(self, value: str) -> None:
+        if self._stack and isinstance(value, str):
+            self._stack[-1][1].add(value)
+
+    def push(self) -> None:
+        self._stack.append((set(), set()))
+
+    def pop(self) -> tuple[set, set]:
+        funcs, sels = self._stack.pop()
+        if self._stack:  # nested fixture work also belongs to whatever requested it
+            self._stack[-1][0].update(funcs)
+            self._stack[-1][1].update(sels)
+        return funcs, sels
+
+    def pop_fixture(self, name: str) -> None:
+        funcs, sels = self.pop()
+        known = self.fixtures.setdefault(name, (set(), set()))
+        known[0].update(funcs)
+        known[1].update(sels)
+
+    def pop_test(self, fixturenames) -> dict:
+        funcs, sels = self.pop()
+        for name in fixturenames:
+            f, s = self.fixtures.get(name, ((), ()))
+            funcs.update(f)
+            sels.update(s)
+        return {"functions": sorted(funcs), "selectors": sorted(sels)}
+
+    def start(self) -> None:
+        from playwright import sync_api
+
+        for cls_name, methods in _SELECTOR_METHODS.items():
+            cls = getattr(sync_api, cls_name)
+            for name in methods:
+                original = getattr(cls, name, None)
+                if original is None:
+                    continue
+                setattr(cls, name, self._recording(original))
+                self._patched.append((cls, name, original))
+        sys.settrace(self._trace)
+
+    def stop(self) -> None:
+        sys.settrace(None)
+        for cls, name, original in reversed(self._patched):
+            setattr(cls, name, original)
+        self._patched.clear()
+
+    def _recording(self, fn):
+        @functools.wraps(fn)
+        def wrapper(obj, selector=None, *args, **kwargs):
+            self.selector(selector)
+            return fn(obj, selector, *args, **kwargs) if selector is not None else fn(obj, *args, **kwargs)
+
+        return wrapper
+
+
+class ImpactIndex:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.data: dict = {"tests": {}}
+        if self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                pass
+
+    @property
+    def tests(self) -> dict[str, dict]:
+        return self.data.setdefault("tests", {})
+
+    def record(self, nodeid: str, entry: dict) -> None:
+        self.tests[nodeid] = entry
+
+    def save(self, ref: str | None = None) -> None:
+        if ref:
+            self.data["recorded_at"] = ref
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.data, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# ---------- diff -> changed functions ----------
+@dataclass
+class Changes:
+    functions: set = field(default_factory=set)     # "pages/login_page.py::Loginpage.goto"
+    literals: set = field(default_factory=set)      # string literals on changed lines
+    unknown: list = field(default_factory=list)     # reasons the full suite must run
+
+    @property
+    def empty(self) -> bool:
+        return not (self.functions or self.literals or self.unknown)
+
+
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_LITERAL = re.compile(r"""(?P<q>["'])(?P<s>(?:\\.|(?!(?P=q)).){3,}?)(?P=q)""")
+
+
+def _git(*args: str, cwd: str | Path = ".") -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+@dataclass
+class _Scope:
+    start: int
+    end: int
+    qualname: str
+    kind: str  # "function" | "class" | "module-stmt"
+    names: set = field(default_factory=set)
+
+
+def _scopes(source: str) -> list[_Scope]:
+    """Functions (innermost wins), class bodies and top-level statements with the names they bind."""
+    tree = ast.parse(source)
+    scopes: list[_Scope] = []
+
+    def start_of(node) -> int:
+        return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+
+    def walk(node, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                qual = f"{prefix}{child.name}"
+                scopes.append(_Scope(start_of(child), child.end_lineno, qual, "function"))
+                walk(child, f"{qual}.<locals>.")
+            elif isinstance(child, ast.ClassDef):
+                qual = f"{prefix}{child.name}"
+                scopes.append(_Scope(start_of(child), child.end_lineno, qual, "class", {child.name}))
+                walk(child, f"{qual}.")
+
+    walk(tree, "")
+    for stmt in tree.body:
+        if not isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names = {n.id for n in ast.walk(stmt) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+            names |= {a.asname or a.name.split(".")[0] for a in getattr(stmt, "names", []) if hasattr(a, "name")}
+            scopes.append(_Scope(stmt.lineno, stmt.end_lineno, "<module>", "module-stmt", names))
+    return scopes
+
+
+def _scope_at(scopes: list[_Scope], line: int) -> _Scope | None:
+    hits = [s for s in scopes if s.start <= line <= s.end]
+    return min(hits, key=lambda s: s.end - s.start) if hits else None
+
+
+def _referencing_functions(root: Path, names: set) -> tuple[set, list]:
+    """Functions in watched dirs that use ``names``, and other files that do.
+
+    Module-level uses inside watched dirs (``_CONFIG = {"close": CLOSE_SELECTORS}``)
+    propagate: the names they bind are followed too. Imports are just the same
+    name in another module, which the name search already covers.
+    """
+    sources = {}
+    for d in WATCHED_DIRS + ("tests",):
+        for path in sorted((root / d).rglob("*.py")):
+            sources[path.relative_to(root).as_posix()] = path.read_text(encoding="utf-8")
+    if (root / "conftest.py").exists():
+        sources["conftest.py"] = (root / "conftest.py").read_text(encoding="utf-8")
+
+    found, elsewhere, pending, seen = set(), set(), set(names), set()
+    while pending:
+        seen |= pending
+        batch, pending = pending, set()
+        for rel, source in sources.items():
+            if not any(n in source for n in batch):
+                continue
+            watched = rel.split("/")[0] in WATCHED_DIRS
+            scopes = _scopes(source)
+            for node in ast.walk(ast.parse(source)):
+                ident = node.id if isinstance(node, ast.Name) else node.attr if isinstance(node, ast.Attribute) else None
+                if ident not in batch or isinstance(getattr(node, "ctx", None), ast.Store):
+                    continue
+                scope = _scope_at(scopes, node.lineno)
+                if not watched:
+                    elsewhere.add(rel)
+                elif scope and scope.kind == "function":
+                    found.add(f"{rel}::{scope.qualname}")
+                elif scope and scope.kind == "class":
+                    found.add(f"{rel}::{scope.qualname}")
+                elif scope:
+                    pending |= scope.names - seen
+    return found, sorted(elsewhere)
+
+
+def changes_since(ref: str, root: str | Path = ".") -> Changes:
+    root = Path(root).resolve()
+    changes = Changes()
+    try:
+        diff = _git("diff", "-U0", "--no-color", ref, "--", *WATCHED_DIRS, cwd=root)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        changes.unknown.append(f"git diff {ref} failed: {e}")
+        return changes
+
+    files: dict[str, list[tuple[int, int, int, int, list[str]]]] = {}
+    current = None
+    for line in diff.splitlines():
+        if line.startswith("diff --git"):
+            current = line.split(" b/", 1)[1]
+            files[current] = []
+        elif (m := _HUNK.match(line)) and current:
+            a, b, c, d = (int(g) if g is not None else 1 for g in m.groups())
+            files[current].append((a, b, c, d, []))
+        elif current and files[current] and line[:1] in "+-" and not line.startswith(("+++", "---")):
+            files[current][-1][4].append(line[1:])
+
+    module_names: set = set()
+    for rel, hunks in files.items():
+        if not rel.endswith(".py"):
+            changes.unknown.append(f"non-Python change: {rel}")
+            continue
+        new_path = root / rel
+        try:
+            new_scopes = _scopes(new_path.read_text(encoding="utf-8")) if new_path.exists() else []
+            old_source = _git("show", f"{ref}:{rel}", cwd=root) if any(b for _, b, _, _, _ in hunks) else ""
+            old_scopes = _scopes(old_source) if old_source else []
+        except (SyntaxError, subprocess.CalledProcessError) as e:
+            changes.unknown.append(f"cannot map {rel}: {e}")
+            continue
+        for a, b, c, d, text in hunks:
+            for m in _LITERAL.finditer("\n".join(text)):
+                changes.literals.add(m.group("s"))
+            located = [(old_scopes, a + i) for i in range(b)] + [(new_scopes, c + i) for i in range(d)]
+            if not b and not d:
+                located = [(new_scopes, c)]
+            for scopes, line in located:
+                scope = _scope_at(scopes, line)
+                if scope is None:
+                    changes.unknown.append(f"{rel}:{line} outside any statement")
+                elif scope.kind in ("function", "class"):
+                    # A class-body change (attribute, decorator, bases) counts for all its methods.
+                    changes.functions.add(f"{rel}::{scope.qualname}")
+                else:
+                    module_names |= scope.names
+                    if not scope.names:
+                        changes.unknown.append(f"{rel}:{line} module-level change binds no names")
+
+    if module_names:
+        found, elsewhere = _referencing_functions(root, module_names)
+        changes.functions |= found
+        if elsewhere:
+            changes.unknown.append(f"{', '.join(sorted(module_names))} also used in {', '.join(elsewhere[:3])}")
+    return changes
+
+
+def affected_tests(index: ImpactIndex, changes: Changes) -> set[str]:
+    """Node ids whose recorded functions or selectors intersect ``changes``."""
+    affected = set()
+    for nodeid, entry in index.tests.items():
+        funcs = entry.get("functions", [])
+        if any(f == c or f.startswith(c + ".") for f in funcs for c in changes.functions):
+            affected.add(nodeid)
+        elif changes.literals and any(lit in sel for sel in entry.get("selectors", []) for lit in changes.literals):
+            affected.add(nodeid)
+    return affected
+
+
+def changed_test_files(ref: str, root: str | Path = ".") -> list[str]:
+    """Test modules/conftests changed since ``ref`` (they select themselves)."""
+    out = _git("diff", "--name-only", ref, "--", "tests", "conftest.py", cwd=root)
+    return [line for line in out.splitlines() if line.endswith(".py")]
+
+
+def select(nodeids: list[str], index: ImpactIndex, ref: str, root: str | Path = ".") -> tuple[set[str] | None, str]:
+    """Node ids to run for changes since ``ref`` (None = everything), and why."""
+    if not index.tests:
+        return None, f"no impact index at {index.path}; run once with --impact-record"
+    try:
+        test_files = changed_test_files(ref, root)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        return None, f"git diff {ref} failed: {e}"
+    if any(Path(f).name == "conftest.py" for f in test_files):
+        return None, "a conftest.py changed"
+    changes = changes_since(ref, root)
+    if changes.unknown:
+        return None, changes.unknown[0]
+    selected = affected_tests(index, changes)
+    selected |= {n for n in nodeids if n not in index.tests}  # never recorded: can't rule it out
+    selected |= {n for n in nodeids if n.split("::")[0] in test_files}
+    return selected & set(nodeids), (
+        f"{len(changes.functions)} changed function(s), {len(changes.literals)} changed literal(s), "
+        f"{len(test_files)} changed test file(s)"
+    )
@@ -0,0 +1,92 @@
+# utils/journeys.py
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from playwright.async_api import Page, async_playwright
+
+from pages.async_home_page import AsyncHomePage
+from pages.async_login_page import AsyncLoginpage
+from pages.overlays import AsyncOverlayDismisser
+
+Journey = Callable[[Page], Awaitable[Any]]
+
+
+@dataclass
+class JourneyResult:
+    name: str
+    ok: bool
+    seconds: float
+    error: str | None = None
+    value: Any = None
+
+
+async def run_journeys(
+    journeys: Iterable[tuple[str, Journey]],
+    *,
+    concurrency: int = 10,
+    browser_name: str = "chromium",
+    headless: bool = True,
+    launch_args: dict | None = None,
+    context_args: dict | None = None,
+) -> list[JourneyResult]:
+    """Run every journey in its own context of ONE browser, at most ``concurrency`` at a time.
+
+    A journey is ``async def journey(page) -> Any``; an exception (including a
+    failed ``assert``) marks it as failed, anything returned is kept as ``value``.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    async with async_playwright() as p:
+        browser = await getattr(p, browser_name).launch(headless=headless, **(launch_args or {}))
+
+        async def _one(name: str, journey: Journey) -> JourneyResult:
+            async with sem:
+                context = await browser.new_context(**(context_args or {}))
+                await AsyncOverlayDismisser.install(context)
+                started = time.perf_counter()
+                try:
+                    value = await journey(await context.new_page())
+                    return JourneyResult(name, True, time.perf_counter() - started, value=value)
+                except Exception as e:
+                    return JourneyResult(name, False, time.perf_counter() - started, error=f"{type(e).__name__}: {e}")
+                finally:
+                    await context.close()
+
+        try:
+            return await asyncio.gather(*(_one(name, j) for name, j in journeys))
+        finally:
+            await browser.close()
+
+
+def run_journeys_sync(journeys: Iterable[tuple[str, Journey]], **kwargs) -> list[JourneyResult]:
+    return asyncio.run(run_journeys(journeys, **kwargs))
+
+
+# ---------- ready-made journeys ----------
+def home_journey(base_url: str, search_term: str | None = None) -> Journey:
+    async def _run(page: Page) -> None:
+        home = AsyncHomePage(page, base_url)
+        await home.goto()
+        assert await home.is_loaded()
+        if search_term:
+            await home.search(search_term)
+
+    return _run
+
+
+def login_journey(login_url: str, *, password: str, phone: str | None = None,
+                  email: str | None = None, dial_code: str = "+91") -> Journey:
+    async def _run(page: Page) -> None:
+        login = AsyncLoginpage(page, login_url)
+        await login.goto()
+        assert await login.is_loaded()
+        if email:
+            ok = await login.login_with_email(email=email, password=password)
+        else:
+            ok = await login.login_with_phone(phone=phone or "", password=password, dial_code=dial_code)
+        assert ok, f"Expected to be on account page, got {page.url}"
+
+    return _run
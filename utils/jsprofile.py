@@ -0,0 +1,215 @@
+# utils/jsprofile.py
+"""CDP CPU profile + JS/CSS coverage for a page-object flow (Chromium only).
+
+    with js_profile(page, "login-phone", out_dir, first_party=first_party_hosts(base_url)) as prof:
+        Loginpage(page, url).login_with_phone(...)
+    prof.report  # per-origin self time and unused bytes
+
+Writes ``<name>.cpuprofile`` (open it in DevTools' Performance panel) and a
+compact ``<name>.json``: for every script origin the sampled self time, JS
+bytes and unused JS bytes, CSS bytes and unused CSS bytes, plus the
+scripts that burned the most CPU. Origins outside ``first_party`` host
+patterns are flagged third-party, which is what a bug against a tag
+vendor needs.
+"""
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator
+from urllib.parse import urlsplit
+
+from playwright.sync_api import Page
+
+from utils.network import _host_matches
+
+SAMPLING_INTERVAL_US = 200
+
+
+def origin_of(url: str) -> str:
+    if not url:
+        return "(inline)"
+    parts = urlsplit(url)
+    if parts.scheme in ("http", "https"):
+        return f"{parts.scheme}://{parts.netloc}"
+    return f"({parts.scheme or 'inline'})"
+
+
+def _is_third_party(origin: str, first_party: Iterable[str]) -> bool | None:
+    host = urlsplit(origin).hostname
+    if not host or not first_party:
+        return None
+    return not _host_matches(host, first_party)
+
+
+# ---------- aggregation (pure, testable without a browser) ----------
+def self_time_by_script(profile: dict) -> dict[str, float]:
+    """Sampled self time (ms) per script URL; idle/program/GC keep their ``(name)``."""
+    frames = {n["id"]: n["callFrame"] for n in profile.get("nodes", [])}
+    out: dict[str, float] = defaultdict(float)
+    for node_id, delta in zip(profile.get("samples", []), profile.get("timeDeltas", [])):
+        frame = frames.get(node_id, {})
+        url = frame.get("url") or ""
+        key = url or (frame.get("functionName") if frame.get("functionName", "").startswith("(") else "(native)")
+        out[key] += delta / 1000
+    return dict(out)
+
+
+def unused_js_bytes(functions: list[dict]) -> tuple[int, int]:
+    """``(total, unused)`` bytes of one script from V8 block coverage.
+
+    Ranges nest; the innermost range covering an offset holds its count.
+    """
+    ranges = sorted(
+        (r for f in functions for r in f["ranges"]),
+        key=lambda r: (r["startOffset"], -r["endOffset"]),
+    )
+    if not ranges:
+        return 0, 0
+    total = max(r["endOffset"] for r in ranges)
+    unused = 0
+    pos = 0
+    stack: list[tuple[int, int]] = []  # (end, count)
+
+    def advance(to: int) -> None:
+        nonlocal pos, unused
+        while pos < to:
+            while stack and stack[-1][0] <= pos:
+                stack.pop()
+            if not stack:
+                pos = to
+                return
+            end, count = stack[-1]
+            seg_end = min(end, to)
+            if count == 0:
+                unused += seg_end - pos
+            pos = seg_end
+
+    for r in ranges:
+        advance(r["startOffset"])
+        stack.append((r["endOffset"], r["count"]))
+    advance(total)
+    return total, unused
+
+
+def unused_css_bytes(length: int, rules: list[dict]) -> tuple[int, int]:
+    """``(total, unused)`` bytes of one stylesheet from CSS rule usage."""
+    used = sorted((r["startOffset"], r["endOffset"]) for r in rules if r["used"])
+    covered, reach = 0, 0
+    for start, end in used:
+        start = max(start, reach)
+        if end > start:
+            covered += end - start
+            reach = end
+    return length, max(length - covered, 0)
+
+
+def build_report(profile: dict, js_coverage: list[dict], sheets: dict[str, dict], css_rules: list[dict],
+                 first_party: Iterable[str] = (), top: int = 5) -> dict:
+    first_party = list(first_party)
+    origins: dict[str, dict] = defaultdict(
+        lambda: {"self_ms": 0.0, "js_bytes": 0, "js_unused": 0, "css_bytes": 0, "css_unused": 0}
+    )
+    by_script = self_time_by_script(profile)
+    for url, ms in by_script.items():
+        origins[origin_of(url) if "://" in url else url]["self_ms"] += ms
+    for script in js_coverage:
+        total, unused = unused_js_bytes(script["functions"])
+        o = origins[origin_of(script.get("url", ""))]
+        o["js_bytes"] += total
+        o["js_unused"] += unused
+    rules_by_sheet: dict[str, list] = defaultdict(list)
+    for rule in css_rules:
+        rules_by_sheet[rule["styleSheetId"]].append(rule)
+    for sheet_id, header in sheets.items():
+        total, unused = unused_css_bytes(int(header.get("length", 0)), rules_by_sheet.get(sheet_id, []))
+        o = origins[origin_of(header.get("sourceURL", ""))]
+        o["css_bytes"] += total
+        o["css_unused"] += unused
+    for origin, o in origins.items():
+        o["self_ms"] = round(o["self_ms"], 1)
+        o["third_party"] = _is_third_party(origin, first_party)
+    scripts = sorted(((u, ms) for u, ms in by_script.items() if "://" in u), key=lambda x: -x[1])[:top]
+    return {
+        "origins": dict(sorted(origins.items(), key=lambda kv: -kv[1]["self_ms"])),
+        "top_scripts": [{"url": u, "self_ms": round(ms, 1)} for u, ms in scripts],
+    }
+
+
+# ---------- capture ----------
+class JsProfiler:
+    """Start/stop CPU profiling and coverage on one page through its own CDP session."""
+
+    def __init__(self, page: Page, first_party: Iterable[str] = ()):
+        self.page = page
+        self.first_party = list(first_party)
+        self.sheets: dict[str, dict] = {}
+        self.profile: dict | None = None
+        self.report: dict | None = None
+        self._cdp = None
+
+    def start(self) -> "JsProfiler":
+        cdp = self._cdp = self.page.context.new_cdp_session(self.page)
+        cdp.on("CSS.styleSheetAdded", lambda e: self.sheets.__setitem__(e["header"]["styleSheetId"], e["header"]))
+        cdp.send("Profiler.enable")
+        cdp.send("Profiler.setSamplingInterval", {"interval": SAMPLING_INTERVAL_US})
+        cdp.send("Profiler.startPreciseCoverage", {"callCount": False, "detailed": True})
+        cdp.send("DOM.enable")
+        cdp.send("CSS.enable")  # replays styleSheetAdded for sheets already loaded
+        cdp.send("CSS.startRuleUsageTracking")
+        cdp.send("Profiler.start")
+        return self
+
+    def stop(self) -> dict:
+        cdp = self._cdp
+        self.profile = cdp.send("Profiler.stop")["profile"]
+        js = cdp.send("Profiler.takePreciseCoverage")["result"]
+        cdp.send("Profiler.stopPreciseCoverage")
+        css = cdp.send("CSS.stopRuleUsageTracking")["ruleUsage"]
+        cdp.detach()
+        self.report = build_report(self.profile, js, self.sheets, css, self.first_party)
+        return self.report
+
+    def write(self, out_dir: str | Path, name: str) -> Path:
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        (out / f"{name}.cpuprofile").write_text(json.dumps(self.profile), encoding="utf-8")
+        path = out / f"{name}.json"
+        path.write_text(json.dumps(self.report, indent=1), encoding="utf-8")
+        return path
+
+
+@contextmanager
+def js_profile(page: Page, name: str, out_dir: str | Path | None = None,
+               first_party: Iterable[str] = ()) -> Iterator[JsProfiler]:
+    """Profile everything the block does on ``page``; the report is written even if the block fails."""
+    profiler = JsProfiler(page, first_party).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        if out_dir is not None:
+            profiler.write(out_dir, name)
+
+
+def summarize(reports: list[dict], top: int = 10) -> list[str]:
+    """Totals per origin across reports, most self time first."""
+    totals: dict[str, dict] = defaultdict(lambda: {"self_ms": 0.0, "js_bytes": 0, "js_unused": 0, "css_unused": 0})
+    third: dict[str, bool | None] = {}
+    for report in reports:
+        for origin, o in report["origins"].items():
+            t = totals[origin]
+            for k in t:
+                t[k] += o.get(k, 0)
+            third[origin] = o.get("third_party")
+    lines = [f"{'origin':<44}{'self ms':>10}{'JS KiB':>9}{'unused':>8}{'CSS unused KiB':>16}"]
+    for origin, t in sorted(totals.items(), key=lambda kv: -kv[1]["self_ms"])[:top]:
+        unused = f"{100 * t['js_unused'] / t['js_bytes']:.0f}%" if t["js_bytes"] else "-"
+        tag = " [3p]" if third.get(origin) else ""
+        lines.append(
+            f"{(origin + tag)[-44:]:<44}{t['self_ms']:>10.0f}{t['js_bytes'] / 1024:>9.0f}{unused:>8}"
+            f"{t['css_unused'] / 1024:>16.0f}"
+        )
+    return lines
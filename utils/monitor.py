@@ -0,0 +1,268 @@
+# utils/monitor.py
+"""Synthetic monitor / light load generator for the login-to-account journey.
+
+Every iteration opens a fresh headless context, loads the home page, goes to
+login through the header, submits the phone (or email) form and opens the
+account page, timing each step. Sessions start on a linear ramp and keep
+iterating until the iteration budget or the duration runs out.
+
+    python matahari.py --standin --sessions 5 --iterations 50 --ramp-up 10
+    python matahari.py --env staging --sessions 3 --duration 300 --json out.json --csv out.csv
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from playwright.async_api import Browser, async_playwright
+
+from pages.async_home_page import AsyncHomePage
+from pages.async_login_page import AsyncLoginpage
+from pages.overlays import AsyncOverlayDismisser
+from utils.emulation import apply_async, resolve
+from utils.stats import summarize
+
+STEPS = ("home", "login_page", "login_post", "account")
+
+
+@dataclass
+class MonitorConfig:
+    base_url: str
+    password: str
+    phone: str | None = None
+    email: str | None = None
+    dial_code: str = "+91"
+    sessions: int = 1
+    iterations: int | None = 1      # total across sessions; None = until duration
+    duration_s: float | None = None
+    ramp_up_s: float = 0.0
+    think_ms: int = 0
+    browser_name: str = "chromium"
+    emulation: str = "none"         # utils.emulation profile
+
+
+@dataclass
+class Iteration:
+    session: int
+    started: float                  # seconds since the run started
+    ok: bool
+    steps: dict = field(default_factory=dict)   # step -> ms, completed steps only
+    error: str | None = None
+    failed_step: str | None = None
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.steps.values())
+
+
+def ramp_offsets(sessions: int, ramp_up_s: float) -> list[float]:
+    """Start delay for each session: evenly spread over ``ramp_up_s``, first one at 0."""
+    if sessions <= 1 or ramp_up_s <= 0:
+        return [0.0] * max(sessions, 0)
+    return [ramp_up_s * i / sessions for i in range(sessions)]
+
+
+async def _journey(browser: Browser, cfg: MonitorConfig, session: int, started: float) -> Iteration:
+    it = Iteration(session, started, ok=False)
+    profile = resolve(cfg.emulation)
+    context = await browser.new_context(**profile.context_kwargs(cfg.browser_name))
+    await apply_async(context, profile, cfg.browser_name)
+    await AsyncOverlayDismisser.install(context)
+    page = await context.new_page()
+    step = STEPS[0]
+    try:
+        t0 = time.perf_counter()
+        home = AsyncHomePage(page, cfg.base_url)
+        await home.goto()
+        await home.is_loaded()
+        it.steps[step] = (time.perf_counter() - t0) * 1000
+
+        step, t0 = "login_page", time.perf_counter()
+        await home.go_to_login()
+        login = AsyncLoginpage(page, page.url)
+        await login.is_loaded()
+        it.steps[step] = (time.perf_counter() - t0) * 1000
+
+        step, t0 = "login_post", time.perf_counter()
+        if cfg.email:
+            ok = await login.login_with_email(email=cfg.email, password=cfg.password)
+        else:
+            ok = await login.login_with_phone(phone=cfg.phone or "", password=cfg.password, dial_code=cfg.dial_code)
+        assert ok, f"still on {page.url} after login"
+        it.steps[step] = (time.perf_counter() - t0) * 1000
+
+        step, t0 = "account", time.perf_counter()
+        await page.goto(f"{home.base_url}/account", wait_until="domcontentloaded")
+        await page.get_by_role("button", name=re.compile(r"ubah kontak", re.I)).wait_for(timeout=10000)
+        it.steps[step] = (time.perf_counter() - t0) * 1000
+        it.ok = True
+    except Exception as e:
+        it.failed_step = step
+        it.error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}".rstrip(": ")
+    finally:
+        await context.close()
+    return it
+
+
+async def run_monitor(cfg: MonitorConfig) -> list[Iteration]:
+    """Run the journey with ``cfg.sessions`` concurrent sessions in one browser."""
+    results: list[Iteration] = []
+    budget = {"left": cfg.iterations}
+    t_start = time.perf_counter()
+    deadline = t_start + cfg.duration_s if cfg.duration_s else None
+
+    def _claim() -> bool:
+        if deadline and time.perf_counter() >= deadline:
+            return False
+        if budget["left"] is None:
+            return True
+        if budget["left"] <= 0:
+            return False
+        budget["left"] -= 1
+        return True
+
+    async with async_playwright() as p:
+        browser = await getattr(p, cfg.browser_name).launch(headless=True)
+
+        async def _session(n: int, delay: float) -> None:
+            await asyncio.sleep(delay)
+            while _claim():
+                results.append(await _journey(browser, cfg, n, time.perf_counter() - t_start))
+                if cfg.think_ms:
+                    await asyncio.sleep(cfg.think_ms / 1000)
+
+        try:
+            await asyncio.gather(*(_session(n, d) for n, d in enumerate(ramp_offsets(cfg.sessions, cfg.ramp_up_s))))
+        finally:
+            await browser.close()
+    return results
+
+
+# ---------- reporting ----------
+def report(results: list[Iteration], wall_s: float) -> dict:
+    ok = [r for r in results if r.ok]
+    return {
+        "iterations": len(results),
+        "ok": len(ok),
+        "errors": len(results) - len(ok),
+        "success_rate": len(ok) / len(results) if results else 0.0,
+        "error_rate": (len(results) - len(ok)) / len(results) if results else 0.0,
+        "wall_s": wall_s,
+        "throughput_per_min": len(results) / wall_s * 60 if wall_s else 0.0,
+        # Step latencies include every completed step; the journey total only successful runs.
+        "steps_ms": {s: summarize(r.steps[s] for r in results if s in r.steps) for s in STEPS},
+        "journey_ms": summarize(r.total_ms for r in ok),
+        "errors_by_step": dict(Counter(r.failed_step for r in results if not r.ok)),
+        "error_samples": dict(Counter(r.error for r in results if r.error).most_common(5)),
+    }
+
+
+def write_json(path: str | Path, cfg: MonitorConfig, summary: dict, results: list[Iteration]) -> None:
+    safe_cfg = {k: v for k, v in asdict(cfg).items() if k != "password"}
+    doc = {"config": safe_cfg, "summary": summary, "iterations": [asdict(r) for r in results]}
+    Path(path).write_text(json.dumps(doc, indent=1), encoding="utf-8")
+
+
+def write_csv(path: str | Path, summary: dict) -> None:
+    cols = ["n", "min", "mean", "p50", "p95", "p99", "max"]
+    rows = [(s, summary["steps_ms"][s]) for s in STEPS] + [("journey", summary["journey_ms"])]
+    with Path(path).open("w", newline="", encoding="utf-8") as fh:
+        w = csv.writer(fh)
+        w.writerow(["step", *cols, "error_rate"])
+        for name, stats in rows:
+            w.writerow([name, *(round(stats.get(c, 0), 1) for c in cols), round(summary["error_rate"], 4)])
+
+
+def format_summary(summary: dict) -> list[str]:
+    lines = [
+        f"{summary['iterations']} iteration(s), {summary['ok']} ok, {summary['errors']} error(s) "
+        f"({summary['success_rate']:.1%} success) in {summary['wall_s']:.1f}s "
+        f"({summary['throughput_per_min']:.1f}/min)",
+        f"{'step':<12} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}",
+    ]
+    for name, stats in [*summary["steps_ms"].items(), ("journey", summary["journey_ms"])]:
+        if stats["n"]:
+            lines.append(
+                f"{name:<12} {stats['n']:>5} {stats['p50']:>9.0f} {stats['p95']:>9.0f} "
+                f"{stats['p99']:>9.0f} {stats['max']:>9.0f}"
+            )
+    for step, count in summary["errors_by_step"].items():
+        lines.append(f"errors at {step}: {count}")
+    return lines
+
+
+# ---------- CLI ----------
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--env", help="Settings environment (TEST_ENV) for URL and credentials")
+    parser.add_argument("--base-url", help="Override the target base URL")
+    parser.add_argument("--standin", action="store_true", help="Target a local stand-in storefront")
+    parser.add_argument("--standin-latency-ms", type=int, default=0)
+    parser.add_argument("--login", choices=["phone", "email"], default="phone")
+    parser.add_argument("--sessions", type=int, default=1, help="Concurrent headless sessions")
+    parser.add_argument("--iterations", type=int, help="Total journeys (default 1, or unlimited with --duration)")
+    parser.add_argument("--duration", type=float, help="Stop starting new journeys after this many seconds")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which sessions are started")
+    parser.add_argument("--think-ms", type=int, default=0, help="Pause between a session's journeys")
+    parser.add_argument("--browser", default="chromium", choices=["chromium", "firefox", "webkit"])
+    parser.add_argument("--emulation", default="none", help="Device/network profile, e.g. 4g-id, slow-3g")
+    parser.add_argument("--json", dest="json_path", help="Write summary + per-iteration results as JSON")
+    parser.add_argument("--csv", dest="csv_path", help="Write per-step percentiles as CSV")
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="Exit 1 above this error rate (monitoring)")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.standin:
+        from utils.standin_server import StandinConfig, StandinServer
+
+        server = StandinServer(StandinConfig(latency_ms=args.standin_latency_ms)).start()
+        base_url, phone, email, password, dial = server.base_url, "7000000000", "monitor@example.com", "secret", "+91"
+    else:
+        from utils.config import get_settings
+
+        s = get_settings(args.env)
+        base_url, phone, email, password, dial = s.base_url, s.phone_number, s.email, s.password, s.dial_code
+
+    cfg = MonitorConfig(
+        base_url=args.base_url or base_url,
+        password=password,
+        phone=phone if args.login == "phone" else None,
+        email=email if args.login == "email" else None,
+        dial_code=dial,
+        sessions=args.sessions,
+        iterations=args.iterations if args.iterations or not args.duration else None,
+        duration_s=args.duration,
+        ramp_up_s=args.ramp_up,
+        think_ms=args.think_ms,
+        browser_name=args.browser,
+        emulation=args.emulation,
+    )
+    if cfg.iterations is None and cfg.duration_s is None:
+        cfg.iterations = 1
+
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(run_monitor(cfg))
+    finally:
+        if server:
+            server.stop()
+    summary = report(results, time.perf_counter() - started)
+
+    print("\n".join(format_summary(summary)))
+    if args.json_path:
+        write_json(args.json_path, cfg, summary, results)
+    if args.csv_path:
+        write_csv(args.csv_path, summary)
+    return 1 if not results or summary["error_rate"] > args.max_error_rate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
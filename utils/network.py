@@ -0,0 +1,202 @@
+# utils/network.py
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterable
+from urllib.parse import urlsplit
+
+from playwright.sync_api import BrowserContext, Request, Response, Route
+
+MEDIA_TYPES = {"image", "media", "font"}
+
+# Marketing/analytics hosts that never matter for our assertions.
+ANALYTICS_HOSTS = [
+    "*.useinsider.com",
+    "*.google-analytics.com",
+    "*.googletagmanager.com",
+    "*.doubleclick.net",
+    "*.facebook.net",
+    "*.facebook.com",
+    "*.hotjar.com",
+    "*.tiktok.com",
+    "*.clarity.ms",
+]
+
+# Fallback size guesses (bytes) for blocked requests we have never seen served.
+_TYPE_SIZE_GUESS = {"image": 40_000, "media": 500_000, "font": 30_000, "script": 60_000, "stylesheet": 20_000}
+
+
+@dataclass(frozen=True)
+class BlockProfile:
+    name: str
+    block_types: frozenset[str] = frozenset()
+    first_party_only: bool = False
+    allow: tuple[str, ...] = ()
+    deny: tuple[str, ...] = ()
+
+
+PROFILES = {
+    "full": BlockProfile("full"),
+    "no-media": BlockProfile("no-media", block_types=frozenset(MEDIA_TYPES)),
+    "no-analytics": BlockProfile("no-analytics", deny=tuple(ANALYTICS_HOSTS)),
+    "no-media-analytics": BlockProfile(
+        "no-media-analytics", block_types=frozenset(MEDIA_TYPES), deny=tuple(ANALYTICS_HOSTS)
+    ),
+    "first-party-only": BlockProfile("first-party-only", block_types=frozenset(MEDIA_TYPES), first_party_only=True),
+    "custom": BlockProfile("custom"),
+}
+
+
+def resolve_profile(name: str, allow: Iterable[str] = (), deny: Iterable[str] = ()) -> BlockProfile:
+    """Look up a named profile and merge the allow/deny host patterns from settings."""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown network profile {name!r}. Use one of: {', '.join(PROFILES)}")
+    base = PROFILES[name]
+    if name == "full":
+        return base
+    return BlockProfile(
+        name=base.name,
+        block_types=base.block_types,
+        first_party_only=base.first_party_only,
+        allow=base.allow + tuple(allow),
+        deny=base.deny + tuple(deny),
+    )
+
+
+def _host_matches(host: str, patterns: Iterable[str]) -> bool:
+    # "*.example.com" should match "example.com" too.
+    return any(fnmatch(host, p) or (p.startswith("*.") and host == p[2:]) for p in patterns)
+
+
+@dataclass
+class BlockStats:
+    requests: int = 0
+    bytes: int = 0
+    estimated_bytes: int = 0
+    by_reason: dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "estimated_bytes": self.estimated_bytes,
+            "by_reason": dict(self.by_reason),
+        }
+
+
+class SizeTable:
+    """URL -> last seen Content-Length, so blocked bytes are reported from real sizes.
+
+    Only served responses are learned: a URL blocked in every run so far has
+    no entry and is priced by ``_TYPE_SIZE_GUESS`` (reported as estimated).
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else None
+        self.sizes: dict[str, int] = {}
+        self._dirty = False
+        if self.path and self.path.exists():
+            try:
+                self.sizes = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                self.sizes = {}
+
+    @staticmethod
+    def key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+
+    def learn(self, response: Response) -> None:
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            key = self.key(response.url)
+            if self.sizes.get(key) != int(length):
+                self.sizes[key] = int(length)
+                self._dirty = True
+
+    def lookup(self, url: str) -> int | None:
+        return self.sizes.get(self.key(url))
+
+    def save(self) -> None:
+        """Merge what this process learned into the file; untouched when nothing changed."""
+        if not self.path or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        merged = {}
+        if self.path.exists():
+            try:
+                merged = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                merged = {}
+        merged.update(self.sizes)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(merged), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+class NetworkBlocker:
+    """Context-level routing layer that aborts requests the active profile rejects.
+
+    Response sizes are only learned when a ``sizes`` table is given; with the
+    ``full`` profile and no table, ``attach`` leaves the context untouched.
+    """
+
+    def __init__(self, profile: BlockProfile, first_party_hosts: Iterable[str] = (), sizes: SizeTable | None = None):
+        self.profile = profile
+        self.first_party = [h for h in first_party_hosts if h]
+        self.sizes = sizes
+        self.stats = BlockStats()
+
+    def block_reason(self, url: str, resource_type: str) -> str | None:
+        host = urlsplit(url).hostname or ""
+        if not host:  # data:, blob: etc.
+            return None
+        p = self.profile
+        if _host_matches(host, p.allow):
+            return None
+        if _host_matches(host, p.deny):
+            return "deny"
+        if resource_type in p.block_types:
+            return resource_type
+        if p.first_party_only and not _host_matches(host, self.first_party):
+            return "third-party"
+        return None
+
+    def attach(self, context: BrowserContext) -> None:
+        if self.sizes is not None:
+            context.on("response", self.sizes.learn)
+        if self.profile.name != "full":
+            context.route("**/*", self._handle)
+
+    def detach(self, context: BrowserContext) -> None:
+        """Undo ``attach`` so a pooled context can be handed to the next test."""
+        if self.sizes is not None:
+            context.remove_listener("response", self.sizes.learn)
+        if self.profile.name != "full":
+            context.unroute("**/*", self._handle)
+
+    def _handle(self, route: Route, request: Request) -> None:
+        reason = self.block_reason(request.url, request.resource_type)
+        if reason is None:
+            route.fallback()
+            return
+        self.stats.requests += 1
+        self.stats.by_reason[reason] = self.stats.by_reason.get(reason, 0) + 1
+        known = self.sizes.lookup(request.url) if self.sizes is not None else None
+        if known is not None:
+            self.stats.bytes += known
+        else:
+            self.stats.estimated_bytes += _TYPE_SIZE_GUESS.get(request.resource_type, 5_000)
+        route.abort("blockedbyclient")
+
+
+def first_party_hosts(base_url: str) -> list[str]:
+    """``https://www.matahari.com`` -> ``["matahari.com", "*.matahari.com"]``."""
+    host = urlsplit(base_url).hostname or ""
+    root = host[4:] if host.startswith("www.") else host
+    return [root, f"*.{root}"] if root else []
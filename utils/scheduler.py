@@ -0,0 +1,228 @@
+# utils/scheduler.py
+"""Duration-history-aware xdist scheduling (``pytest -n auto --sched=history``).
+
+Tests are packed onto workers longest-processing-time-first using durations
+from previous runs, keeping tests with the same affinity (env + login account)
+on one worker so per-worker login caches and context pools get reused. Each
+worker then pulls from its own queue; a worker that runs dry steals the
+shortest remaining tests from the most loaded queue.
+"""
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+from xdist.scheduler import LoadScheduling
+
+_KEEP = 5  # durations remembered per test
+
+
+class DurationHistory:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.data: dict[str, dict] = {}
+        if self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                self.data = {}
+
+    def record(self, nodeid: str, seconds: float, affinity: str | None = None) -> None:
+        entry = self.data.setdefault(nodeid, {"d": []})
+        entry["d"] = (entry["d"] + [round(seconds, 3)])[-_KEEP:]
+        if affinity:
+            entry["affinity"] = affinity
+
+    def predict(self, nodeid: str, default: float) -> float:
+        durations = self.data.get(nodeid, {}).get("d")
+        return statistics.median(durations) if durations else default
+
+    def affinity(self, nodeid: str) -> str | None:
+        return self.data.get(nodeid, {}).get("affinity")
+
+    def default_duration(self) -> float:
+        known = [statistics.median(e["d"]) for e in self.data.values() if e.get("d")]
+        return statistics.median(known) if known else 1.0
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.data, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class DurationTally:
+    """This run's per-test seconds (setup + call + teardown) worth remembering.
+
+    Only tests whose call phase ran count; a test skipped in any phase is
+    dropped, since its near-zero time would make it look instant to LPT.
+    """
+
+    def __init__(self):
+        self.seconds: dict[str, float] = {}
+        self.called: set[str] = set()
+        self.skipped: set[str] = set()
+
+    def add(self, nodeid: str, when: str, duration: float, skipped: bool) -> None:
+        if skipped:
+            self.skipped.add(nodeid)
+            return
+        self.seconds[nodeid] = self.seconds.get(nodeid, 0.0) + duration
+        if when == "call":
+            self.called.add(nodeid)
+
+    def durations(self) -> dict[str, float]:
+        return {n: s for n, s in self.seconds.items() if n in self.called and n not in self.skipped}
+
+
+@dataclass
+class Plan:
+    bins: list[list[int]]
+    loads: list[float]
+    predicted: dict[int, float]
+
+    @property
+    def makespan(self) -> float:
+        return max(self.loads, default=0.0)
+
+
+def plan_lpt(nodeids: Sequence[str], workers: int, history: DurationHistory) -> Plan:
+    """Pack test indices onto ``workers`` bins, longest group/test first."""
+    default = history.default_duration()
+    predicted = {i: history.predict(nid, default) for i, nid in enumerate(nodeids)}
+    target = sum(predicted.values()) / max(workers, 1)
+
+    groups: dict[str, list[int]] = defaultdict(list)
+    for i, nid in enumerate(nodeids):
+        groups[history.affinity(nid) or f"_solo:{i}"].append(i)
+
+    # Affinity is soft: a group bigger than one worker's fair share is split.
+    chunks: list[list[int]] = []
+    for members in groups.values():
+        members.sort(key=lambda i: -predicted[i])
+        chunk: list[int] = []
+        size = 0.0
+        for i in members:
+            if chunk and size + predicted[i] > target:
+                chunks.append(chunk)
+                chunk, size = [], 0.0
+            chunk.append(i)
+            size += predicted[i]
+        chunks.append(chunk)
+    chunks.sort(key=lambda c: -sum(predicted[i] for i in c))
+
+    bins: list[list[int]] = [[] for _ in range(workers)]
+    loads = [0.0] * workers
+    for chunk in chunks:
+        k = loads.index(min(loads))
+        bins[k].extend(chunk)
+        loads[k] += sum(predicted[i] for i in chunk)
+    return Plan(bins, loads, predicted)
+
+
+class HistoryScheduling(LoadScheduling):
+    """xdist scheduler that follows a :func:`plan_lpt` plan, with work stealing."""
+
+    def __init__(self, config, log=None, history: DurationHistory | None = None):
+        super().__init__(config, log)
+        self.history = history or DurationHistory(config.getoption("--duration-history"))
+        self.node2queue: dict = {}
+        self.plan: Plan | None = None
+        self.started = time.monotonic()
+        self.node_finished_at: dict = {}
+
+    @property
+    def tests_finished(self) -> bool:
+        if not self.collection_is_completed or any(self.node2queue.values()):
+            return False
+        return all(len(p) < 2 for p in self.node2pending.values())
+
+    @property
+    def has_pending(self) -> bool:
+        return any(self.node2queue.values()) or any(self.node2pending.values())
+
+    def schedule(self) -> None:
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self._refill(node)
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+        self.collection = next(iter(self.node2collection.values()))
+        self.plan = plan_lpt(self.collection, len(self.nodes), self.history)
+        for node, indices in zip(self.nodes, self.plan.bins):
+            self.node2queue[node] = deque(indices)
+        self.started = time.monotonic()
+        for node in self.nodes:
+            self._refill(node)
+
+    def mark_test_complete(self, node, item_index: int, duration: float = 0) -> None:
+        self.node2pending[node].remove(item_index)
+        self.node_finished_at[node.gateway.id] = time.monotonic() - self.started
+        self._refill(node)
+
+    def mark_test_pending(self, item: str) -> None:
+        assert self.collection is not None
+        queue = min(self.node2queue.values(), key=len)
+        queue.appendleft(self.collection.index(item))
+        for node in self.nodes:
+            self._refill(node)
+
+    def remove_node(self, node) -> str | None:
+        pending = self.node2pending.pop(node)
+        orphans = list(self.node2queue.pop(node, ()))
+        crashitem = None
+        if pending:
+            assert self.collection is not None
+            crashitem = self.collection[pending.pop(0)]
+            orphans = pending + orphans
+        if orphans and self.node2queue:
+            for i, idx in enumerate(orphans):
+                list(self.node2queue.values())[i % len(self.node2queue)].append(idx)
+        for other in self.nodes:
+            self._refill(other)
+        return crashitem
+
+    def _steal_for(self, node) -> None:
+        assert self.plan is not None
+        donors = [q for n, q in self.node2queue.items() if n is not node and q]
+        if not donors:
+            return
+        donor = max(donors, key=lambda q: sum(self.plan.predicted[i] for i in q))
+        self.node2queue[node].append(donor.pop())  # shortest remaining test
+
+    def _refill(self, node) -> None:
+        if node.shutting_down or self.collection is None:
+            return
+        queue = self.node2queue.setdefault(node, deque())
+        pending = self.node2pending[node]
+        batch = []
+        while len(pending) + len(batch) < 2:
+            if not queue:
+                self._steal_for(node)
+            if not queue:
+                break
+            batch.append(queue.popleft())
+        if batch:
+            pending.extend(batch)
+            node.send_runtest_some(batch)
+        if not queue and not any(self.node2queue.values()):
+            node.shutdown()
+
+    def makespan_report(self) -> str | None:
+        if not self.plan or not self.node_finished_at:
+            return None
+        actual = max(self.node_finished_at.values())
+        return (
+            f"predicted makespan {self.plan.makespan:.1f}s, actual {actual:.1f}s "
+            f"over {len(self.plan.bins)} workers "
+            f"(predicted loads: {', '.join(f'{load:.0f}s' for load in self.plan.loads)})"
+        )
@@ -0,0 +1,316 @@
+# utils/standin_server.py
+"""Local stand-in for the matahari.com storefront.
+
+Reproduces only the DOM contracts our page objects rely on (header account
+icon, search box, ``#CustomerLoginForm`` phone/email forms, Insider overlay and
+iframe banner) with configurable latency, overlay timing and login outcome.
+
+    python -m utils.standin_server --port 8000 --latency-ms 50 --overlay delayed
+"""
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import secrets
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+SESSION_COOKIE = "_standin_session"
+
+
+@dataclass
+class StandinConfig:
+    latency_ms: int = 0
+    overlay: str = "none"          # none | immediate | delayed
+    overlay_delay_ms: int = 800
+    banner_iframe: bool = False
+    login_outcome: str = "success"  # success | fail
+    login_token_in_form: bool = True  # hidden authenticity token rendered (the POST always needs it)
+    catalogue_size: int = 60        # products returned for any search term
+    search_page_size: int = 24
+    search_scroll: bool = False     # infinite scroll instead of "next" links
+
+
+_LAYOUT = """<!doctype html>
+<html lang="id"><head><meta charset="utf-8"><title>{title} | Matahari (stand-in)</title></head>
+<body>
+<header>
+  <a class="site-nav__link site-nav__link--icon small--hide header-account-icon" href="/account">Akun</a>
+  <form action="/search" method="get"><input type="search" name="q" placeholder="Cari"></form>
+</header>
+<main>{body}</main>
+{banner}
+<script>
+(function () {{
+  var cfg = {overlay};
+  function show() {{
+    var d = document.createElement('div');
+    d.id = 'ins-frameless-overlay';
+    d.style = 'position:fixed;inset:0;background:rgba(0,0,0,.5);z-index:9999';
+    d.innerHTML = '<button data-testid="closeButton" style="margin:40px">&times;</button>';
+    d.querySelector('button').onclick = function () {{ d.remove(); }};
+    document.body.appendChild(d);
+  }}
+  if (cfg.mode === 'immediate') show();
+  else if (cfg.mode === 'delayed') setTimeout(show, cfg.delay);
+}})();
+</script>
+</body></html>"""
+
+_BANNER = """<iframe id="ins-banner" src="/banner" style="position:fixed;bottom:0;left:0;width:100%;height:80px;border:0;z-index:9000"></iframe>"""
+
+_BANNER_DOC = """<!doctype html><html><body style="margin:0;background:#fde">
+<span class="ins-web-opt-in-reminder-close-button" style="display:inline-block;padding:8px;cursor:pointer"
+  onclick="parent.document.getElementById('ins-banner').remove()">&times;</span> Aktifkan notifikasi
+</body></html>"""
+
+_LOGIN_BODY = """
+<div id="CustomerLoginForm">
+  {error}
+  <form class="phonenumber-login" action="/account/login" method="post">
+    {token}
+    <select id="MobileCountryCode" name="customer[country_code]">
+      <option value="+62">Indonesia (+62)</option>
+      <option value="+91">India (+91)</option>
+      <option value="+65">Singapore (+65)</option>
+    </select>
+    <label for="AddressPhoneNew">Telepon</label>
+    <input id="AddressPhoneNew" name="customer[phone]" type="tel" aria-label="Telepon Telepon">
+    <input id="CreatePassword" name="customer[password]" type="password">
+    <button type="submit">Masuk</button>
+  </form>
+  <button type="button" class="btn btn--full btn--secondary toggle-login"
+    onclick="document.querySelector('.email-login').style.display='block';this.style.display='none'">Masuk dengan Email</button>
+  <form class="email-login" action="/account/login" method="post" style="display:none">
+    {token}
+    <input id="CustomerEmail" name="customer[email]" type="email">
+    <input id="CreatePassword" name="customer[password]" type="password">
+    <button type="submit">Masuk</button>
+  </form>
+</div>"""
+
+
+_CARD = """<div class="grid-product" data-product-id="{i}">
+  <a class="grid-product__link" href="/products/{handle}?_pos={pos}&_ss=r">
+    <div class="grid-product__title">{name}</div>
+    <div class="grid-product__price"><s class="grid-product__price--original">Rp {was}</s> Rp {price}</div>
+    {tag}
+  </a>
+</div>"""
+
+# Appends the next batch of cards when the bottom of the grid scrolls into view.
+_SCROLL_JS = """<div id="scroll-sentinel" data-next="{next}"></div>
+<script>
+(function () {{
+  var sentinel = document.getElementById('scroll-sentinel');
+  new IntersectionObserver(function (entries) {{
+    if (!entries[0].isIntersecting || !sentinel.dataset.next) return;
+    var url = sentinel.dataset.next; sentinel.dataset.next = '';
+    fetch(url).then(function (r) {{ return r.json(); }}).then(function (d) {{
+      document.getElementById('product-grid').insertAdjacentHTML('beforeend', d.html);
+      sentinel.dataset.next = d.next || '';
+    }});
+  }}).observe(sentinel);
+}})();
+</script>"""
+
+
+def _price(n: int) -> str:
+    return f"{n:,}".replace(",", ".")
+
+
+def _cards(term: str, start: int, stop: int) -> str:
+    cards = []
+    for i in range(start, stop):
+        price = 49_000 + 10_000 * i
+        cards.append(_CARD.format(
+            i=i,
+            handle=f"{term.lower().replace(' ', '-') or 'item'}-{i + 1}",
+            pos=i + 1,
+            name=html.escape(f"{term.title() or 'Item'} {i + 1}"),
+            was=_price(price * 2),
+            price=_price(price),
+            tag='<span class="grid-product__tag grid-product__tag--sold-out">Habis</span>' if i % 7 == 6 else "",
+        ))
+    return "\n".join(cards)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "StandinServer"
+
+    def log_message(self, *args) -> None:  # keep pytest output clean
+        pass
+
+    def parse_request(self) -> bool:
+        ok = super().parse_request()
+        if ok:
+            self.server.requests.append(f"{self.command} {self.path}")
+        return ok
+
+    @property
+    def cfg(self) -> StandinConfig:
+        return self.server.config
+
+    def _logged_in(self) -> bool:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        return SESSION_COOKIE in cookie
+
+    def _send(self, status: int, body: str = "", *, ctype: str = "text/html; charset=utf-8", headers: dict | None = None) -> None:
+        if self.cfg.latency_ms:
+            time.sleep(self.cfg.latency_ms / 1000)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _page(self, title: str, body: str) -> str:
+        overlay = json.dumps({"mode": self.cfg.overlay, "delay": self.cfg.overlay_delay_ms})
+        banner = _BANNER if self.cfg.banner_iframe else ""
+        return _LAYOUT.format(title=html.escape(title), body=body, banner=banner, overlay=overlay)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path in ("/", ""):
+            self._send(200, self._page("Home", "<h1>Matahari</h1>"))
+        elif url.path == "/banner":
+            self._send(200, _BANNER_DOC)
+        elif url.path == "/search":
+            self._search(parse_qs(url.query))
+        elif url.path == "/account/login":
+            if self._logged_in():
+                self._send(302, headers={"Location": "/account"})
+            else:
+                self._send(200, self._page("Login", self._login_body()))
+        elif url.path == "/account":
+            if not self._logged_in():
+                self._send(302, headers={"Location": "/account/login?return_url=%2Faccount"})
+            else:
+                self._send(200, self._page("Akun", '<h1>Akun Saya</h1><button type="button">Ubah Kontak</button>'))
+        elif url.path == "/account/logout":
+            self._send(302, headers={"Location": "/", "Set-Cookie": f"{SESSION_COOKIE}=; Path=/; Max-Age=0"})
+        else:
+            self._send(404, self._page("Not found", "<h1>404</h1>"))
+
+    def _search(self, query: dict) -> None:
+        q = query.get("q", [""])[0]
+        page = max(1, int(query.get("page", ["1"])[0] or 1))
+        size = self.cfg.search_page_size
+        start, stop = (page - 1) * size, min(page * size, self.cfg.catalogue_size)
+        more = stop < self.cfg.catalogue_size
+        next_url = f"/search?{urlencode({'q': q, 'page': page + 1})}" if more else ""
+        cards = _cards(q, start, stop)
+        if query.get("view") == ["cards"]:
+            self._send(200, json.dumps({"html": cards, "next": next_url and next_url + "&view=cards"}),
+                       ctype="application/json")
+            return
+        if self.cfg.search_scroll:
+            tail = _SCROLL_JS.format(next=html.escape(next_url and next_url + "&view=cards"))
+        else:
+            tail = f'<a class="pagination__next" rel="next" href="{html.escape(next_url)}">Berikutnya</a>' if more else ""
+        body = (f"<h1>Hasil pencarian untuk \"{html.escape(q)}\"</h1>"
+                f'<div id="product-grid">{cards}</div>{tail}')
+        self._send(200, self._page(f"Search: {q}", body))
+
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if url.path != "/account/login":
+            self._send(404, "")
+            return
+        self.server.login_posts += 1
+        has_creds = bool(form.get("customer[password]")) and bool(form.get("customer[phone]") or form.get("customer[email]"))
+        has_token = form.get("authenticity_token") == [self.server.form_token]
+        if self.cfg.login_outcome == "success" and has_creds and has_token:
+            self._send(302, headers={"Location": "/account", "Set-Cookie": f"{SESSION_COOKIE}=1; Path=/; HttpOnly"})
+        else:
+            error = '<div class="form-message form-message--error" role="alert">Nomor telepon atau kata sandi salah.</div>'
+            self._send(200, self._page("Login", self._login_body(error)))
+
+    def _login_body(self, error: str = "") -> str:
+        token = ""
+        if self.cfg.login_token_in_form:
+            token = (f'<input type="hidden" name="form_type" value="customer_login">'
+                     f'<input type="hidden" name="authenticity_token" value="{self.server.form_token}">')
+        return _LOGIN_BODY.format(error=error, token=token)
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config: StandinConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.config = config or StandinConfig()
+        self.login_posts = 0
+        self.form_token = secrets.token_urlsafe(12)
+        self.requests: list[str] = []  # "<METHOD> <path>" of every request served
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def login_url(self) -> str:
+        return f"{self.base_url}/account/login?return_url=%2Faccount"
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="standin-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--overlay", choices=["none", "immediate", "delayed"], default="none")
+    parser.add_argument("--overlay-delay-ms", type=int, default=800)
+    parser.add_argument("--banner-iframe", action="store_true")
+    parser.add_argument("--login-outcome", choices=["success", "fail"], default="success")
+    parser.add_argument("--catalogue-size", type=int, default=60)
+    parser.add_argument("--search-scroll", action="store_true", help="Infinite-scroll search results")
+    args = parser.parse_args()
+    config = StandinConfig(
+        latency_ms=args.latency_ms,
+        overlay=args.overlay,
+        overlay_delay_ms=args.overlay_delay_ms,
+        banner_iframe=args.banner_iframe,
+        login_outcome=args.login_outcome,
+        catalogue_size=args.catalogue_size,
+        search_scroll=args.search_scroll,
+    )
+    server = StandinServer(config, port=args.port)
+    print(f"stand-in storefront on {server.base_url} {asdict(config)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# utils/stats.py
+from __future__ import annotations
+
+from typing import Iterable
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """Linear-interpolated percentile, ``q`` in [0, 100]."""
+    data = sorted(values)
+    if not data:
+        return 0.0
+    k = (len(data) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(data) - 1)
+    return data[lo] + (data[hi] - data[lo]) * (k - lo)
+
+
+def summarize(values: Iterable[float]) -> dict:
+    data = list(values)
+    if not data:
+        return {"n": 0}
+    return {
+        "n": len(data),
+        "min": min(data),
+        "mean": sum(data) / len(data),
+        "p50": percentile(data, 50),
+        "p95": percentile(data, 95),
+        "p99": percentile(data, 99),
+        "max": max(data),
+    }
@@ -0,0 +1,153 @@
+# utils/strategies.py
+"""Self-learning order for page-object fallback chains.
+
+Each chain (e.g. ``Loginpage.select_dial_code``) declares its strategies in a
+default order. The registry remembers, per (chain, env, site build), how often
+each strategy wins and what a failure costs, and tries the likeliest winner
+first. Scores decay, so a winner that starts failing loses its place.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Sequence
+
+from playwright.sync_api import Page
+
+from utils import timing
+
+Strategy = tuple[str, Callable[[], object]]
+
+_BUILD_JS = """
+() => (window.Shopify && Shopify.theme && String(Shopify.theme.id))
+      || (document.querySelector('meta[name=generator]') || {}).content
+      || ''
+"""
+_builds: "weakref.WeakKeyDictionary[Page, str]" = weakref.WeakKeyDictionary()
+
+
+def site_build(page: Page) -> str:
+    """Theme/build id of the storefront ``page`` is on (one evaluate per page)."""
+    if page not in _builds:
+        try:
+            _builds[page] = page.evaluate(_BUILD_JS) or "unknown"
+        except Exception:
+            return "unknown"
+    return _builds[page]
+
+
+def strategy_key(page: Page, chain: str) -> str:
+    """Registry key: fallback chain + environment + storefront build."""
+    try:
+        from utils.config import active_env
+
+        env = active_env()
+    except Exception:
+        env = "-"
+    return f"{chain}|{env}|{site_build(page)}"
+
+
+@dataclass
+class StrategyStats:
+    runs: int = 0
+    reordered_runs: int = 0
+    saved_ms: float = 0.0
+
+
+class StrategyRegistry:
+    def __init__(self, path: str | Path | None = None, decay: float = 0.7):
+        self.path = Path(path) if path else None
+        self.decay = decay
+        self.stats = StrategyStats()
+        self.data: dict[str, dict[str, dict]] = {}
+        self._new: dict[str, dict[str, list]] = {}  # outcomes recorded since load: key -> name -> [(ok, ms)]
+        if self.path and self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                self.data = {}
+
+    def order(self, key: str, names: Sequence[str]) -> list[str]:
+        entry = self.data.get(key, {})
+        # Unknown strategies score 0.5 so a proven winner (≈1) goes first and a
+        # consistently failing one (≈0) goes last; ties keep declared order.
+        return sorted(names, key=lambda n: (-entry.get(n, {}).get("score", 0.5), names.index(n)))
+
+    def record(self, key: str, name: str, ok: bool, elapsed_ms: float) -> None:
+        self._apply(self.data, key, name, ok, elapsed_ms)
+        self._new.setdefault(key, {}).setdefault(name, []).append((ok, round(elapsed_ms, 1)))
+
+    def _apply(self, data: dict, key: str, name: str, ok: bool, elapsed_ms: float) -> None:
+        s = data.setdefault(key, {}).setdefault(name, {"score": 0.5, "wins": 0, "fails": 0, "fail_ms": 0.0})
+        s["score"] = round(self.decay * s["score"] + (1 - self.decay) * (1.0 if ok else 0.0), 4)
+        if ok:
+            s["wins"] += 1
+        else:
+            s["fails"] += 1
+            s["fail_ms"] = round(elapsed_ms if not s["fail_ms"] else 0.5 * s["fail_ms"] + 0.5 * elapsed_ms, 1)
+
+    def run(self, key: str, strategies: Sequence[Strategy]) -> str | None:
+        """Try strategies in learned order; return the winner's name (None if all failed)."""
+        declared = [name for name, _ in strategies]
+        fns = dict(strategies)
+        order = self.order(key, declared)
+        self.stats.runs += 1
+        for name in order:
+            started = time.perf_counter()
+            try:
+                with timing.span(f"attempt:{name}"):
+                    fns[name]()
+            except Exception:
+                self.record(key, name, False, (time.perf_counter() - started) * 1000)
+                continue
+            self.record(key, name, True, (time.perf_counter() - started) * 1000)
+            self._account_savings(key, declared, order, name)
+            return name
+        return None
+
+    def _account_savings(self, key: str, declared: list[str], order: list[str], winner: str) -> None:
+        # Strategies declared before the winner that the learned order skipped
+        # would each have cost (about) their usual failure time.
+        skipped = [n for n in declared[: declared.index(winner)] if order.index(n) > order.index(winner)]
+        if skipped:
+            self.stats.reordered_runs += 1
+            entry = self.data.get(key, {})
+            self.stats.saved_ms += sum(entry.get(n, {}).get("fail_ms", 0.0) for n in skipped)
+
+    def save(self) -> None:
+        """Replay this process's outcomes onto the file (other workers may have written too)."""
+        if not self.path or not self._new:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        merged: dict = {}
+        if self.path.exists():
+            try:
+                merged = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                merged = {}
+        for key, names in self._new.items():
+            for name, outcomes in names.items():
+                for ok, elapsed_ms in outcomes:
+                    self._apply(merged, key, name, ok, elapsed_ms)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(merged, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._new = {}
+
+
+_registry = StrategyRegistry()
+
+
+def registry() -> StrategyRegistry:
+    return _registry
+
+
+def configure(path: str | Path | None, decay: float = 0.7) -> StrategyRegistry:
+    """Swap in a disk-backed registry (done by conftest for test runs)."""
+    global _registry
+    _registry = StrategyRegistry(path, decay=decay)
+    return _registry
@@ -0,0 +1,166 @@
+# utils/timeouts.py
+"""Adaptive per-action timeouts learned from how long actions take to succeed.
+
+Page objects name each waiting action and pass their old literal as the
+default::
+
+    with timed("Loginpage.email_form.email_visible", 3000) as t:
+        form.locator("#CustomerEmail").wait_for(state="visible", timeout=t)
+
+Successful durations are kept per (env, action). Once an action has
+``min_samples`` of them, its timeout becomes ``margin`` x the ``pct``
+percentile, clamped to ``[floor_ms, cap_factor x default]``; until then the
+default applies. Failures are never samples, so a probe for an element
+that's usually absent keeps its default; timeouts are listed in
+``timed_out`` instead. Under an emulation profile samples are kept apart
+(``<env>/<profile>``) so throttled runs don't inflate normal timeouts.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from utils.stats import percentile
+
+T = TypeVar("T")
+
+
+class TimeoutPolicy:
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        mode: str = "on",          # on | record (learn, keep defaults) | off
+        pct: float = 99.0,
+        margin: float = 2.0,
+        floor_ms: int = 250,
+        cap_factor: float = 3.0,
+        min_samples: int = 10,
+        keep: int = 200,
+    ):
+        self.path = Path(path) if path else None
+        self.mode = mode
+        self.pct = pct
+        self.margin = margin
+        self.floor_ms = floor_ms
+        self.cap_factor = cap_factor
+        self.min_samples = min_samples
+        self.keep = keep
+        self.samples: dict[str, dict[str, list[float]]] = {}
+        self.defaults: dict[str, int] = {}
+        self.timed_out: list[str] = []  # actions whose wait timed out, in order
+        self._new: dict[str, dict[str, list[float]]] = {}
+        if self.path and self.path.exists():
+            try:
+                self.samples = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                self.samples = {}
+
+    def learned(self, action: str, default_ms: int, env: str | None = None) -> int | None:
+        """The learned timeout, or None while there are too few samples."""
+        data = self.samples.get(env or _env(), {}).get(action, [])
+        if len(data) < self.min_samples:
+            return None
+        value = percentile(data, self.pct) * self.margin
+        return int(min(max(value, self.floor_ms), default_ms * self.cap_factor))
+
+    def timeout(self, action: str, default_ms: int) -> int:
+        self.defaults.setdefault(action, default_ms)
+        if self.mode != "on":
+            return default_ms
+        learned = self.learned(action, default_ms)
+        return default_ms if learned is None else learned
+
+    def observe(self, action: str, elapsed_ms: float) -> None:
+        if self.mode == "off":
+            return
+        env = _env()
+        value = round(elapsed_ms, 1)
+        series = self.samples.setdefault(env, {}).setdefault(action, [])
+        series.append(value)
+        del series[: -self.keep]
+        self._new.setdefault(env, {}).setdefault(action, []).append(value)
+
+    def fail(self, action: str, exc: BaseException) -> None:
+        if "Timeout" in type(exc).__name__:
+            self.timed_out.append(action)
+
+    def save(self) -> None:
+        """Append this process's new samples to the file (other workers may have written too)."""
+        if not self.path or not self._new:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        merged: dict = {}
+        if self.path.exists():
+            try:
+                merged = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                merged = {}
+        for env, actions in self._new.items():
+            for action, values in actions.items():
+                series = merged.setdefault(env, {}).setdefault(action, [])
+                series.extend(values)
+                del series[: -self.keep]
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(merged, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._new = {}
+
+    def report(self) -> list[str]:
+        """One line per action used this run whose learned timeout differs from its default."""
+        lines = []
+        for action, default_ms in sorted(self.defaults.items()):
+            learned = self.learned(action, default_ms)
+            if learned is not None and learned != default_ms:
+                lines.append(f"{action:<44} {default_ms:>6} ms -> {learned:>6} ms")
+        return lines
+
+
+def _env() -> str:
+    try:
+        from utils.config import active_env
+
+        env = active_env()
+    except Exception:
+        env = "-"
+    from utils.emulation import active
+
+    profile = active()
+    return f"{env}/{profile}" if profile else env
+
+
+_policy = TimeoutPolicy()
+
+
+def policy() -> TimeoutPolicy:
+    return _policy
+
+
+def configure(path: str | Path | None, **kwargs) -> TimeoutPolicy:
+    """Swap in a disk-backed policy (done by conftest for test runs)."""
+    global _policy
+    _policy = TimeoutPolicy(path, **kwargs)
+    return _policy
+
+
+@contextmanager
+def timed(action: str, default_ms: int):
+    """Yield the timeout for ``action``; record the elapsed time if the block succeeds."""
+    p = _policy
+    started = time.perf_counter()
+    try:
+        yield p.timeout(action, default_ms)
+    except BaseException as exc:
+        p.fail(action, exc)
+        raise
+    p.observe(action, (time.perf_counter() - started) * 1000)
+
+
+def call_timed(action: str, default_ms: int, fn: Callable[[int], T]) -> T:
+    """``fn(timeout_ms)`` under :func:`timed`, for lambdas in fallback chains."""
+    with timed(action, default_ms) as t:
+        return fn(t)
@@ -0,0 +1,187 @@
+# utils/timing.py
+"""Nested timing spans for page-object methods.
+
+Disabled by default: ``instrument()`` only patches classes once ``enable()``
+has been called, and ``attempt()``/``note()`` reduce to a flag check.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from playwright.sync_api import TimeoutError as PWTimeout
+
+_tracer: "Tracer | None" = None
+
+
+class Tracer:
+    def __init__(self, out_path: str | Path):
+        self.out_path = Path(out_path)
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.out_path.open("a", encoding="utf-8")
+        self.test: str | None = None
+        self.test_spans: list[dict] = []
+        self._stack: list[dict] = []
+
+    def start(self, name: str) -> dict:
+        span = {
+            "test": self.test,
+            "name": name,
+            "parent": self._stack[-1]["name"] if self._stack else None,
+            "depth": len(self._stack),
+            "start": time.time(),
+            "_t0": time.perf_counter(),
+            "ok": True,
+            "timeout": False,
+            "attrs": {},
+        }
+        self._stack.append(span)
+        return span
+
+    def finish(self, span: dict, exc: BaseException | None = None) -> None:
+        span["ms"] = round((time.perf_counter() - span.pop("_t0")) * 1000, 2)
+        if exc is not None:
+            span["ok"] = False
+            span["timeout"] = isinstance(exc, PWTimeout)
+        if self._stack and self._stack[-1] is span:
+            self._stack.pop()
+        self.test_spans.append(span)
+        self._fh.write(json.dumps(span) + "\n")
+
+    def note(self, **attrs) -> None:
+        if self._stack:
+            self._stack[-1]["attrs"].update(attrs)
+
+    def begin_test(self, nodeid: str) -> None:
+        self.test = nodeid
+        self.test_spans = []
+
+    def end_test(self) -> list[dict]:
+        spans, self.test_spans, self.test = self.test_spans, [], None
+        self._fh.flush()
+        return spans
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def enable(out_path: str | Path) -> Tracer:
+    global _tracer
+    _tracer = Tracer(out_path)
+    return _tracer
+
+
+def disable() -> None:
+    global _tracer
+    if _tracer:
+        _tracer.close()
+    _tracer = None
+
+
+def tracer() -> Tracer | None:
+    return _tracer
+
+
+@contextmanager
+def span(name: str):
+    if _tracer is None:
+        yield
+        return
+    s = _tracer.start(name)
+    try:
+        yield s
+    except BaseException as e:
+        _tracer.finish(s, e)
+        raise
+    _tracer.finish(s)
+
+
+@contextmanager
+def attempt(name: str):
+    """Drop-in for ``suppress(Exception)`` around one fallback branch.
+
+    When tracing, each branch becomes a child span whose ``ok``/``timeout``
+    fields say whether it won and whether it burned its timeout.
+    """
+    if _tracer is None:
+        try:
+            yield
+        except Exception:
+            pass
+        return
+    s = _tracer.start(f"attempt:{name}")
+    try:
+        yield
+    except Exception as e:
+        _tracer.finish(s, e)
+        return
+    _tracer.finish(s)
+
+
+def note(**attrs) -> None:
+    """Attach attributes (e.g. ``branch="force-click"``) to the innermost open span."""
+    if _tracer is not None:
+        _tracer.note(**attrs)
+
+
+def _wrap(qualname: str, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _tracer is None:
+            return fn(*args, **kwargs)
+        s = _tracer.start(qualname)
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            _tracer.finish(s, e)
+            raise
+        _tracer.finish(s)
+        return result
+
+    wrapper.__timed__ = True
+    return wrapper
+
+
+def instrument(*classes: type) -> None:
+    """Wrap every public and ``_helper`` method of ``classes`` in a span (dunders excluded)."""
+    for cls in classes:
+        for attr, fn in list(vars(cls).items()):
+            if attr.startswith("__") or not inspect.isfunction(fn) or getattr(fn, "__timed__", False):
+                continue
+            setattr(cls, attr, _wrap(f"{cls.__name__}.{attr}", fn))
+
+
+# ---------- reporting ----------
+def load_spans(run_dir: str | Path) -> list[dict]:
+    spans = []
+    for path in sorted(Path(run_dir).glob("*.jsonl")):
+        with path.open(encoding="utf-8") as fh:
+            spans.extend(json.loads(line) for line in fh if line.strip())
+    return spans
+
+
+def summarize(spans: list[dict], top: int = 10) -> list[str]:
+    by_name: dict[str, list[float]] = defaultdict(list)
+    lost = 0.0
+    for s in spans:
+        by_name[s["name"]].append(s["ms"])
+        if s.get("timeout"):
+            lost += s["ms"]
+    rows = sorted(by_name.items(), key=lambda kv: sum(kv[1]), reverse=True)[:top]
+    lines = [f"{'span':<48} {'calls':>5} {'total ms':>10} {'max ms':>9}"]
+    for name, values in rows:
+        lines.append(f"{name:<48} {len(values):>5} {sum(values):>10.0f} {max(values):>9.0f}")
+    timeouts = sum(1 for s in spans if s.get("timeout"))
+    lines.append(f"time lost to timeouts: {lost / 1000:.1f}s across {timeouts} timed-out step(s)")
+    return lines
+
+
+def default_run_dir(root: str | Path = ".timings") -> Path:
+    run_id = os.environ.setdefault("TIMINGS_RUN_ID", time.strftime("%Y%m%d-%H%M%S"))
+    return Path(root) / run_id
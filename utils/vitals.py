@@ -0,0 +1,247 @@
+# utils/vitals.py
+"""Opt-in Core Web Vitals / navigation-timing capture for page-object ``goto``s.
+
+``install()`` adds PerformanceObservers (LCP, layout shifts, long tasks) to a
+context; after every instrumented ``goto`` the collector waits for ``load``,
+reads them plus navigation/paint/resource timing, appends the record to
+``<root>/<env>/<page>.jsonl`` (``<root>/<env>/<profile>/<page>.jsonl`` under an
+emulation profile) and checks it against that page's budgets.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import time
+import warnings
+from contextlib import suppress
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from playwright.sync_api import BrowserContext, Page
+
+from utils import emulation
+
+# Runs before any page script. CLS is the plain sum of shifts without recent
+# input (no session windows), which is what a short test navigation needs.
+VITALS_INIT_JS = """
+(() => {
+  if (window.__vitals) return;
+  const v = window.__vitals = { lcp: null, cls: 0, longTasks: 0, longTaskMs: 0 };
+  const observe = (type, cb) => {
+    try { new PerformanceObserver((list) => list.getEntries().forEach(cb)).observe({ type, buffered: true }); }
+    catch (e) {}
+  };
+  observe('largest-contentful-paint', (e) => { v.lcp = e.renderTime || e.startTime; });
+  observe('layout-shift', (e) => { if (!e.hadRecentInput) v.cls += e.value; });
+  observe('longtask', (e) => { v.longTasks++; v.longTaskMs += e.duration; });
+})();
+"""
+
+COLLECT_JS = """
+() => {
+  const v = window.__vitals || {};
+  const nav = performance.getEntriesByType('navigation')[0] || {};
+  const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+  const res = performance.getEntriesByType('resource');
+  const round = (x) => (x === null || x === undefined) ? null : Math.round(x * 10) / 10;
+  return {
+    ttfb_ms: round(nav.responseStart),
+    fcp_ms: round(fcp && fcp.startTime),
+    lcp_ms: round(v.lcp),
+    cls: v.cls === undefined ? null : Math.round(v.cls * 10000) / 10000,
+    long_tasks: v.longTasks === undefined ? null : v.longTasks,
+    long_task_ms: round(v.longTaskMs),
+    resources: res.length,
+    transfer_bytes: res.reduce((s, r) => s + (r.transferSize || 0), nav.transferSize || 0),
+    dcl_ms: round(nav.domContentLoadedEventEnd),
+    load_ms: round(nav.loadEventEnd),
+  };
+}
+"""
+
+METRICS = ("ttfb_ms", "fcp_ms", "lcp_ms", "cls", "long_tasks", "long_task_ms", "resources", "transfer_bytes", "dcl_ms", "load_ms")
+
+
+class PerfBudgetWarning(UserWarning):
+    """A page went over one of its performance budgets (``--vitals-budget-mode=warn``)."""
+
+
+class PerfBudgetExceeded(AssertionError):
+    """A page went over one of its performance budgets (``--vitals-budget-mode=fail``)."""
+
+
+@dataclass
+class Budgets:
+    """Per-page metric ceilings: the file's ``default`` section, overridden per env.
+
+    Under an emulation profile the ``<profile>`` and ``<env>/<profile>`` sections
+    apply on top, so throttled runs get their own (looser) ceilings.
+    """
+
+    pages: dict[str, dict[str, float]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str | Path | None, env: str, profile: str = "none") -> "Budgets":
+        if not path or not Path(path).exists():
+            return cls()
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        pages: dict[str, dict[str, float]] = {}
+        sections = ("default", env) if profile == "none" else ("default", env, profile, f"{env}/{profile}")
+        for section in sections:
+            for page, limits in raw.get(section, {}).items():
+                pages.setdefault(page, {}).update(limits)
+        return cls(pages)
+
+    def check(self, page: str, metrics: dict) -> list[str]:
+        violations = []
+        for metric, limit in self.pages.get(page, {}).items():
+            value = metrics.get(metric)
+            if value is not None and value > limit:
+                violations.append(f"{page} {metric}={value:g} > budget {limit:g}")
+        return violations
+
+
+class VitalsStore:
+    """Append-only JSONL time series, one file per (env, emulation profile, page)."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def path_for(self, env: str, page: str, profile: str = "none") -> Path:
+        # Unthrottled runs keep the plain <env>/<page> series.
+        folder = self.root / env if profile == "none" else self.root / env / profile
+        return folder / f"{page}.jsonl"
+
+    def append(self, record: dict) -> None:
+        path = self.path_for(record["env"], record["page"], record.get("profile", "none"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+
+    def history(self, env: str, page: str, profile: str = "none") -> list[dict]:
+        path = self.path_for(env, page, profile)
+        if not path.exists():
+            return []
+        with path.open(encoding="utf-8") as fh:
+            return [json.loads(line) for line in fh if line.strip()]
+
+
+class VitalsCollector:
+    def __init__(self, store: VitalsStore, budgets_path: str | Path | None = None,
+                 mode: str = "warn", settle_ms: int = 5000):
+        self.store = store
+        self.budgets_path = budgets_path
+        self.mode = mode
+        self.settle_ms = settle_ms
+        self.test: str | None = None
+        self.test_records: list[dict] = []
+        self._budgets: dict[tuple[str, str], Budgets] = {}
+
+    def budgets(self, env: str, profile: str = "none") -> Budgets:
+        if (env, profile) not in self._budgets:
+            self._budgets[env, profile] = Budgets.load(self.budgets_path, env, profile)
+        return self._budgets[env, profile]
+
+    @staticmethod
+    def install(context: BrowserContext) -> None:
+        context.add_init_script(VITALS_INIT_JS)
+
+    def collect(self, page: Page, name: str) -> dict:
+        """Measure the navigation ``page`` just made; raise/warn on budget violations."""
+        with suppress(Exception):
+            page.wait_for_load_state("load", timeout=self.settle_ms)
+        metrics = page.evaluate(COLLECT_JS)
+        env = _env()
+        profile = emulation.active() or "none"
+        record = {
+            "ts": time.time(),
+            "env": env,
+            "profile": profile,
+            "page": name,
+            "url": page.url,
+            "test": self.test,
+            **metrics,
+        }
+        record["violations"] = self.budgets(env, profile).check(name, metrics)
+        self.store.append(record)
+        self.test_records.append(record)
+        if record["violations"]:
+            message = "; ".join(record["violations"])
+            if self.mode == "fail":
+                raise PerfBudgetExceeded(message)
+            warnings.warn(message, PerfBudgetWarning, stacklevel=3)
+        return record
+
+    def begin_test(self, nodeid: str) -> None:
+        self.test = nodeid
+        self.test_records = []
+
+    def end_test(self) -> list[dict]:
+        records, self.test_records, self.test = self.test_records, [], None
+        return records
+
+
+def _env() -> str:
+    try:
+        from utils.config import active_env
+
+        return active_env()
+    except Exception:
+        return "-"
+
+
+_collector: VitalsCollector | None = None
+
+
+def enable(root: str | Path, budgets_path: str | Path | None = None, mode: str = "warn") -> VitalsCollector:
+    global _collector
+    _collector = VitalsCollector(VitalsStore(root), budgets_path, mode)
+    return _collector
+
+
+def disable() -> None:
+    global _collector
+    _collector = None
+
+
+def collector() -> VitalsCollector | None:
+    return _collector
+
+
+def instrument(cls: type, page_name: str) -> None:
+    """Collect vitals after every ``cls.goto`` while a collector is enabled."""
+    goto = cls.goto
+    if getattr(goto, "__vitals__", False):
+        return
+
+    @functools.wraps(goto)
+    def wrapper(self, *args, **kwargs):
+        result = goto(self, *args, **kwargs)
+        if _collector is not None:
+            _collector.collect(self.page, page_name)
+        return result
+
+    wrapper.__vitals__ = True
+    cls.goto = wrapper
+
+
+def summarize(records: list[dict]) -> list[str]:
+    """Median of the headline metrics per (env, emulation profile, page), plus budget violations."""
+    from utils.stats import percentile
+
+    groups: dict[tuple, list[dict]] = {}
+    for r in records:
+        groups.setdefault((r["env"], r.get("profile", "none"), r["page"]), []).append(r)
+    lines = [f"{'env/page':<24} {'n':>3} {'ttfb':>7} {'fcp':>7} {'lcp':>7} {'cls':>6} {'KiB':>7} {'over':>5}"]
+    for (env, profile, page), rs in sorted(groups.items()):
+        def med(metric, rs=rs):
+            values = [r[metric] for r in rs if r.get(metric) is not None]
+            return percentile(values, 50) if values else float("nan")
+
+        label = f"{env}/{page}" if profile == "none" else f"{env}/{profile}/{page}"
+        over = sum(1 for r in rs if r["violations"])
+        lines.append(
+            f"{label:<24} {len(rs):>3} {med('ttfb_ms'):>7.0f} {med('fcp_ms'):>7.0f} "
+            f"{med('lcp_ms'):>7.0f} {med('cls'):>6.3f} {med('transfer_bytes') / 1024:>7.0f} {over:>5}"
+        )
+    return lines